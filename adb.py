@@ -0,0 +1,238 @@
+"""
+adb.py - asyncio interface to the database
+
+The functions in db.py block while SQLite works, which stalls an asyncio
+event loop. This module offers the same operations as coroutines:
+
+    import adb
+
+    async def main():
+        session = await adb.start_session("Reading")
+        summary = await adb.get_summary(start_date=monday)
+        async for session in adb.iter_sessions(project_name="Reading"):
+            ...
+        await adb.close()
+
+Calls run on a small pool of worker threads (POOL_SIZE by default). Each
+worker keeps one connection open for its whole life (see
+db.shared_connection), so concurrent callers share a few connections
+instead of each opening its own, and at most POOL_SIZE calls touch
+SQLite at once - the rest wait their turn in the pool's queue.
+
+The pool starts on the first call. Call close() before the event loop
+shuts down to let queued calls finish and close the connections.
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import queue
+import threading
+from datetime import datetime
+from typing import AsyncIterator, Callable, Optional
+
+import db
+from models import Session
+
+
+# Worker threads (and so connections) in the pool
+POOL_SIZE = 4
+
+# Sessions fetched per round trip by iter_sessions()
+PAGE_SIZE = 200
+
+
+class _Pool:
+    """
+    Fixed set of worker threads, each with its own shared connection.
+
+    SQLite connections can only be used from the thread that opened them,
+    so every call is run entirely on one worker.
+    """
+
+    def __init__(self, size: int):
+        self._requests: queue.SimpleQueue = queue.SimpleQueue()
+        self._init_lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"derby-adb-{i}", daemon=True)
+            for i in range(size)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, func: Callable, *args, **kwargs) -> concurrent.futures.Future:
+        """Queue func(*args, **kwargs) for the next free worker."""
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        self._requests.put((future, func, args, kwargs))
+        return future
+
+    def close(self):
+        """Stop the workers once everything already queued has run."""
+        for _ in self._threads:
+            self._requests.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def _run(self):
+        """Worker loop: run queued calls on this thread's connection."""
+        # Tables and migrations are checked once per process; the lock keeps
+        # workers starting together from migrating at the same time
+        with self._init_lock:
+            db.init_database()
+
+        with db.shared_connection():
+            while True:
+                request = self._requests.get()
+                if request is None:
+                    return
+
+                future, func, args, kwargs = request
+                # False if the awaiting coroutine was cancelled meanwhile
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(func(*args, **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+
+
+_pool: Optional[_Pool] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> _Pool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = _Pool(POOL_SIZE)
+        return _pool
+
+
+async def run(func: Callable, *args, **kwargs):
+    """
+    Run any blocking database function on the pool and await its result.
+
+    Use this for db functions that don't have a wrapper below, or to run
+    several calls back to back on one worker (and connection):
+        await adb.run(lambda: [db.get_project(n) for n in names])
+    """
+    future = _get_pool().submit(func, *args, **kwargs)
+    return await asyncio.wrap_future(future)
+
+
+async def close():
+    """Wait for queued calls to finish and close the pool's connections."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        await asyncio.get_running_loop().run_in_executor(None, pool.close)
+
+
+def _wrap(func: Callable) -> Callable:
+    """Make an async version of a db function (same name, args and docs)."""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run(func, *args, **kwargs)
+    return wrapper
+
+
+# =============================================================================
+# SESSIONS
+# =============================================================================
+
+start_session = _wrap(db.start_session)
+stop_session = _wrap(db.stop_session)
+stop_all_sessions = _wrap(db.stop_all_sessions)
+switch_session = _wrap(db.switch_session)
+pause_session = _wrap(db.pause_session)
+resume_session = _wrap(db.resume_session)
+log_session = _wrap(db.log_session)
+delete_session = _wrap(db.delete_session)
+get_active_session = _wrap(db.get_active_session)
+get_active_sessions = _wrap(db.get_active_sessions)
+get_active_session_by_project = _wrap(db.get_active_session_by_project)
+get_session_by_id = _wrap(db.get_session_by_id)
+get_sessions = _wrap(db.get_sessions)
+get_sessions_page = _wrap(db.get_sessions_page)
+
+
+async def iter_sessions(
+    project_name: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    page_size: int = PAGE_SIZE
+) -> AsyncIterator[Session]:
+    """
+    Stream completed sessions, newest first.
+
+    Same filters as db.get_sessions(), without a limit. Sessions are
+    fetched a page at a time (db.get_sessions_page), so no worker or
+    connection is held while the caller processes them, and the loop
+    can stop early at no cost:
+
+        async for session in adb.iter_sessions(start_date=monday):
+            ...
+    """
+    after = None
+    while True:
+        page = await run(
+            db.get_sessions_page,
+            project_name=project_name,
+            start_date=start_date,
+            end_date=end_date,
+            after=after,
+            limit=page_size
+        )
+        for session in page:
+            yield session
+        if len(page) < page_size:
+            return
+        after = page[-1]
+
+
+# =============================================================================
+# SUMMARIES
+# =============================================================================
+
+get_summary = _wrap(db.get_summary)
+get_summary_with_priority = _wrap(db.get_summary_with_priority)
+get_summary_by_day = _wrap(db.get_summary_by_day)
+get_summary_by_tag = _wrap(db.get_summary_by_tag)
+get_summary_tree = _wrap(db.get_summary_tree)
+compute_billing = _wrap(db.compute_billing)
+
+
+# =============================================================================
+# PROJECTS
+# =============================================================================
+
+create_project = _wrap(db.create_project)
+get_project = _wrap(db.get_project)
+get_or_create_project = _wrap(db.get_or_create_project)
+list_projects = _wrap(db.list_projects)
+get_frecent_project_names = _wrap(db.get_frecent_project_names)
+update_project_priority = _wrap(db.update_project_priority)
+rename_project = _wrap(db.rename_project)
+delete_project = _wrap(db.delete_project)
+set_project_parent = _wrap(db.set_project_parent)
+get_project_parent = _wrap(db.get_project_parent)
+get_project_path = _wrap(db.get_project_path)
+set_project_billing = _wrap(db.set_project_billing)
+get_billing_terms = _wrap(db.get_billing_terms)
+set_project_budget = _wrap(db.set_project_budget)
+get_budget_progress = _wrap(db.get_budget_progress)
+
+
+# =============================================================================
+# TAGS
+# =============================================================================
+
+create_tag = _wrap(db.create_tag)
+get_tag = _wrap(db.get_tag)
+list_tags = _wrap(db.list_tags)
+list_tags_with_counts = _wrap(db.list_tags_with_counts)
+get_project_tags = _wrap(db.get_project_tags)
+add_tag_to_project = _wrap(db.add_tag_to_project)
+remove_tag_from_project = _wrap(db.remove_tag_from_project)
+get_projects_by_tag = _wrap(db.get_projects_by_tag)
@@ -0,0 +1,368 @@
+"""
+api_server.py - Read-only HTTP/JSON reporting API (`tt api`)
+
+Lets dashboards and scripts read Derby's data over plain HTTP instead of
+running `tt summary` and parsing its tables. Built on the standard
+library's http.server; it only ever reads the database.
+
+Endpoints (all GET, all JSON):
+    /active                 Active sessions
+    /summary                Seconds per project, with priority
+                            (get_summary_with_priority)
+    /summary/days           Per-project, per-day breakdown (get_summary_by_day)
+    /summary/tags           Per-tag breakdown (get_summary_by_tag)
+    /sessions               Completed sessions, newest first, one page at a time
+
+Query parameters:
+    period=today|week|all   Date range for summaries (default: today;
+                            /summary/days and /summary/tags default to week
+                            and don't accept "all")
+    start=, end=            Explicit range as ISO dates, overriding period
+    background=0|1          Only regular projects / only background tasks
+    project=                /sessions: only this project
+    limit=, after=          /sessions: page size, and the "next" value from
+                            the previous page
+
+Active sessions are returned as stored (start time, paused seconds); the
+client works out the elapsed time, so the response only changes when the
+database does.
+
+Conditional requests: every response has an ETag built from SQLite's
+change counter (PRAGMA data_version) and the query. A client that sends
+it back in If-None-Match gets "304 Not Modified" - without the server
+running any query - until something is written to the database. Bodies
+are also cached server-side per query until the next write.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Optional
+from urllib.parse import parse_qs, urlsplit
+
+import db
+from periods import resolve_period
+
+
+# Only this machine can connect unless told otherwise
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8347
+
+# Sessions per /sessions page
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Cached response bodies kept at once (the cache is emptied on every
+# database change anyway, so this only bounds unusual query patterns)
+MAX_CACHED = 256
+
+
+class BadRequest(ValueError):
+    """A query parameter was missing or invalid (sent back as 400)."""
+
+
+# =============================================================================
+# QUERY PARSING
+# =============================================================================
+
+def _parse_date(value: str, name: str) -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise BadRequest(f"Invalid {name} date: {value}")
+
+
+def _date_range(params: dict[str, str], default_period: str, allow_all: bool = True) -> tuple[Optional[datetime], Optional[datetime]]:
+    """Resolve start/end (or period) query parameters to a datetime range."""
+    if "start" in params or "end" in params:
+        start = _parse_date(params["start"], "start") if "start" in params else None
+        end = _parse_date(params["end"], "end") if "end" in params else None
+    else:
+        try:
+            start, end = resolve_period(params.get("period", default_period))
+        except ValueError as e:
+            raise BadRequest(str(e))
+
+    if not allow_all and (start is None or end is None):
+        raise BadRequest("This endpoint needs a bounded range (period=today|week, or start and end)")
+    return start, end
+
+
+def _background(params: dict[str, str]) -> Optional[bool]:
+    value = params.get("background")
+    if value is None:
+        return None
+    if value not in ("0", "1"):
+        raise BadRequest("background must be 0 or 1")
+    return value == "1"
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+# =============================================================================
+# ENDPOINTS
+# =============================================================================
+#
+# Each endpoint is split in two: a resolver that turns the query string
+# into the exact arguments (so "period=today" becomes concrete dates, and
+# the cache key changes at midnight), and a runner that queries the
+# database with them. Only runners touch the database.
+
+def _resolve_active(params):
+    return {}
+
+
+def _run_active(args):
+    return {"sessions": [s.to_dict() for s in db.get_active_sessions()]}
+
+
+def _resolve_summary(params):
+    start, end = _date_range(params, "today")
+    return {"start": _iso(start), "end": _iso(end), "background": _background(params)}
+
+
+def _run_summary(args):
+    start, end = _args_range(args)
+    projects = db.get_summary_with_priority(start, end, is_background=args["background"])
+    return {"start": args["start"], "end": args["end"], "projects": projects}
+
+
+def _resolve_summary_days(params):
+    start, end = _date_range(params, "week", allow_all=False)
+    return {"start": _iso(start), "end": _iso(end), "background": _background(params)}
+
+
+def _run_summary_days(args):
+    start, end = _args_range(args)
+    projects = db.get_summary_by_day(start, end, is_background=args["background"])
+    return {"start": args["start"], "end": args["end"], "projects": projects}
+
+
+def _resolve_summary_tags(params):
+    start, end = _date_range(params, "week", allow_all=False)
+    return {"start": _iso(start), "end": _iso(end)}
+
+
+def _run_summary_tags(args):
+    start, end = _args_range(args)
+    return {"start": args["start"], "end": args["end"], "tags": db.get_summary_by_tag(start, end)}
+
+
+def _resolve_sessions(params):
+    start, end = _date_range(params, "all")
+    try:
+        limit = int(params.get("limit", DEFAULT_PAGE_SIZE))
+        after = int(params["after"]) if "after" in params else None
+    except ValueError:
+        raise BadRequest("limit and after must be integers")
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise BadRequest(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    return {
+        "project": params.get("project"),
+        "start": _iso(start),
+        "end": _iso(end),
+        "limit": limit,
+        "after": after,
+    }
+
+
+def _run_sessions(args):
+    start, end = _args_range(args)
+
+    after = None
+    if args["after"] is not None:
+        after = db.get_session_by_id(args["after"])
+        if after is None:
+            raise BadRequest(f"Session {args['after']} not found")
+
+    page = db.get_sessions_page(
+        project_name=args["project"],
+        start_date=start,
+        end_date=end,
+        after=after,
+        limit=args["limit"]
+    )
+    sessions = []
+    for session in page:
+        data = session.to_dict()
+        data["duration_seconds"] = session.duration_seconds
+        sessions.append(data)
+
+    # A full page may have more after it
+    next_after = page[-1].id if len(page) == args["limit"] else None
+    return {"sessions": sessions, "next": next_after}
+
+
+def _args_range(args) -> tuple[Optional[datetime], Optional[datetime]]:
+    start = datetime.fromisoformat(args["start"]) if args["start"] else None
+    end = datetime.fromisoformat(args["end"]) if args["end"] else None
+    return start, end
+
+
+# Path -> (resolver, runner)
+ENDPOINTS = {
+    "/active": (_resolve_active, _run_active),
+    "/summary": (_resolve_summary, _run_summary),
+    "/summary/days": (_resolve_summary_days, _run_summary_days),
+    "/summary/tags": (_resolve_summary_tags, _run_summary_tags),
+    "/sessions": (_resolve_sessions, _run_sessions),
+}
+
+
+# =============================================================================
+# SERVER
+# =============================================================================
+
+class _ResponseCache:
+    """
+    Response bodies keyed by query, valid for one database version.
+
+    data_version only changes when another connection commits, which is
+    every change since this server never writes.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+        # Distinguishes this server's ETags from a previous run's, since
+        # data_version counts from scratch on every new connection
+        self._instance = os.urandom(4).hex()
+        self._entries: dict[str, bytes] = {}
+        self.version = self._read_version()
+
+    def _read_version(self) -> int:
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def check(self):
+        """Drop everything if the database has changed."""
+        version = self._read_version()
+        if version != self.version:
+            self.version = version
+            self._entries.clear()
+
+    def etag(self, key: str) -> str:
+        digest = hashlib.sha1(f"{self._instance}:{self.version}:{key}".encode("utf-8")).hexdigest()
+        return f'"{digest[:20]}"'
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._entries.get(key)
+
+    def put(self, key: str, body: bytes):
+        if len(self._entries) >= MAX_CACHED:
+            self._entries.clear()
+        self._entries[key] = body
+
+
+class _ApiHandler(BaseHTTPRequestHandler):
+    """Answers GET requests for the ENDPOINTS."""
+
+    server_version = "DerbyAPI/1.0"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        endpoint = ENDPOINTS.get(url.path.rstrip("/") or "/")
+        if endpoint is None:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown endpoint: {url.path}", "endpoints": sorted(ENDPOINTS)})
+            return
+
+        resolve, run = endpoint
+        # Repeated parameters: the last one wins
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            args = resolve(params)
+        except BadRequest as e:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+            return
+
+        cache = self.server.cache
+        cache.check()
+        key = json.dumps([url.path.rstrip("/"), args], sort_keys=True)
+        etag = cache.etag(key)
+
+        # Cheapest answer: the client already has this exact response
+        if etag in self._if_none_match():
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            return
+
+        body = cache.get(key)
+        if body is None:
+            try:
+                value = run(args)
+            except BadRequest as e:
+                self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+                return
+            body = json.dumps(value, ensure_ascii=False).encode("utf-8")
+            cache.put(key, body)
+
+        self._send_body(HTTPStatus.OK, body, etag)
+
+    def _if_none_match(self) -> list[str]:
+        header = self.headers.get("If-None-Match", "")
+        # Accept weak validators too (W/"..."): we only compare, never merge
+        return [tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()]
+
+    def _send_json(self, status: HTTPStatus, value: Any):
+        self._send_body(status, json.dumps(value).encode("utf-8"))
+
+    def _send_body(self, status: HTTPStatus, body: bytes, etag: Optional[str] = None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+            # Let clients keep the response, but make them revalidate
+            self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Requests are logged by serve()'s on_request callback, if any
+        if self.server.on_request:
+            self.server.on_request(format % args)
+
+
+class ApiServer(HTTPServer):
+    """
+    Single-threaded HTTP server with one database connection.
+
+    Requests are answered one at a time: each is a few milliseconds (or
+    a cache hit), and it keeps the connection and cache free of locking.
+    """
+
+    def __init__(self, address: tuple[str, int], conn, on_request=None):
+        self.cache = _ResponseCache(conn)
+        self.on_request = on_request
+        super().__init__(address, _ApiHandler)
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, on_ready=None, on_request=None):
+    """
+    Run the API server until interrupted.
+
+    Args:
+        host: Interface to listen on
+        port: TCP port (0 picks a free one)
+        on_ready: Optional callback(url) run once the server is listening
+        on_request: Optional callback(line) run for every request handled
+
+    Raises:
+        OSError: If the address can't be bound (e.g. the port is in use)
+    """
+    db.init_database()
+
+    with db.shared_connection() as conn:
+        server = ApiServer((host, port), conn, on_request=on_request)
+        try:
+            if on_ready:
+                bound_host, bound_port = server.server_address[:2]
+                on_ready(f"http://{bound_host}:{bound_port}")
+            server.serve_forever()
+        finally:
+            server.server_close()
@@ -386,7 +386,7 @@ class AppearanceTab:
         ctk.CTkLabel(
             theme_section,
             text="Theme",
-            font=ctk.CTkFont(family=FONT_FAMILY, weight="bold")
+            font=themes.get_font(weight="bold")
         ).pack(anchor="w", padx=10, pady=(10, 5))
 
         # Radio buttons container
@@ -412,7 +412,7 @@ class AppearanceTab:
         ctk.CTkLabel(
             display_section,
             text="Table Display",
-            font=ctk.CTkFont(family=FONT_FAMILY, weight="bold")
+            font=themes.get_font(weight="bold")
         ).pack(anchor="w", padx=10, pady=(10, 5))
 
         # Row dividers toggle
@@ -444,7 +444,7 @@ class AppearanceTab:
         ctk.CTkLabel(
             storage_section,
             text="Data Storage",
-            font=ctk.CTkFont(family=FONT_FAMILY, weight="bold")
+            font=themes.get_font(weight="bold")
         ).pack(anchor="w", padx=10, pady=(10, 5))
 
         # Database location display
@@ -454,7 +454,7 @@ class AppearanceTab:
         ctk.CTkLabel(
             location_frame,
             text="Database location:",
-            font=ctk.CTkFont(family=FONT_FAMILY, size=12),
+            font=themes.get_font(12),
             text_color=themes.get_colors()["text_secondary"]
         ).pack(anchor="w")
 
@@ -467,7 +467,7 @@ class AppearanceTab:
         self.path_label = ctk.CTkLabel(
             path_row,
             textvariable=self.db_path_var,
-            font=ctk.CTkFont(family=FONT_FAMILY, size=12),
+            font=themes.get_font(12),
             fg_color=themes.get_colors()["bg_light"],
             corner_radius=5,
             anchor="w",
@@ -0,0 +1,163 @@
+"""
+budgets.py - Live progress against project hour budgets
+
+Budgets (`tt budget`) give a project a number of hours per week, per
+month or in total. The database keeps a running total of closed sessions
+for each of those periods (see db.get_budget_progress), so how much of a
+budget is used is:
+
+    counted time of closed sessions + elapsed time of active sessions
+
+The first part only changes when a session closes or is edited; the
+second changes every second but is already in memory wherever a timer is
+running. BudgetTracker keeps the first part and adds the second on each
+call, so the GUI can show progress on every tick without querying the
+database. It re-reads the counters only when the set of active sessions
+changes (one was stopped, here or elsewhere), a new week or month begins,
+or RELOAD_SECONDS have passed (to pick up sessions logged from the CLI).
+"""
+
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+import db
+from models import Session
+
+
+# Re-read counters at least this often, even if nothing seems to change
+RELOAD_SECONDS = 60
+
+PERIOD_LABELS = {"week": "this week", "month": "this month", "total": "in total"}
+
+
+@dataclass
+class BudgetProgress:
+    """One budget and how much of it is used, live."""
+
+    project_name: str
+    period: str                        # "week", "month" or "total"
+    budget_seconds: int
+    used_seconds: int
+
+    @property
+    def fraction(self) -> float:
+        """Share of the budget used (above 1.0 when over)."""
+        return self.used_seconds / self.budget_seconds if self.budget_seconds else 0.0
+
+    @property
+    def remaining_seconds(self) -> int:
+        """Time left (negative when over)."""
+        return self.budget_seconds - self.used_seconds
+
+    @property
+    def is_over(self) -> bool:
+        return self.used_seconds > self.budget_seconds
+
+    def format(self) -> str:
+        """Short text like "3.5h of 10h this week (35%)"."""
+        used = self.used_seconds / 3600
+        budget = self.budget_seconds / 3600
+        return f"{used:.1f}h of {budget:g}h {PERIOD_LABELS[self.period]} ({self.fraction:.0%})"
+
+
+def live_seconds(session: Session, period_start: Optional[datetime], now: datetime) -> int:
+    """
+    Time an active session adds to a budget period so far.
+
+    A session started before the period began only counts from the
+    period's start: sessions are split at midnight when they close, so
+    that's all the counters will put in this period.
+    """
+    seconds = session.duration_seconds
+    if period_start is not None and session.start_time is not None and session.start_time < period_start:
+        seconds = min(seconds, max(0, int((now - period_start).total_seconds())))
+    return seconds
+
+
+def combine(budgets: list[dict], active: list[Session], now: Optional[datetime] = None) -> dict[str, list[BudgetProgress]]:
+    """
+    Add active sessions' elapsed time to counted budget progress.
+
+    Args:
+        budgets: Rows from db.get_budget_progress()
+        active: Active sessions
+        now: Current time (default: now)
+
+    Returns:
+        {project_name: [BudgetProgress, ...]} for projects with budgets
+    """
+    now = now or datetime.now()
+    by_project: dict[str, list[Session]] = {}
+    for session in active:
+        by_project.setdefault(session.project_name, []).append(session)
+
+    progress: dict[str, list[BudgetProgress]] = {}
+    for budget in budgets:
+        used = budget["used_seconds"] + sum(
+            live_seconds(s, budget["period_start"], now)
+            for s in by_project.get(budget["project"], ())
+        )
+        progress.setdefault(budget["project"], []).append(BudgetProgress(
+            project_name=budget["project"],
+            period=budget["period"],
+            budget_seconds=budget["budget_seconds"],
+            used_seconds=used
+        ))
+    return progress
+
+
+def tightest(progress: list[BudgetProgress]) -> Optional[BudgetProgress]:
+    """The budget closest to (or furthest over) its limit, if any."""
+    return max(progress, key=lambda p: p.fraction, default=None)
+
+
+class BudgetTracker:
+    """
+    Budget progress for a running app, kept in memory between ticks.
+
+    Call progress() as often as needed; it only reads the database when
+    the counters may have changed. Call invalidate() after writing
+    sessions (or budgets) to re-read them on the next call.
+    """
+
+    def __init__(self):
+        self._budgets: Optional[list[dict]] = None
+        self._loaded_at = 0.0
+        self._periods: tuple = ()
+        self._active_ids: frozenset = frozenset()
+
+    def invalidate(self):
+        """Re-read the counters on the next progress() call."""
+        self._budgets = None
+
+    def progress(self, active: list[Session], now: Optional[datetime] = None) -> dict[str, list[BudgetProgress]]:
+        """
+        Live progress of every budget.
+
+        Args:
+            active: The active sessions (as already fetched for this tick)
+            now: Current time (default: now)
+
+        Returns:
+            {project_name: [BudgetProgress, ...]}
+        """
+        now = now or datetime.now()
+        periods = (db.budget_period_start("week", now), db.budget_period_start("month", now))
+        # Sessions not saved yet (id None) aren't closed either, so they
+        # can't have changed the counters
+        active_ids = frozenset(s.id for s in active if s.id is not None)
+
+        if (self._budgets is None
+                or periods != self._periods
+                or not active_ids >= self._active_ids
+                or time.time() - self._loaded_at >= RELOAD_SECONDS):
+            self._budgets = db.get_budget_progress(now)
+            self._loaded_at = time.time()
+            self._periods = periods
+
+        # A session that disappears may have been stopped (or cancelled):
+        # compared on every call, so new sessions don't trigger a reload
+        self._active_ids = active_ids
+        return combine(self._budgets, active, now)
@@ -20,20 +20,43 @@ run this file with Python. It's ignored on Windows.
 import typer
 
 # Rich: Library for beautiful terminal output (comes with typer[all])
-# Console: Main interface for printing styled text
-# Table: Creates formatted tables
-from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
+# Rich is imported lazily (see _LazyConsole and the local Table imports)
+# so the machine-readable output modes never load it.
 
 # Standard library imports
+import importlib.util
+import sys
 from datetime import datetime, timedelta
 from typing import Optional, List
 from pathlib import Path
 
 # Our local modules
-import db
+import completion
 from models import Session, parse_duration_string
+from name_index import NameIndex, MATCH_TYPO
+from periods import get_today_range, get_week_range
+import output
+
+
+def _lazy_import(name: str):
+    """
+    Import a module that only loads when one of its attributes is used.
+
+    Shell completion imports this file on every keypress but answers from
+    the completion cache, so it never touches db (or SQLite) at all.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+db = _lazy_import("db")
 
 
 # =============================================================================
@@ -45,12 +68,72 @@ from models import Session, parse_duration_string
 app = typer.Typer(
     name="tt",                          # Name shown in help text
     help="A simple time tracker CLI",   # Description in help
-    add_completion=False                # Disable shell completion (simpler)
+    add_completion=True                 # Shell completion for project names
 )
 
+
+class _LazyConsole:
+    """
+    Stand-in for rich.console.Console that imports Rich on first use.
+
+    Attribute access (console.print, ...) creates the real Console the
+    first time, so commands running in a machine output mode never
+    import Rich at all.
+    """
+
+    def __init__(self):
+        self._console = None
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+    def get(self):
+        """Return the real Console (for Rich APIs that need one, like Live)."""
+        if self._console is None:
+            from rich.console import Console
+            self._console = Console()
+        return self._console
+
+
 # Create Rich console for formatted output
 # All our printing goes through this for consistent styling
-console = Console()
+console = _LazyConsole()
+
+# Output format chosen with the global --json/--ndjson/--tsv flags
+output_format = output.FORMAT_TABLE
+
+
+@app.callback()
+def main(
+    json_output: bool = typer.Option(False, "--json", help="Output a JSON array instead of a table"),
+    ndjson_output: bool = typer.Option(False, "--ndjson", help="Output one JSON object per line"),
+    tsv_output: bool = typer.Option(False, "--tsv", help="Output tab-separated values with a header row")
+):
+    """
+    A simple time tracker CLI
+
+    The output flags go before the command (e.g. `tt --json status`) and
+    apply to status, list, summary, projects, tags, rate, invoice, budget
+    and batch.
+    """
+    global output_format
+
+    chosen = [
+        fmt for fmt, flag in (
+            (output.FORMAT_JSON, json_output),
+            (output.FORMAT_NDJSON, ndjson_output),
+            (output.FORMAT_TSV, tsv_output),
+        ) if flag
+    ]
+    if len(chosen) > 1:
+        typer.echo("Error: --json, --ndjson and --tsv are mutually exclusive", err=True)
+        raise typer.Exit(code=2)
+    output_format = chosen[0] if chosen else output.FORMAT_TABLE
+
+
+def machine_output() -> bool:
+    """True if a machine-readable output format was requested."""
+    return output_format in output.MACHINE_FORMATS
 
 
 # =============================================================================
@@ -94,44 +177,176 @@ def format_duration_human(seconds: int) -> str:
         return f"{minutes}m"
 
 
-def get_today_range() -> tuple[datetime, datetime]:
+def parse_filter_option(text: Optional[str]):
     """
-    Get datetime range for "today" (midnight to midnight).
-    
-    Returns:
-        Tuple of (start_of_today, start_of_tomorrow)
-        
-    Using start of tomorrow as the end bound makes the range exclusive,
-    which is standard for date ranges and avoids off-by-one issues.
+    Parse a --filter option (see filters.py), or exit with the error.
+
+    Returns None if no filter was given.
     """
-    now = datetime.now()
-    
-    # replace() creates a copy with some fields changed
-    # Setting hour/minute/second/microsecond to 0 gives midnight
-    start_of_today = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    
-    # Add one day to get tomorrow's midnight
-    start_of_tomorrow = start_of_today + timedelta(days=1)
-    
-    return start_of_today, start_of_tomorrow
+    if not text:
+        return None
+
+    from filters import FilterError, parse_filter
+
+    try:
+        return parse_filter(text)
+    except FilterError as e:
+        if machine_output():
+            typer.echo(f"Error: {e}", err=True)
+        else:
+            console.print(f"[red]✗[/red]  {e}")
+        raise typer.Exit(code=1)
+
+
+FILTER_HELP = 'Filter expression, e.g. "tag:client AND NOT tag:internal priority<=2 since:2025-01-01"'
 
 
-def get_week_range() -> tuple[datetime, datetime]:
+class _ServedStore:
     """
-    Get datetime range for "this week" (Monday to Sunday).
-    
-    weekday() returns 0 for Monday, 6 for Sunday.
+    db functions run by `tt serve`, or here if it stops answering.
+
+    A read that fails, or a write that never reached the server, is run
+    against the database directly instead. A write the server may have
+    applied before failing isn't repeated (that could do it twice); the
+    command reports the error.
     """
-    now = datetime.now()
-    start_of_today = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    
-    # Go back to Monday by subtracting the weekday number
-    start_of_week = start_of_today - timedelta(days=now.weekday())
-    
-    # Week ends 7 days after it starts
-    end_of_week = start_of_week + timedelta(days=7)
-    
-    return start_of_week, end_of_week
+
+    def __init__(self, client):
+        self._client = client
+
+    def __getattr__(self, name: str):
+        import daemon
+
+        def call(*args, **kwargs):
+            try:
+                return self._client.call(name, *args, **kwargs)
+            except daemon.DaemonError as e:
+                if daemon.SERVED_CALLS[name] and not isinstance(e, daemon.DaemonUnavailable):
+                    console.print(f"[red]✗[/red]  {e} (the change may or may not have been saved)")
+                    raise typer.Exit(code=1)
+            db.init_database()
+            return getattr(db, name)(*args, **kwargs)
+
+        getattr(self._client, name)  # AttributeError for calls it doesn't serve
+        return call
+
+
+def get_store():
+    """
+    Return what the everyday commands should read and write through.
+
+    If `tt serve` is running, that's a client for it: the server already
+    has the database open and cached, so this process skips database
+    setup entirely. Otherwise it's the db module itself (initialized).
+    Both offer the same functions, e.g. store.get_active_sessions().
+    """
+    import daemon
+
+    client = daemon.connect()
+    if client is not None:
+        return _ServedStore(client)
+    db.init_database()
+    return db
+
+
+def _complete(kind: str, incomplete: str) -> list[str]:
+    """
+    Complete a name from the completion cache (see completion.py).
+
+    Only if there's no cache yet does this open the database, which
+    writes one for next time.
+    """
+    names = completion.complete(kind, incomplete)
+    if names is not None:
+        return names
+    try:
+        db.init_database()
+        db.refresh_completion_cache()
+    except Exception:
+        # Completion must never crash the shell (e.g. unreadable database)
+        return []
+    return completion.complete(kind, incomplete) or []
+
+
+def complete_project_name(incomplete: str) -> list[str]:
+    """
+    Shell completion for project name arguments.
+
+    Suggests existing projects matching what's been typed so far,
+    most frequently/recently used first.
+    """
+    return _complete(completion.PROJECTS, incomplete)
+
+
+def complete_tag_name(incomplete: str) -> list[str]:
+    """Shell completion for tag name options."""
+    return _complete(completion.TAGS, incomplete)
+
+
+def resolve_project_name(query: str, candidates: Optional[List[str]] = None, allow_new: bool = False) -> str:
+    """
+    Resolve a possibly misspelled or abbreviated project name.
+
+    An exact name is used as-is. Otherwise the name is matched by prefix,
+    initials ("js" for "Job Search"), substring and finally edit distance.
+    A single confident match is used directly; typos and ambiguous matches
+    ask the user to pick (or fail when not attached to a terminal), so a
+    typo never silently creates a new project.
+
+    Args:
+        query: Project name as typed
+        candidates: Names to match against (default: all projects, most used first)
+        allow_new: If True, offer to use the query as a new project name
+
+    Returns:
+        The resolved project name
+
+    Raises:
+        typer.Exit: If nothing matches (and allow_new is False) or the user cancels
+    """
+    if candidates is None:
+        candidates = db.get_frecent_project_names()
+    if query in candidates:
+        return query
+
+    matches = NameIndex(candidates).fuzzy(query)
+
+    if not matches:
+        if allow_new:
+            return query
+        console.print(f"[red]✗[/red]  No project matching [bold]{query}[/bold]")
+        raise typer.Exit(code=1)
+
+    # One prefix/initials/substring hit is unambiguous enough to just use
+    if len(matches) == 1 and matches[0][1] != MATCH_TYPO:
+        name = matches[0][0]
+        console.print(f"[dim]Using project '{name}'[/dim]")
+        return name
+
+    names = [name for name, _ in matches]
+
+    # No terminal to ask on (scripts, pipes): refuse rather than guess
+    if not sys.stdin.isatty():
+        console.print(
+            f"[yellow]⚠[/yellow]  No project named [bold]{query}[/bold] — did you mean: "
+            + ", ".join(f"[bold]{n}[/bold]" for n in names) + "?"
+        )
+        if allow_new:
+            console.print("   Use [bold]--new[/bold] to create it as a new project")
+        raise typer.Exit(code=1)
+
+    console.print(f"[yellow]?[/yellow]  [bold]{query}[/bold] could be:")
+    for i, name in enumerate(names, start=1):
+        console.print(f"   [cyan]{i}[/cyan]  {name}")
+    if allow_new:
+        console.print(f"   [cyan]0[/cyan]  Create new project [bold]{query}[/bold]")
+
+    choice = typer.prompt(
+        "Choose",
+        type=typer.IntRange(0 if allow_new else 1, len(names)),
+        default=1
+    )
+    return query if choice == 0 else names[choice - 1]
 
 
 # =============================================================================
@@ -140,19 +355,32 @@ def get_week_range() -> tuple[datetime, datetime]:
 
 @app.command()
 def start(
-    project: str = typer.Argument(..., help="Name of the project to track")
+    project: str = typer.Argument(
+        ..., help="Name of the project to track", autocompletion=complete_project_name
+    ),
+    new: bool = typer.Option(
+        False,
+        "--new",
+        help="Create PROJECT as typed without fuzzy-matching existing names"
+    )
 ):
     """
     Start tracking time for a project.
 
     You can track multiple projects simultaneously.
     Starting a project that's already being tracked will show a warning.
+    PROJECT may be abbreviated (prefix or initials) or slightly misspelled.
     """
-    # Initialize database tables if this is first run
-    db.init_database()
+    # Initialize database tables if this is first run (or use tt serve)
+    store = get_store()
+
+    if not new:
+        project = resolve_project_name(
+            project, candidates=store.get_frecent_project_names(), allow_new=True
+        )
 
     # Check if THIS specific project already has an active session
-    active_for_project = db.get_active_session_by_project(project)
+    active_for_project = store.get_active_session_by_project(project)
 
     if active_for_project:
         console.print(
@@ -162,14 +390,14 @@ def start(
         raise typer.Exit(code=1)
 
     # Show other active sessions as info (not blocking)
-    other_active = db.get_active_sessions()
+    other_active = store.get_active_sessions()
     if other_active:
         console.print(
             f"[dim]Note: {len(other_active)} other session(s) are also active[/dim]"
         )
 
     # Start the new session
-    session = db.start_session(project)
+    session = store.start_session(project)
 
     console.print(
         f"[green]▶[/green]  Started tracking [bold]{project}[/bold] "
@@ -181,7 +409,8 @@ def start(
 def stop(
     project: Optional[str] = typer.Argument(
         None,
-        help="Project name to stop (optional - stops most recent if omitted)"
+        help="Project name to stop (optional - stops most recent if omitted)",
+        autocompletion=complete_project_name
     ),
     notes: Optional[str] = typer.Option(
         None,
@@ -195,10 +424,16 @@ def stop(
     If PROJECT is provided, stops that specific project.
     Otherwise, stops the most recently started active session.
     """
-    db.init_database()
+    store = get_store()
+
+    # Only currently tracked projects make sense to match against
+    if project:
+        active_names = [s.project_name for s in store.get_active_sessions()]
+        if active_names:
+            project = resolve_project_name(project, candidates=active_names)
 
     # Try to stop the session
-    session = db.stop_session(project_name=project, notes=notes or "")
+    session = store.stop_session(project_name=project, notes=notes or "")
 
     if session is None:
         if project:
@@ -229,9 +464,9 @@ def stopall(
     """
     Stop ALL active tracking sessions.
     """
-    db.init_database()
+    store = get_store()
 
-    active = db.get_active_sessions()
+    active = store.get_active_sessions()
 
     if not active:
         console.print("[yellow]⚠[/yellow]  No active sessions to stop")
@@ -248,18 +483,21 @@ def stopall(
             console.print("[dim]Cancelled[/dim]")
             return
 
-    stopped = db.stop_all_sessions(notes=notes or "")
+    stopped = store.stop_all_sessions(notes=notes or "")
 
     console.print(f"\n[red]■[/red]  Stopped {len(stopped)} session(s)")
 
 
 @app.command()
 def switch(
-    project: str = typer.Argument(..., help="Project to switch to"),
+    project: str = typer.Argument(
+        ..., help="Project to switch to", autocompletion=complete_project_name
+    ),
     from_project: Optional[str] = typer.Option(
         None,
         "--from", "-f",
-        help="Specific project to switch from (default: most recent)"
+        help="Specific project to switch from (default: most recent)",
+        autocompletion=complete_project_name
     )
 ):
     """
@@ -268,7 +506,15 @@ def switch(
     By default, stops the most recently started session.
     Use --from to specify which project to stop.
     """
-    db.init_database()
+    store = get_store()
+
+    project = resolve_project_name(
+        project, candidates=store.get_frecent_project_names(), allow_new=True
+    )
+    if from_project:
+        active_names = [s.project_name for s in store.get_active_sessions()]
+        if active_names:
+            from_project = resolve_project_name(from_project, candidates=active_names)
 
     # Prevent switching to same project
     if from_project and from_project == project:
@@ -276,13 +522,18 @@ def switch(
         raise typer.Exit(code=1)
 
     # Check if target project is already active
-    if db.get_active_session_by_project(project):
+    if store.get_active_session_by_project(project):
         console.print(f"[yellow]⚠[/yellow]  [bold]{project}[/bold] is already being tracked")
         console.print(f"   Use [bold]tt stop {from_project or '<project>'}[/bold] instead")
         raise typer.Exit(code=1)
 
-    # Stop the source session
-    stopped = db.stop_session(project_name=from_project)
+    # Stop the source session and start the new one in one transaction
+    try:
+        stopped, session = store.switch_session(project, from_project=from_project)
+    except ValueError as e:
+        # Another process started the target between the check and the switch
+        console.print(f"[yellow]⚠[/yellow]  {e}")
+        raise typer.Exit(code=1)
 
     if stopped:
         console.print(
@@ -290,26 +541,52 @@ def switch(
             f"Duration: [bold]{stopped.format_duration()}[/bold]"
         )
 
-    # Start new session
-    session = db.start_session(project)
     console.print(f"[green]▶[/green]  Started tracking [bold]{project}[/bold]")
 
 
 @app.command()
-def status():
+def status(
+    watch: bool = typer.Option(
+        False,
+        "--watch", "-w",
+        help="Keep the display open and update it live (same as tt top)"
+    )
+):
     """
     Show current tracking status.
 
     Displays all active sessions with their durations.
     """
-    db.init_database()
+    if watch:
+        run_dashboard()
+        return
 
-    active_sessions = db.get_active_sessions()
+    store = get_store()
+
+    active_sessions = store.get_active_sessions()
+
+    if machine_output():
+        output.write_rows(
+            output_format,
+            ["project", "start_time", "duration_seconds", "is_paused"],
+            (
+                {
+                    "project": s.project_name,
+                    "start_time": s.start_time.isoformat(),
+                    "duration_seconds": s.duration_seconds,
+                    "is_paused": s.is_paused,
+                }
+                for s in active_sessions
+            )
+        )
+        return
 
     if not active_sessions:
         console.print("[dim]●[/dim]  No active sessions — you're idle")
         return
 
+    from rich.table import Table
+
     # Create table for multiple sessions
     table = Table(title=f"[green]● Active Sessions ({len(active_sessions)})[/green]")
     table.add_column("Project", style="bold")
@@ -328,7 +605,7 @@ def status():
 
 @app.command()
 def log(
-    project: str = typer.Argument(..., help="Project name"),
+    project: str = typer.Argument(..., help="Project name", autocompletion=complete_project_name),
     duration: str = typer.Argument(
         ...,
         help="Duration (e.g., '1h30m', '45m', '2h')"
@@ -351,7 +628,7 @@ def log(
         tt log Reading 45m --notes "Finished chapter 3"
         tt log Exercise 1h --date 2024-01-15
     """
-    db.init_database()
+    store = get_store()
     
     # Parse the duration string into a timedelta
     try:
@@ -376,7 +653,7 @@ def log(
             raise typer.Exit(code=1)
     
     # Create the session
-    session = db.log_session(
+    session = store.log_session(
         project_name=project,
         duration=td,
         notes=notes or "",
@@ -393,12 +670,14 @@ def log(
 def list_sessions(
     project: Optional[str] = typer.Option(
         None, "--project", "-p",
-        help="Filter by project"
+        help="Filter by project",
+        autocompletion=complete_project_name
     ),
     limit: int = typer.Option(
         10, "--limit", "-l",
         help="Number of sessions to show"
-    )
+    ),
+    filter_text: Optional[str] = typer.Option(None, "--filter", "-f", help=FILTER_HELP)
 ):
     """
     List recent sessions.
@@ -410,12 +689,34 @@ def list_sessions(
     actual command name.
     """
     db.init_database()
+    filter_by = parse_filter_option(filter_text)
+
+    if machine_output():
+        # Stream rows straight from the cursor
+        output.write_rows(
+            output_format,
+            ["id", "project", "start_time", "end_time", "duration_seconds", "notes"],
+            (
+                {
+                    "id": row["id"],
+                    "project": row["project_name"],
+                    "start_time": row["start_time"],
+                    "end_time": row["end_time"],
+                    "duration_seconds": row["duration_seconds"],
+                    "notes": row["notes"],
+                }
+                for row in db.iter_sessions(project_name=project, limit=limit, filter_by=filter_by)
+            )
+        )
+        return
     
-    sessions = db.get_sessions(project_name=project, limit=limit)
+    sessions = db.get_sessions(project_name=project, limit=limit, filter_by=filter_by)
     
     if not sessions:
         console.print("[dim]No sessions found[/dim]")
         return
+
+    from rich.table import Table
     
     # Create a Rich table
     table = Table(title="Recent Sessions")
@@ -439,6 +740,97 @@ def list_sessions(
     console.print(table)
 
 
+@app.command()
+def search(
+    query: List[str] = typer.Argument(..., help="Words to find in session notes or project names"),
+    project: Optional[str] = typer.Option(
+        None, "--project", "-p",
+        help="Only search this project's sessions",
+        autocompletion=complete_project_name
+    ),
+    period: str = typer.Option(
+        "all",
+        "--period",
+        help="Time period: today, week, or all"
+    ),
+    limit: int = typer.Option(
+        20, "--limit", "-l",
+        help="Number of sessions to show"
+    )
+):
+    """
+    Find sessions by what their notes say.
+
+    Every word must appear (in any order); the last can be the start of
+    a word. Best matches come first, with the matching part of the notes.
+
+    Examples:
+        tt search henderson contract
+        tt search review --project Alpha --period week
+    """
+    from periods import resolve_period
+    from rich.markup import escape
+
+    db.init_database()
+
+    try:
+        start_date, end_date = resolve_period(period)
+        results = db.search_sessions(
+            " ".join(query),
+            project_name=project,
+            start_date=start_date,
+            end_date=end_date,
+            limit=limit
+        )
+    except ValueError as e:
+        console.print(f"[red]✗[/red]  {e}")
+        raise typer.Exit(code=1)
+
+    if machine_output():
+        output.write_rows(
+            output_format,
+            ["id", "project", "start_time", "end_time", "duration_seconds", "notes", "snippet"],
+            (
+                {
+                    "id": s.id,
+                    "project": s.project_name,
+                    "start_time": s.start_time.isoformat(),
+                    "end_time": s.end_time.isoformat() if s.end_time else None,
+                    "duration_seconds": s.duration_seconds,
+                    "notes": s.notes,
+                    "snippet": snippet.replace(db.SNIPPET_START, "").replace(db.SNIPPET_END, ""),
+                }
+                for s, snippet in results
+            )
+        )
+        return
+
+    if not results:
+        console.print("[dim]No matching sessions[/dim]")
+        return
+
+    from rich.table import Table
+
+    table = Table(title=f"Sessions matching \"{escape(' '.join(query))}\"")
+    table.add_column("Date", style="cyan")
+    table.add_column("Project", style="bold")
+    table.add_column("Duration", justify="right", style="green")
+    table.add_column("Match")
+
+    for s, snippet in results:
+        # Escape the text first, then turn the match marks into markup
+        match = escape(snippet)
+        match = match.replace(db.SNIPPET_START, "[bold yellow]").replace(db.SNIPPET_END, "[/bold yellow]")
+        table.add_row(
+            s.start_time.strftime("%Y-%m-%d %H:%M"),
+            s.project_name,
+            s.format_duration(),
+            match
+        )
+
+    console.print(table)
+
+
 @app.command()
 def summary(
     period: str = typer.Option(
@@ -450,15 +842,25 @@ def summary(
         False,
         "--weekd",
         help="Show time per day of week (Mon-Sun columns)"
-    )
+    ),
+    tree: bool = typer.Option(
+        False,
+        "--tree",
+        help="Show projects as a hierarchy with subtotals (see tt parent)"
+    ),
+    filter_text: Optional[str] = typer.Option(None, "--filter", "-f", help=FILTER_HELP)
 ):
     """
     Show time summary by project.
 
     Displays total time tracked per project for the specified period.
     Results are grouped by priority and sorted by time within each group.
+
+    Example:
+        tt summary --period week --filter "tag:client -internal"
     """
     db.init_database()
+    filter_by = parse_filter_option(filter_text)
 
     # Determine date range based on period
     start_date = None
@@ -472,10 +874,27 @@ def summary(
     elif period.lower() == "all":
         pass  # No date filter
     else:
+        if machine_output():
+            typer.echo(f"Error: unknown period: {period} (use today, week, or all)", err=True)
+            raise typer.Exit(code=1)
         console.print(f"[red]✗[/red]  Unknown period: {period}")
         console.print("   Use: today, week, or all")
         raise typer.Exit(code=1)
 
+    if tree and weekd:
+        console.print("[red]✗[/red]  --tree and --weekd can't be combined")
+        raise typer.Exit(code=1)
+
+    if tree:
+        _print_summary_tree(start_date, end_date, period_label, filter_by)
+        return
+
+    if machine_output():
+        _write_summary_rows(start_date, end_date, weekd, filter_by)
+        return
+
+    from rich.table import Table
+
     priority_colors = {1: "red", 2: "yellow", 3: "white", 4: "blue", 5: "dim"}
     priority_labels = {1: "Critical", 2: "High", 3: "Medium", 4: "Low", 5: "Very Low"}
 
@@ -486,7 +905,7 @@ def summary(
             start_date, end_date = get_week_range()
             period_label = "Week"
 
-        data = db.get_summary_by_day(start_date=start_date, end_date=end_date)
+        data = db.get_summary_by_day(start_date=start_date, end_date=end_date, filter_by=filter_by)
 
         if not data:
             console.print(f"[dim]No sessions found for {period_label.lower()}[/dim]")
@@ -554,7 +973,7 @@ def summary(
         console.print(table)
     else:
         # Standard view with priority column
-        data = db.get_summary_with_priority(start_date=start_date, end_date=end_date)
+        data = db.get_summary_with_priority(start_date=start_date, end_date=end_date, filter_by=filter_by)
 
         if not data:
             console.print(f"[dim]No sessions found for {period_label.lower()}[/dim]")
@@ -604,85 +1023,658 @@ def summary(
         console.print(table)
 
 
-@app.command()
-def projects(
-    filter_tag: Optional[str] = typer.Option(None, "--tag", "-t", help="Filter by tag"),
-    filter_priority: Optional[int] = typer.Option(None, "--priority", "-p", help="Filter by max priority (1-5)")
+def _print_summary_tree(
+    start_date: Optional[datetime],
+    end_date: Optional[datetime],
+    period_label: str,
+    filter_by=None
 ):
-    """
-    List all projects with their priority and tags.
-    """
-    db.init_database()
-
-    project_list = db.list_projects(tag=filter_tag, min_priority=filter_priority)
-
-    if not project_list:
-        console.print("[dim]No projects found[/dim]")
+    """Print `tt summary --tree`: each project with its own and subtree time."""
+    nodes = db.get_summary_tree(start_date=start_date, end_date=end_date, filter_by=filter_by)
+
+    if machine_output():
+        output.write_rows(
+            output_format,
+            ["project", "parent", "depth", "priority", "is_background", "own_seconds", "total_seconds"],
+            (
+                {
+                    "project": node["name"],
+                    "parent": node["parent"],
+                    "depth": node["depth"],
+                    "priority": node["priority"],
+                    "is_background": node["is_background"],
+                    "own_seconds": node["own_seconds"],
+                    "total_seconds": node["total_seconds"],
+                }
+                for node in nodes
+            )
+        )
         return
 
-    table = Table(title="Projects")
-    table.add_column("Name", style="bold")
-    table.add_column("Priority", justify="center")
-    table.add_column("Tags", style="cyan")
+    if not nodes:
+        console.print(f"[dim]No sessions found for {period_label.lower()}[/dim]")
+        return
 
-    priority_colors = {1: "red", 2: "yellow", 3: "white", 4: "blue", 5: "dim"}
-    priority_labels = {1: "Critical", 2: "High", 3: "Medium", 4: "Low", 5: "Very Low"}
+    from rich.table import Table
+
+    table = Table(title=f"Summary — {period_label}")
+    table.add_column("Project")
+    table.add_column("Own", justify="right", style="dim")
+    table.add_column("Total", justify="right", style="green")
+    table.add_column("Hours", justify="right", style="cyan")
+
+    total_seconds = 0
+    for node in nodes:
+        if node["depth"] == 0:
+            total_seconds += node["total_seconds"]
+        # Parents in bold; their Own column is time logged on the parent itself
+        indent = "   " * node["depth"]
+        name = f"[bold]{node['name']}[/bold]" if node["has_children"] else node["name"]
+        table.add_row(
+            indent + name,
+            format_duration_human(node["own_seconds"]) if node["has_children"] else "",
+            format_duration_human(node["total_seconds"]),
+            f"{node['total_seconds'] / 3600:.2f}"
+        )
 
-    for p in project_list:
-        color = priority_colors.get(p.priority, "white")
-        priority_str = f"[{color}]{p.priority} ({priority_labels.get(p.priority, 'Medium')})[/{color}]"
-        tags_str = ", ".join(p.tags) if p.tags else "[dim]-[/dim]"
-        table.add_row(p.name, priority_str, tags_str)
+    table.add_section()
+    table.add_row(
+        "[bold]TOTAL[/bold]",
+        "",
+        f"[bold]{format_duration_human(total_seconds)}[/bold]",
+        f"[bold]{total_seconds / 3600:.2f}[/bold]"
+    )
 
     console.print(table)
 
 
-@app.command()
-def export(
-    output: str = typer.Option(
-        "timetrack_export.csv",
-        "--output", "-o",
-        help="Output file path"
-    )
-):
-    """
-    Export all sessions to a CSV file.
-    
-    The CSV can be opened in Excel, Google Sheets, or any spreadsheet app.
-    """
-    db.init_database()
-    
-    # Resolve to absolute path for clarity
-    filepath = Path(output).resolve()
-    
-    db.export_sessions_csv(str(filepath))
-    
-    console.print(f"[green]✓[/green]  Exported to: {filepath}")
+def _write_summary_rows(start_date: Optional[datetime], end_date: Optional[datetime], weekd: bool, filter_by=None):
+    """Write `tt summary` data in the current machine output format."""
+    if weekd:
+        if start_date is None or end_date is None:
+            start_date, end_date = get_week_range()
+
+        day_dates = [
+            (start_date + timedelta(days=i)).strftime("%Y-%m-%d")
+            for i in range((end_date - start_date).days)
+        ][:7]
+
+        data = db.get_summary_by_day(start_date=start_date, end_date=end_date, filter_by=filter_by)
+        output.write_rows(
+            output_format,
+            ["project", "priority", "is_background", *day_dates, "total_seconds"],
+            (
+                {
+                    "project": name,
+                    "priority": info["priority"],
+                    "is_background": info["is_background"],
+                    **{d: info["days"].get(d, 0) for d in day_dates},
+                    "total_seconds": info["total"],
+                }
+                for name, info in data.items()
+            )
+        )
+    else:
+        data = db.get_summary_with_priority(start_date=start_date, end_date=end_date, filter_by=filter_by)
+        output.write_rows(
+            output_format,
+            ["project", "priority", "is_background", "seconds", "hours"],
+            (
+                {
+                    "project": name,
+                    "priority": info["priority"],
+                    "is_background": info["is_background"],
+                    "seconds": info["seconds"],
+                    "hours": round(info["seconds"] / 3600, 2),
+                }
+                for name, info in data.items()
+            )
+        )
 
 
 @app.command()
-def cancel(
-    project: Optional[str] = typer.Argument(
-        None,
-        help="Project to cancel (optional - cancels most recent if omitted)"
-    )
+def rollup(
+    paths: List[Path] = typer.Argument(..., help="Database files, or folders to search for *.db files"),
+    period: str = typer.Option(
+        "week",
+        "--period", "-p",
+        help="Time period: today, week, or all"
+    ),
+    by: str = typer.Option("project", "--by", "-b", help="Group by: project, tag, or day"),
+    workers: Optional[int] = typer.Option(None, "--workers", "-w", help="Worker processes (default: one per CPU)")
 ):
     """
-    Cancel an active session without saving.
+    Combine time from many people's databases into one summary.
 
-    Use this when you started tracking by mistake.
+    Point it at a folder of timetrack.db files (one per person) to see
+    the team's time per project, tag or day. Each database is read-only
+    and summarized in its own worker process.
+
+    Examples:
+        tt rollup team/
+        tt rollup team/ --period all --by tag
     """
-    db.init_database()
+    import rollup as rollup_module
+    from periods import resolve_period
 
-    if project:
-        active = db.get_active_session_by_project(project)
-    else:
-        active = db.get_active_session()
+    try:
+        start_date, end_date = resolve_period(period)
+    except ValueError as e:
+        console.print(f"[red]✗[/red]  {e}")
+        raise typer.Exit(code=1)
+    if by not in ("project", "tag", "day"):
+        console.print(f"[red]✗[/red]  Unknown grouping: {by} (use project, tag, or day)")
+        raise typer.Exit(code=1)
 
-    if active is None:
-        if project:
-            console.print(f"[yellow]⚠[/yellow]  No active session for [bold]{project}[/bold]")
-        else:
+    databases = rollup_module.find_databases(paths)
+    if not databases:
+        console.print("[red]✗[/red]  No databases found")
+        raise typer.Exit(code=1)
+
+    result = rollup_module.rollup(databases, start_date, end_date, max_workers=workers)
+
+    for path, message in result["errors"].items():
+        if machine_output():
+            typer.echo(f"Warning: skipped {path}: {message}", err=True)
+        else:
+            console.print(f"[yellow]⚠[/yellow]  Skipped {path}: {message}")
+
+    if machine_output():
+        if by == "project":
+            columns = ["project", "priority", "is_background", "people", "seconds", "hours"]
+            rows = (
+                {
+                    "project": name,
+                    "priority": info["priority"],
+                    "is_background": info["is_background"],
+                    "people": info["people"],
+                    "seconds": info["total"],
+                    "hours": round(info["total"] / 3600, 2),
+                }
+                for name, info in result["projects"].items()
+            )
+        elif by == "tag":
+            columns = ["tag", "projects", "seconds", "hours"]
+            rows = (
+                {
+                    "tag": name,
+                    "projects": len(info["projects"]),
+                    "seconds": info["total"],
+                    "hours": round(info["total"] / 3600, 2),
+                }
+                for name, info in result["tags"].items()
+            )
+        else:
+            columns = ["date", "seconds", "hours"]
+            rows = (
+                {"date": day, "seconds": seconds, "hours": round(seconds / 3600, 2)}
+                for day, seconds in result["days"].items()
+            )
+        output.write_rows(output_format, columns, rows)
+        return
+
+    if not result["days"]:
+        console.print(f"[dim]No sessions found for {period.lower()} in {len(result['databases'])} database(s)[/dim]")
+        return
+
+    from rich.table import Table
+
+    table = Table(title=f"Rollup — {period.capitalize()} ({len(result['databases'])} databases)")
+    if by == "project":
+        priority_labels = {1: "Critical", 2: "High", 3: "Medium", 4: "Low", 5: "Very Low"}
+        table.add_column("Project", style="bold")
+        table.add_column("Priority", justify="center")
+        table.add_column("People", justify="right")
+        table.add_column("Time", justify="right", style="green")
+        table.add_column("Hours", justify="right", style="cyan")
+        for name, info in result["projects"].items():
+            priority = "bg" if info["is_background"] else f"{info['priority']} ({priority_labels.get(info['priority'], 'Medium')})"
+            table.add_row(
+                name,
+                priority,
+                str(info["people"]),
+                format_duration_human(info["total"]),
+                f"{info['total'] / 3600:.2f}"
+            )
+    elif by == "tag":
+        table.add_column("Tag", style="bold")
+        table.add_column("Projects", justify="right")
+        table.add_column("Time", justify="right", style="green")
+        table.add_column("Hours", justify="right", style="cyan")
+        for name, info in result["tags"].items():
+            table.add_row(
+                name,
+                str(len(info["projects"])),
+                format_duration_human(info["total"]),
+                f"{info['total'] / 3600:.2f}"
+            )
+    else:
+        table.add_column("Date", style="bold")
+        table.add_column("Time", justify="right", style="green")
+        table.add_column("Hours", justify="right", style="cyan")
+        for day, seconds in result["days"].items():
+            table.add_row(day, format_duration_human(seconds), f"{seconds / 3600:.2f}")
+
+    # Tags overlap (a project can have several), so only total real time
+    total_seconds = sum(result["days"].values())
+    table.add_section()
+    total_row = ["[bold]TOTAL[/bold]"] + [""] * (len(table.columns) - 3)
+    total_row += [f"[bold]{format_duration_human(total_seconds)}[/bold]", f"[bold]{total_seconds / 3600:.2f}[/bold]"]
+    table.add_row(*total_row)
+
+    console.print(table)
+
+
+@app.command()
+def projects(
+    filter_tag: Optional[str] = typer.Option(
+        None, "--tag", "-t", help="Filter by tag", autocompletion=complete_tag_name
+    ),
+    filter_priority: Optional[int] = typer.Option(None, "--priority", "-p", help="Filter by max priority (1-5)"),
+    filter_text: Optional[str] = typer.Option(None, "--filter", "-f", help='Filter expression, e.g. "tag:client priority<=2"')
+):
+    """
+    List all projects with their priority and tags.
+    """
+    db.init_database()
+    filter_by = parse_filter_option(filter_text)
+
+    try:
+        project_list = db.list_projects(tag=filter_tag, min_priority=filter_priority, filter_by=filter_by)
+    except ValueError as e:
+        console.print(f"[red]✗[/red]  {e}")
+        raise typer.Exit(code=1)
+
+    if machine_output():
+        output.write_rows(
+            output_format,
+            ["name", "priority", "is_background", "tags"],
+            (
+                {
+                    "name": p.name,
+                    "priority": None if p.is_background else p.priority,
+                    "is_background": p.is_background,
+                    "tags": p.tags,
+                }
+                for p in project_list
+            )
+        )
+        return
+
+    if not project_list:
+        console.print("[dim]No projects found[/dim]")
+        return
+
+    from rich.table import Table
+
+    table = Table(title="Projects")
+    table.add_column("Name", style="bold")
+    table.add_column("Priority", justify="center")
+    table.add_column("Tags", style="cyan")
+
+    priority_colors = {1: "red", 2: "yellow", 3: "white", 4: "blue", 5: "dim"}
+    priority_labels = {1: "Critical", 2: "High", 3: "Medium", 4: "Low", 5: "Very Low"}
+
+    for p in project_list:
+        color = priority_colors.get(p.priority, "white")
+        priority_str = f"[{color}]{p.priority} ({priority_labels.get(p.priority, 'Medium')})[/{color}]"
+        tags_str = ", ".join(p.tags) if p.tags else "[dim]-[/dim]"
+        table.add_row(p.name, priority_str, tags_str)
+
+    console.print(table)
+
+
+@app.command()
+def export(
+    output: Optional[str] = typer.Option(
+        None,
+        "--output", "-o",
+        help="Output file path (default: timetrack_export.csv, or timetrack_changes.csv with --incremental)"
+    ),
+    incremental: bool = typer.Option(
+        False,
+        "--incremental", "-i",
+        help="Append only sessions added, edited or deleted since the last incremental export"
+    ),
+    feed: str = typer.Option(
+        "default",
+        "--feed",
+        help="Name of the incremental export (each feed remembers its own progress)"
+    ),
+    partition_by: Optional[str] = typer.Option(
+        None,
+        "--partition-by",
+        help="Write one file per month, project, or tag into a folder, with a manifest.json"
+    ),
+    period: str = typer.Option(
+        "all",
+        "--period", "-p",
+        help="With --partition-by: time period to export (today, week, or all)"
+    ),
+    jobs: Optional[int] = typer.Option(
+        None,
+        "--jobs", "-j",
+        help="With --partition-by: worker processes (default: one per CPU)"
+    ),
+    filter_text: Optional[str] = typer.Option(None, "--filter", "-f", help=FILTER_HELP)
+):
+    """
+    Export all sessions to a CSV file.
+    
+    The CSV can be opened in Excel, Google Sheets, or any spreadsheet app.
+
+    With --incremental, rows are appended for just what changed since the
+    previous incremental run, each marked "upsert" or "delete" and keyed
+    by session UUID, so a pipeline can apply them as corrections. Feeds
+    write to their own file (timetrack_changes.csv, or
+    timetrack_changes_<feed>.csv for a named feed) unless --output is given.
+
+    With --partition-by, --output names a folder (a .csv extension is
+    dropped) that gets one CSV per partition, written in parallel.
+
+    Examples:
+        tt export --partition-by month -o accounts/
+        tt export --partition-by project --jobs 4
+    """
+    db.init_database()
+    filter_by = parse_filter_option(filter_text)
+    
+    if output is None:
+        if not incremental:
+            output = "timetrack_export.csv"
+        elif feed == "default":
+            output = "timetrack_changes.csv"
+        else:
+            output = f"timetrack_changes_{feed}.csv"
+
+    # Resolve to absolute path for clarity
+    filepath = Path(output).resolve()
+
+    if incremental and filter_by:
+        # A filtered feed would miss corrections for rows that stop matching
+        console.print("[red]✗[/red]  --incremental can't be combined with --filter")
+        raise typer.Exit(code=1)
+
+    if partition_by:
+        import partition_export
+        from periods import resolve_period
+
+        if incremental:
+            console.print("[red]✗[/red]  --incremental can't be combined with --partition-by")
+            raise typer.Exit(code=1)
+        try:
+            start_date, end_date = resolve_period(period)
+            folder = filepath.with_suffix("") if filepath.suffix.lower() == ".csv" else filepath
+            manifest = partition_export.export_partitioned(
+                folder, partition_by, start_date, end_date, max_workers=jobs, filter_by=filter_by
+            )
+        except ValueError as e:
+            console.print(f"[red]✗[/red]  {e}")
+            raise typer.Exit(code=1)
+
+        console.print(
+            f"[green]✓[/green]  Exported {manifest['rows']} session(s) into "
+            f"{len(manifest['files'])} file(s) in: {folder}"
+        )
+        return
+
+    if incremental:
+        try:
+            count = db.export_sessions_incremental(str(filepath), feed=feed)
+        except ValueError as e:
+            console.print(f"[red]✗[/red]  {e}")
+            raise typer.Exit(code=1)
+        console.print(f"[green]✓[/green]  Appended {count} change(s) to: {filepath}")
+        return
+    
+    db.export_sessions_csv(str(filepath), filter_by=filter_by)
+    
+    console.print(f"[green]✓[/green]  Exported to: {filepath}")
+
+
+@app.command()
+def invoice(
+    month: Optional[str] = typer.Option(
+        None, "--month", "-m", help="Month to bill, as YYYY-MM (default: this month)"
+    ),
+    period: Optional[str] = typer.Option(
+        None, "--period", "-p", help="Bill a period instead: today, week, or all"
+    ),
+    filter_text: Optional[str] = typer.Option(None, "--filter", "-f", help=FILTER_HELP),
+    output_file: Optional[str] = typer.Option(
+        None, "--output", "-o", help="Also write the invoice to this CSV file"
+    )
+):
+    """
+    Billed time and amounts per project (see tt rate).
+
+    Each session is rounded up to its project's increment and minimum,
+    not counting paused time. Time on projects without a rate is shown
+    as unbilled.
+
+    Examples:
+        tt invoice --month 2025-03
+        tt invoice --filter "under:Acme" -o acme-march.csv
+    """
+    from periods import get_month_range, resolve_period
+
+    db.init_database()
+    filter_by = parse_filter_option(filter_text)
+
+    if month and period:
+        console.print("[red]✗[/red]  Give --month or --period, not both")
+        raise typer.Exit(code=1)
+
+    try:
+        if period:
+            start_date, end_date = resolve_period(period)
+            title = period.capitalize()
+        else:
+            start_date, end_date = get_month_range(month)
+            title = start_date.strftime("%B %Y")
+    except ValueError as e:
+        console.print(f"[red]✗[/red]  {e}")
+        raise typer.Exit(code=1)
+
+    billing = db.compute_billing(start_date, end_date, filter_by=filter_by)
+
+    if output_file:
+        filepath = Path(output_file).resolve()
+        db.export_invoice_csv(str(filepath), billing, title=f"Invoice — {title}")
+
+    if machine_output():
+        output.write_rows(
+            output_format,
+            ["project", "sessions", "actual_seconds", "billed_seconds",
+             "increment_minutes", "minimum_minutes", "rate", "amount"],
+            ({"project": name, **line} for name, line in billing["projects"].items())
+        )
+        return
+
+    if not billing["projects"]:
+        console.print(f"[dim]Nothing to bill for {title}[/dim]")
+    else:
+        from rich.table import Table
+
+        table = Table(title=f"Invoice — {title}")
+        table.add_column("Project", style="bold")
+        table.add_column("Sessions", justify="right")
+        table.add_column("Worked", justify="right", style="dim")
+        table.add_column("Billed", justify="right")
+        table.add_column("Rate", justify="right")
+        table.add_column("Amount", justify="right", style="green")
+
+        for name, line in billing["projects"].items():
+            table.add_row(
+                name,
+                str(line["sessions"]),
+                f"{line['actual_seconds'] / 3600:.2f}h",
+                f"{line['billed_seconds'] / 3600:.2f}h",
+                f"{line['rate']:.2f}",
+                f"{line['amount']:.2f}"
+            )
+
+        table.add_section()
+        table.add_row(
+            "[bold]Total[/bold]",
+            "",
+            f"{billing['actual_seconds'] / 3600:.2f}h",
+            f"[bold]{billing['billed_seconds'] / 3600:.2f}h[/bold]",
+            "",
+            f"[bold]{billing['amount']:.2f}[/bold]"
+        )
+        console.print(table)
+
+    if billing["unbilled_seconds"]:
+        console.print(
+            f"[yellow]⚠[/yellow]  {format_duration_human(billing['unbilled_seconds'])} "
+            f"on projects without a rate (see tt rate)"
+        )
+
+    if output_file:
+        console.print(f"[green]✓[/green]  Invoice written to: {filepath}")
+
+
+@app.command()
+def archive(
+    before: Optional[str] = typer.Option(
+        None,
+        "--before", "-b",
+        help="Archive sessions that started before this date (YYYY-MM-DD)"
+    )
+):
+    """
+    Move old sessions out of the main database into yearly archive files.
+
+    Archived sessions still show up in all-time summaries, history and
+    exports; day and week views skip the archives entirely. Without
+    --before, lists the existing archives.
+
+    Example:
+        tt archive --before 2025-01-01
+    """
+    db.init_database()
+
+    if before is None:
+        years = db.list_archive_years()
+        if not years:
+            console.print("[dim]No archives yet (use --before DATE to create them)[/dim]")
+            return
+        for year in years:
+            path = db.get_archive_path(year)
+            console.print(f"  {year}  {path}  [dim]({path.stat().st_size / 1024:.0f} KB)[/dim]")
+        return
+
+    try:
+        cutoff = datetime.strptime(before, "%Y-%m-%d")
+    except ValueError:
+        console.print(f"[red]✗[/red]  Invalid date format: {before}")
+        console.print("   Use: YYYY-MM-DD (e.g., 2025-01-01)")
+        raise typer.Exit(code=1)
+
+    moved = db.archive_sessions(cutoff)
+    if not moved:
+        console.print(f"[dim]No closed sessions before {before}[/dim]")
+        return
+
+    for year, count in moved.items():
+        console.print(f"[green]✓[/green]  Archived {count} session(s) from {year} to {db.get_archive_path(year).name}")
+
+
+@app.command()
+def compact(
+    older_than: Optional[int] = typer.Option(
+        None,
+        "--older-than",
+        help="Compact days older than this many days (default: 365, or the saved value)"
+    ),
+    dry_run: bool = typer.Option(False, "--dry-run", help="Only show what would be compacted"),
+    export_path: Optional[Path] = typer.Option(
+        None,
+        "--export", "-e",
+        help="Where to save the removed sessions (default: the data directory)"
+    ),
+    save: bool = typer.Option(False, "--save", help="Remember --older-than as the default"),
+    restore: Optional[Path] = typer.Option(
+        None,
+        "--restore",
+        help="Undo a compaction using its export file"
+    )
+):
+    """
+    Merge old sessions into one record per project per day.
+
+    Summaries report the same totals afterwards; only the individual
+    session times on those days are lost. The removed sessions are saved
+    to a JSON file first, and --restore puts them back.
+
+    Examples:
+        tt compact --dry-run
+        tt compact --older-than 180 --save
+        tt compact --restore ~/.timetrack/compaction_20250101_120000.json
+    """
+    db.init_database()
+
+    if restore is not None:
+        try:
+            count = db.restore_compaction(restore)
+        except ValueError as e:
+            console.print(f"[red]✗[/red]  {e}")
+            raise typer.Exit(code=1)
+        console.print(f"[green]✓[/green]  Restored {count} session(s)")
+        return
+
+    if older_than is not None and older_than < 1:
+        console.print("[red]✗[/red]  --older-than must be at least 1 day")
+        raise typer.Exit(code=1)
+    if save and older_than is not None:
+        db.set_setting("compact_horizon_days", str(older_than))
+
+    horizon = older_than if older_than is not None else db.get_compact_horizon_days()
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    before = today - timedelta(days=horizon)
+
+    report = db.compact_sessions(before, export_path=export_path, dry_run=dry_run)
+    if not report["days"]:
+        console.print(f"[dim]Nothing to compact before {before.strftime('%Y-%m-%d')}[/dim]")
+        return
+
+    summary_line = (
+        f"{report['sessions']} session(s) on {report['days']} project-day(s) "
+        f"before {before.strftime('%Y-%m-%d')} → {report['rows']} record(s)"
+    )
+    if dry_run:
+        console.print(f"[dim]Would compact[/dim] {summary_line}")
+        return
+
+    console.print(f"[green]✓[/green]  Compacted {summary_line}")
+    console.print(f"   Removed sessions saved to {report['export']}")
+
+
+@app.command()
+def cancel(
+    project: Optional[str] = typer.Argument(
+        None,
+        help="Project to cancel (optional - cancels most recent if omitted)",
+        autocompletion=complete_project_name
+    )
+):
+    """
+    Cancel an active session without saving.
+
+    Use this when you started tracking by mistake.
+    """
+    db.init_database()
+
+    if project:
+        active = db.get_active_session_by_project(project)
+    else:
+        active = db.get_active_session()
+
+    if active is None:
+        if project:
+            console.print(f"[yellow]⚠[/yellow]  No active session for [bold]{project}[/bold]")
+        else:
             console.print("[yellow]⚠[/yellow]  No active session to cancel")
         return
 
@@ -745,9 +1737,13 @@ def delete(
 
 @app.command()
 def tag(
-    project: str = typer.Argument(..., help="Project name"),
-    add: Optional[List[str]] = typer.Option(None, "--add", "-a", help="Tag(s) to add"),
-    remove: Optional[List[str]] = typer.Option(None, "--remove", "-r", help="Tag(s) to remove")
+    project: str = typer.Argument(..., help="Project name", autocompletion=complete_project_name),
+    add: Optional[List[str]] = typer.Option(
+        None, "--add", "-a", help="Tag(s) to add", autocompletion=complete_tag_name
+    ),
+    remove: Optional[List[str]] = typer.Option(
+        None, "--remove", "-r", help="Tag(s) to remove", autocompletion=complete_tag_name
+    )
 ):
     """
     Manage tags for a project.
@@ -758,6 +1754,8 @@ def tag(
     """
     db.init_database()
 
+    project = resolve_project_name(project)
+
     p = db.get_project(project)
     if p is None:
         console.print(f"[red]✗[/red]  Project [bold]{project}[/bold] not found")
@@ -784,7 +1782,7 @@ def tag(
 
 @app.command()
 def priority(
-    project: str = typer.Argument(..., help="Project name"),
+    project: str = typer.Argument(..., help="Project name", autocompletion=complete_project_name),
     level: int = typer.Argument(..., help="Priority level (1-5, where 1 is highest)")
 ):
     """
@@ -799,6 +1797,8 @@ def priority(
     """
     db.init_database()
 
+    project = resolve_project_name(project)
+
     if not 1 <= level <= 5:
         console.print("[red]✗[/red]  Priority must be between 1 and 5")
         raise typer.Exit(code=1)
@@ -816,6 +1816,270 @@ def priority(
     )
 
 
+@app.command()
+def parent(
+    project: str = typer.Argument(..., help="Project to move", autocompletion=complete_project_name),
+    parent_project: Optional[str] = typer.Argument(
+        None, help="Project to put it under", autocompletion=complete_project_name
+    ),
+    top: bool = typer.Option(False, "--top", help="Make it a top-level project again")
+):
+    """
+    Put a project under another one (client -> matter -> task).
+
+    Everything under the project moves with it. Without a parent (and
+    without --top), shows where the project currently sits.
+
+    Examples:
+        tt parent "Henderson" "Acme Corp"
+        tt parent "Discovery" "Henderson"
+        tt parent "Henderson" --top
+    """
+    db.init_database()
+
+    project = resolve_project_name(project)
+
+    if parent_project is None and not top:
+        path = db.get_project_path(project)
+        if not path:
+            console.print(f"[red]✗[/red]  Project [bold]{project}[/bold] not found")
+            raise typer.Exit(code=1)
+        console.print(" → ".join(f"[bold]{name}[/bold]" for name in path))
+        return
+
+    if parent_project is not None and top:
+        console.print("[red]✗[/red]  Give a parent or --top, not both")
+        raise typer.Exit(code=1)
+
+    parent_name = resolve_project_name(parent_project) if parent_project else None
+
+    try:
+        moved = db.set_project_parent(project, parent_name)
+    except ValueError as e:
+        console.print(f"[red]✗[/red]  {e}")
+        raise typer.Exit(code=1)
+
+    if moved is None:
+        console.print(f"[red]✗[/red]  Project [bold]{project}[/bold] not found")
+        raise typer.Exit(code=1)
+
+    if parent_name is None:
+        console.print(f"[green]✓[/green]  [bold]{project}[/bold] is now a top-level project")
+    else:
+        path = " → ".join(db.get_project_path(project))
+        console.print(f"[green]✓[/green]  Moved [bold]{project}[/bold]: {path}")
+
+
+@app.command()
+def rate(
+    project: Optional[str] = typer.Argument(
+        None, help="Project to bill (omit to list billing rates)", autocompletion=complete_project_name
+    ),
+    hourly_rate: Optional[float] = typer.Argument(None, help="Rate per hour"),
+    increment: Optional[int] = typer.Option(
+        None, "--increment", help="Round each session up to this many minutes (e.g. 6; 0 removes it)"
+    ),
+    minimum: Optional[int] = typer.Option(
+        None, "--minimum", help="Bill at least this many minutes per session (0 removes it)"
+    ),
+    clear: bool = typer.Option(False, "--clear", help="Remove the project's own rate and rounding")
+):
+    """
+    Set a project's hourly rate and rounding for invoices.
+
+    Projects without their own rate use the nearest parent's (see
+    tt parent), so a rate set on a client covers all its matters.
+    Changing the rate keeps the rounding already set; --increment 0 or
+    --minimum 0 removes it.
+
+    Examples:
+        tt rate                                 # list rates
+        tt rate "Acme Corp" 250 --increment 6
+        tt rate "Henderson" 300 --minimum 15
+        tt rate "Henderson" --clear
+    """
+    db.init_database()
+
+    if project is None:
+        terms = db.get_billing_terms()
+
+        if machine_output():
+            output.write_rows(
+                output_format,
+                ["project", "rate", "increment_minutes", "minimum_minutes", "inherited"],
+                ({"project": name, **t} for name, t in terms.items())
+            )
+            return
+
+        if not terms:
+            console.print("[dim]No billing rates set[/dim]")
+            return
+
+        from rich.table import Table
+
+        table = Table(title="Billing Rates")
+        table.add_column("Project", style="bold")
+        table.add_column("Rate", justify="right")
+        table.add_column("Increment", justify="right")
+        table.add_column("Minimum", justify="right")
+
+        for name, t in terms.items():
+            rate_str = f"{t['rate']:.2f}"
+            if t["inherited"]:
+                rate_str = f"[dim]{rate_str}[/dim]"
+            table.add_row(
+                name,
+                rate_str,
+                f"{t['increment_minutes']}m" if t["increment_minutes"] else "[dim]-[/dim]",
+                f"{t['minimum_minutes']}m" if t["minimum_minutes"] else "[dim]-[/dim]"
+            )
+
+        console.print(table)
+        console.print("[dim]Dimmed rates come from a parent project[/dim]")
+        return
+
+    project = resolve_project_name(project)
+
+    if clear:
+        if hourly_rate is not None or increment is not None or minimum is not None:
+            console.print("[red]✗[/red]  Give a rate or --clear, not both")
+            raise typer.Exit(code=1)
+    elif hourly_rate is None:
+        console.print("[red]✗[/red]  Give a rate per hour (or --clear)")
+        raise typer.Exit(code=1)
+
+    try:
+        if clear:
+            updated = db.set_project_billing(project, None, 0, 0)
+        else:
+            updated = db.set_project_billing(project, hourly_rate, increment, minimum)
+    except ValueError as e:
+        console.print(f"[red]✗[/red]  {e}")
+        raise typer.Exit(code=1)
+
+    if not updated:
+        console.print(f"[red]✗[/red]  Project [bold]{project}[/bold] not found")
+        raise typer.Exit(code=1)
+
+    if clear:
+        console.print(f"[green]✓[/green]  Cleared billing for [bold]{project}[/bold]")
+        return
+
+    # Show the rounding that applies now, including any kept or inherited
+    terms = db.get_billing_terms()[project]
+    details = []
+    if terms["increment_minutes"]:
+        details.append(f"{terms['increment_minutes']}-minute increments")
+    if terms["minimum_minutes"]:
+        details.append(f"{terms['minimum_minutes']}-minute minimum")
+    suffix = f" ({', '.join(details)})" if details else ""
+    console.print(f"[green]✓[/green]  [bold]{project}[/bold] billed at {hourly_rate:.2f}/hour{suffix}")
+
+
+@app.command()
+def budget(
+    project: Optional[str] = typer.Argument(
+        None, help="Project to budget (omit to show progress)", autocompletion=complete_project_name
+    ),
+    hours: Optional[float] = typer.Argument(None, help="Hours allowed per period"),
+    period: str = typer.Option("week", "--period", "-p", help="Budget period: week, month, or total"),
+    clear: bool = typer.Option(False, "--clear", help="Remove the project's budget for the period")
+):
+    """
+    Set hour budgets on projects and show how much is used.
+
+    Progress includes sessions still running. The GUI shows it on the
+    Timer cards and in the status bar.
+
+    Examples:
+        tt budget                               # show progress
+        tt budget "Acme Corp" 10                # 10 hours a week
+        tt budget "Thesis" 40 --period month
+        tt budget "Thesis" --period month --clear
+    """
+    import budgets
+
+    db.init_database()
+
+    if project is None:
+        progress = budgets.combine(db.get_budget_progress(), db.get_active_sessions())
+        rows = [p for project_progress in progress.values() for p in project_progress]
+
+        if machine_output():
+            output.write_rows(
+                output_format,
+                ["project", "period", "budget_seconds", "used_seconds", "remaining_seconds"],
+                (
+                    {
+                        "project": p.project_name,
+                        "period": p.period,
+                        "budget_seconds": p.budget_seconds,
+                        "used_seconds": p.used_seconds,
+                        "remaining_seconds": p.remaining_seconds,
+                    }
+                    for p in rows
+                )
+            )
+            return
+
+        if not rows:
+            console.print("[dim]No budgets set[/dim]")
+            return
+
+        from rich.table import Table
+
+        table = Table(title="Budgets")
+        table.add_column("Project", style="bold")
+        table.add_column("Period")
+        table.add_column("Used", justify="right")
+        table.add_column("Budget", justify="right")
+        table.add_column("Left", justify="right")
+        table.add_column("%", justify="right")
+
+        for p in rows:
+            color = "red" if p.is_over else "yellow" if p.fraction >= 0.8 else "green"
+            left = format_duration_human(abs(p.remaining_seconds))
+            table.add_row(
+                p.project_name,
+                budgets.PERIOD_LABELS[p.period],
+                format_duration_human(p.used_seconds),
+                f"{p.budget_seconds / 3600:g}h",
+                f"[red]{left} over[/red]" if p.is_over else left,
+                f"[{color}]{p.fraction:.0%}[/{color}]"
+            )
+
+        console.print(table)
+        return
+
+    project = resolve_project_name(project)
+
+    if clear:
+        if hours is not None:
+            console.print("[red]✗[/red]  Give hours or --clear, not both")
+            raise typer.Exit(code=1)
+    elif hours is None:
+        console.print("[red]✗[/red]  Give the hours allowed (or --clear)")
+        raise typer.Exit(code=1)
+
+    try:
+        updated = db.set_project_budget(project, period.lower(), hours)
+    except ValueError as e:
+        console.print(f"[red]✗[/red]  {e}")
+        raise typer.Exit(code=1)
+
+    if not updated:
+        console.print(f"[red]✗[/red]  Project [bold]{project}[/bold] not found")
+        raise typer.Exit(code=1)
+
+    period = period.lower()
+    if clear:
+        kind = {"week": "weekly", "month": "monthly", "total": "total"}[period]
+        console.print(f"[green]✓[/green]  Removed the {kind} budget of [bold]{project}[/bold]")
+    else:
+        per = {"week": "a week", "month": "a month", "total": "in total"}[period]
+        console.print(f"[green]✓[/green]  [bold]{project}[/bold]: {hours:g}h {per}")
+
+
 @app.command()
 def tags():
     """
@@ -823,23 +2087,404 @@ def tags():
     """
     db.init_database()
 
-    all_tags = db.list_tags()
+    # Tag names and project counts in one query
+    tag_counts = db.list_tags_with_counts()
+
+    if machine_output():
+        output.write_rows(
+            output_format,
+            ["tag", "projects"],
+            ({"tag": name, "projects": count} for name, count in tag_counts)
+        )
+        return
 
-    if not all_tags:
+    if not tag_counts:
         console.print("[dim]No tags created yet[/dim]")
         return
 
+    from rich.table import Table
+
     table = Table(title="Tags")
     table.add_column("Tag", style="cyan")
     table.add_column("Projects", justify="right")
 
-    for t in all_tags:
-        projects = db.get_projects_by_tag(t.name)
-        table.add_row(t.name, str(len(projects)))
+    for name, count in tag_counts:
+        table.add_row(name, str(count))
 
     console.print(table)
 
 
+# =============================================================================
+# LIVE DASHBOARD
+# =============================================================================
+
+@app.command()
+def top():
+    """
+    Live dashboard of active sessions and today's totals.
+
+    Durations tick every second; the database is only re-read when
+    something changes it. Cheap enough to leave open all day.
+    Press Ctrl+C to exit.
+    """
+    run_dashboard()
+
+
+def run_dashboard():
+    """
+    Show active sessions and today's totals in a live-updating display.
+
+    Durations are computed locally from the session start times each
+    second. The database is re-queried only when PRAGMA data_version says
+    another process committed, or when the day rolls over.
+    """
+    import time
+    from rich.live import Live
+
+    if machine_output():
+        typer.echo("Error: the live display has no machine-readable output", err=True)
+        raise typer.Exit(code=2)
+
+    db.init_database()
+
+    active_sessions: list[Session] = []
+    completed_today: dict[str, int] = {}
+    data_version = None
+    today = None
+
+    # One connection for the whole run: data_version is per connection
+    with db.shared_connection():
+        try:
+            with Live(console=console.get(), auto_refresh=False) as live:
+                while True:
+                    now = datetime.now()
+                    version = db.get_data_version()
+                    changed = version != data_version or now.date() != today
+
+                    if changed:
+                        data_version = version
+                        today = now.date()
+                        start_of_today, start_of_tomorrow = get_today_range()
+                        active_sessions = db.get_active_sessions()
+                        completed_today = db.get_summary(start_of_today, start_of_tomorrow)
+
+                    # Nothing is ticking while every session is paused (or idle)
+                    ticking = any(not s.is_paused for s in active_sessions)
+                    if changed or ticking:
+                        live.update(_render_dashboard(now, active_sessions, completed_today), refresh=True)
+
+                    # Wake just after the next wall-clock second
+                    time.sleep(1.005 - time.time() % 1)
+        except KeyboardInterrupt:
+            pass
+
+
+def _render_dashboard(now: datetime, active_sessions: list[Session], completed_today: dict[str, int]):
+    """Build the dashboard renderable for one tick."""
+    from rich.console import Group
+    from rich.table import Table
+
+    if active_sessions:
+        active_table = Table(title=f"[green]● Active Sessions ({len(active_sessions)})[/green]")
+        active_table.add_column("Project", style="bold")
+        active_table.add_column("Started", style="cyan")
+        active_table.add_column("Duration", justify="right", style="green")
+        for s in active_sessions:
+            duration = s.format_duration()
+            if s.is_paused:
+                duration = f"[yellow]{duration} (paused)[/yellow]"
+            active_table.add_row(s.project_name, format_time(s.start_time), duration)
+    else:
+        active_table = "[dim]●  No active sessions — you're idle[/dim]"
+
+    # Today's totals: completed sessions plus the part of each running
+    # session since midnight
+    totals = dict(completed_today)
+    start_of_today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    for s in active_sessions:
+        seconds = s.duration_seconds
+        if s.start_time < start_of_today:
+            seconds = min(seconds, int((now - start_of_today).total_seconds()))
+        totals[s.project_name] = totals.get(s.project_name, 0) + seconds
+
+    today_table = Table(title=f"Today — {now.strftime('%A, %B %d')}")
+    today_table.add_column("Project", style="bold")
+    today_table.add_column("Time", justify="right", style="green")
+    for project, seconds in sorted(totals.items(), key=lambda item: item[1], reverse=True):
+        today_table.add_row(project, format_duration_short(seconds))
+    if totals:
+        today_table.add_section()
+        today_table.add_row("[bold]Total[/bold]", f"[bold]{format_duration_short(sum(totals.values()))}[/bold]")
+
+    return Group(
+        active_table,
+        "",
+        today_table,
+        f"[dim]{now.strftime('%I:%M:%S %p')} — Ctrl+C to exit[/dim]"
+    )
+
+
+# =============================================================================
+# BATCH COMMAND
+# =============================================================================
+
+@app.command()
+def batch(
+    source: Optional[Path] = typer.Argument(
+        None,
+        help="File of operations (default: read from stdin)"
+    ),
+    atomic: bool = typer.Option(
+        True,
+        "--atomic/--per-line",
+        help="Save all operations or none (default), or save each line on its own"
+    )
+):
+    """
+    Run many operations in one go, one per line.
+
+    Each line is a command in CLI syntax or a JSON object:
+
+        start "Job Search"
+        log Reading 45m --notes "Finished chapter 3" --date 2024-01-15
+        {"op": "stop", "project": "Job Search", "notes": "Applied to 3 jobs"}
+
+    Blank lines and lines starting with # are ignored. Project names must
+    match exactly. With --atomic, the first failing line rolls back the
+    whole batch; with --per-line, failures are reported and skipped.
+    Exits with code 1 if any line failed.
+    """
+    import sqlite3
+    import operations
+
+    db.init_database()
+
+    if source:
+        try:
+            lines = source.read_text(encoding="utf-8").splitlines()
+        except OSError as e:
+            console.print(f"[red]✗[/red]  Can't read {source}: {e.strerror}")
+            raise typer.Exit(code=1)
+    else:
+        lines = sys.stdin.read().splitlines()
+
+    # One result per non-blank line: (line number, status, result dict)
+    results = []
+    failed = False
+
+    def run_line(number: int, text: str) -> bool:
+        """Apply one line, record its result, and return False on failure."""
+        name = None
+        try:
+            op = operations.parse_line(text)
+            if op is None:
+                return True
+            name = op.get("op")
+            # A failing line undoes whatever part of it was written (a
+            # savepoint when the whole batch is one transaction)
+            with db.transaction():
+                result = operations.execute(op)
+        except (ValueError, sqlite3.Error) as e:
+            results.append((number, "error", {"op": name, "message": str(e)}))
+            return False
+        results.append((number, "ok", result))
+        return True
+
+    class _Abort(Exception):
+        pass
+
+    # Every operation below shares one connection
+    with db.shared_connection():
+        if atomic:
+            try:
+                with db.transaction():
+                    for number, text in enumerate(lines, start=1):
+                        if not run_line(number, text):
+                            raise _Abort()
+            except _Abort:
+                failed = True
+                # Earlier lines were undone; later ones never ran
+                results = [
+                    (number, "rolled_back" if status == "ok" else status, result)
+                    for number, status, result in results
+                ]
+                last = results[-1][0]
+                for number, text in enumerate(lines[last:], start=last + 1):
+                    if text.strip() and not text.lstrip().startswith("#"):
+                        results.append((number, "skipped", {"op": None, "message": ""}))
+        else:
+            for number, text in enumerate(lines, start=1):
+                if not run_line(number, text):
+                    failed = True
+
+    if machine_output():
+        output.write_rows(
+            output_format,
+            ["line", "op", "status", "project", "session_id", "duration_seconds", "message"],
+            ({"line": number, "status": status, **result} for number, status, result in results)
+        )
+    else:
+        for number, status, result in results:
+            if status == "ok":
+                console.print(f"[green]✓[/green]  {number}: {result['message']}")
+            elif status == "error":
+                console.print(f"[red]✗[/red]  {number}: {result['message']}")
+            elif status == "rolled_back":
+                console.print(f"[dim]↺  {number}: {result['message']} (rolled back)[/dim]")
+            else:
+                console.print(f"[dim]-  {number}: skipped[/dim]")
+
+        applied = sum(1 for _, status, _ in results if status == "ok")
+        if failed and atomic:
+            console.print("\n[red]✗[/red]  Batch failed — no changes were saved")
+        elif failed:
+            console.print(f"\n[yellow]⚠[/yellow]  Applied {applied} of {len(results)} operation(s)")
+        else:
+            console.print(f"\n[green]✓[/green]  Applied {applied} operation(s)")
+
+    if failed:
+        raise typer.Exit(code=1)
+
+
+# =============================================================================
+# SERVER COMMAND
+# =============================================================================
+
+@app.command()
+def serve():
+    """
+    Run a background server that speeds up other tt commands.
+
+    While it's running, start, stop, stopall, switch, status and log are
+    answered by the server instead of opening the database each time.
+    Leave it running in a spare terminal (or a login service); stop it
+    with Ctrl+C. Commands fall back to the database when it isn't running.
+    Set TT_NO_DAEMON=1 to bypass a running server.
+    """
+    import daemon
+
+    def ready(path):
+        console.print(f"[green]●[/green]  Serving on [bold]{path}[/bold] — press Ctrl+C to stop")
+
+    try:
+        daemon.serve(on_ready=ready)
+    except RuntimeError as e:
+        console.print(f"[red]✗[/red]  {e}")
+        raise typer.Exit(code=1)
+    except KeyboardInterrupt:
+        console.print("\n[dim]Server stopped[/dim]")
+
+
+@app.command()
+def api(
+    host: str = typer.Option("127.0.0.1", "--host", help="Interface to listen on"),
+    port: int = typer.Option(8347, "--port", "-p", help="Port to listen on"),
+    quiet: bool = typer.Option(False, "--quiet", "-q", help="Don't log each request")
+):
+    """
+    Serve read-only JSON reports over HTTP for dashboards and scripts.
+
+    Endpoints: /active, /summary, /summary/days, /summary/tags and
+    /sessions (see api_server.py for parameters). Responses carry ETags, so
+    a dashboard polling with If-None-Match gets a cheap 304 until
+    something changes. Stop it with Ctrl+C.
+    """
+    import api_server
+
+    def ready(url):
+        console.print(f"[green]●[/green]  Serving reports on [bold]{url}[/bold] — press Ctrl+C to stop")
+        if host not in ("127.0.0.1", "localhost", "::1"):
+            console.print("[yellow]⚠[/yellow]  Listening beyond this machine: anyone who can reach it can read your data")
+
+    def log(line):
+        console.print(f"[dim]{line}[/dim]")
+
+    try:
+        api_server.serve(host=host, port=port, on_ready=ready, on_request=None if quiet else log)
+    except OSError as e:
+        console.print(f"[red]✗[/red]  Can't listen on {host}:{port}: {e.strerror or e}")
+        raise typer.Exit(code=1)
+    except KeyboardInterrupt:
+        console.print("\n[dim]Server stopped[/dim]")
+
+
+# =============================================================================
+# SYNC COMMANDS
+# =============================================================================
+
+sync_app = typer.Typer(help="Exchange changes with Derby on another machine.")
+app.add_typer(sync_app, name="sync")
+
+
+@sync_app.command("export")
+def sync_export(
+    since: int = typer.Option(0, "--since", "-s", help="Only changes after this sequence number"),
+    output_path: Optional[Path] = typer.Option(
+        None,
+        "--output", "-o",
+        help="File to write (default: derby_changes_<since>-<until>.json; '-' for stdout)"
+    )
+):
+    """
+    Write the changes made here to a changeset file.
+
+    Take the file to the other machine and run `tt sync apply FILE` there.
+    Next time, pass the sequence number printed here as --since so only
+    newer changes are included.
+    """
+    import json
+
+    db.init_database()
+
+    changeset = db.export_changes(since)
+
+    if output_path is not None and str(output_path) == "-":
+        json.dump(changeset, sys.stdout, ensure_ascii=False)
+        sys.stdout.write("\n")
+        return
+
+    if output_path is None:
+        output_path = Path(f"derby_changes_{changeset['since']}-{changeset['until']}.json")
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(changeset, f, ensure_ascii=False)
+
+    console.print(f"[green]✓[/green]  Wrote {len(changeset['changes'])} change(s) to {output_path.resolve()}")
+    console.print(f"   Next time: [bold]tt sync export --since {changeset['until']}[/bold]")
+
+
+@sync_app.command("apply")
+def sync_apply(
+    changeset_file: Path = typer.Argument(..., help="Changeset from `tt sync export` ('-' for stdin)")
+):
+    """
+    Apply a changeset exported on another machine.
+
+    Where both machines changed the same session or project, the later
+    change wins. Applying the same file twice is harmless.
+    """
+    import json
+
+    db.init_database()
+
+    try:
+        if str(changeset_file) == "-":
+            changeset = json.load(sys.stdin)
+        else:
+            with open(changeset_file, encoding="utf-8") as f:
+                changeset = json.load(f)
+        report = db.apply_changes(changeset)
+    except (OSError, ValueError) as e:
+        console.print(f"[red]✗[/red]  Can't apply {changeset_file}: {e}")
+        raise typer.Exit(code=1)
+
+    console.print(
+        f"[green]✓[/green]  Applied {report['applied']} change(s)"
+        f" [dim]({report['skipped']} already up to date)[/dim]"
+    )
+    if report["conflicts"]:
+        console.print(f"[yellow]⚠[/yellow]  {report['conflicts']} change(s) conflicted with data here and were skipped")
+
+
 # =============================================================================
 # ENTRY POINT
 # =============================================================================
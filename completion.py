@@ -0,0 +1,74 @@
+"""
+completion.py - Shell completion from a small cache file
+
+Tab completion runs the CLI once per keypress, so it has to be fast.
+Instead of opening the database, completion reads a JSON file of project
+and tag names that db.py rewrites whenever projects or tags change (and
+whenever a session starts, since projects are listed most-used first).
+
+This module only uses the standard library - in particular it must not
+import db or Rich, which is the whole point.
+
+Cache format (~/.timetrack/completion_cache.json):
+    {"projects": ["Job Search", "Reading"], "tags": ["urgent", "work"]}
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+
+# Lives next to config.txt (not in the data directory, which completion
+# would have to read the config file to find)
+CACHE_PATH = Path.home() / ".timetrack" / "completion_cache.json"
+
+# Kinds of names in the cache
+PROJECTS = "projects"
+TAGS = "tags"
+
+
+def load() -> Optional[dict[str, list[str]]]:
+    """
+    Read the completion cache.
+
+    Returns:
+        Dict of name lists, or None if the cache is missing or unreadable
+    """
+    try:
+        with open(CACHE_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def complete(kind: str, incomplete: str) -> Optional[list[str]]:
+    """
+    Names of one kind starting with what's been typed (case-insensitive).
+
+    Args:
+        kind: PROJECTS or TAGS
+        incomplete: The partial word being completed
+
+    Returns:
+        Matching names in cache order, or None if there's no cache yet
+    """
+    cache = load()
+    if cache is None:
+        return None
+    prefix = incomplete.lower()
+    return [name for name in cache.get(kind, []) if name.lower().startswith(prefix)]
+
+
+def write(projects: list[str], tags: list[str]):
+    """
+    Replace the completion cache.
+
+    Writes to a temporary file and renames it over the old one, so a
+    completion running at the same moment never sees half a file.
+    """
+    CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = CACHE_PATH.with_suffix(f".{os.getpid()}.tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump({PROJECTS: projects, TAGS: tags}, f, ensure_ascii=False)
+    os.replace(temp_path, CACHE_PATH)
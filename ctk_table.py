@@ -9,7 +9,6 @@ from typing import Any, Callable, Optional
 import customtkinter as ctk
 
 import themes
-from themes import FONT_FAMILY
 from gui_utils import batch_update
 
 
@@ -83,7 +82,7 @@ class CTkTableRow(ctk.CTkFrame):
                 cell_frame,
                 text=str(value),
                 anchor=ctk_anchor,
-                font=ctk.CTkFont(family=FONT_FAMILY, size=13, weight=font_weight),
+                font=themes.get_font(13, font_weight),
                 text_color=colors["text_primary"]
             )
             # Pack label centered vertically, anchored horizontally
@@ -104,7 +103,7 @@ class CTkTableRow(ctk.CTkFrame):
                     fg_color=action.get("fg_color", colors["bg_light"]),
                     hover_color=action.get("hover_color", colors["separator"]),
                     text_color=action.get("text_color", colors["text_primary"]),
-                    font=ctk.CTkFont(family=FONT_FAMILY, size=11),
+                    font=themes.get_font(11),
                     corner_radius=4,
                     command=lambda a=action: self._handle_action(a["action_id"])
                 )
@@ -439,6 +438,8 @@ class CTkSessionCard(ctk.CTkFrame):
         is_paused: bool = False,
         on_stop: Optional[Callable[[str], None]] = None,
         on_toggle_pause: Optional[Callable[[str], None]] = None,
+        budget: str = "",
+        budget_over: bool = False,
         **kwargs
     ):
         colors = themes.get_colors()
@@ -456,9 +457,9 @@ class CTkSessionCard(ctk.CTkFrame):
         self.on_stop = on_stop
         self.on_toggle_pause = on_toggle_pause
 
-        self._build_card(started, duration)
+        self._build_card(started, duration, budget, budget_over)
 
-    def _build_card(self, started: str, duration: str):
+    def _build_card(self, started: str, duration: str, budget: str = "", budget_over: bool = False):
         """Build the session card UI."""
         colors = themes.get_colors()
 
@@ -482,7 +483,7 @@ class CTkSessionCard(ctk.CTkFrame):
         self.name_label = ctk.CTkLabel(
             top_row,
             text=self.project_name,
-            font=ctk.CTkFont(family=FONT_FAMILY, size=14, weight="bold"),
+            font=themes.get_font(14, "bold"),
             text_color=colors["text_primary"],
             anchor="w"
         )
@@ -500,7 +501,7 @@ class CTkSessionCard(ctk.CTkFrame):
             height=26,
             fg_color=colors["danger"],
             hover_color=colors["danger_hover"],
-            font=ctk.CTkFont(family=FONT_FAMILY, size=11),
+            font=themes.get_font(11),
             corner_radius=4,
             command=self._on_stop_click
         )
@@ -515,7 +516,7 @@ class CTkSessionCard(ctk.CTkFrame):
             fg_color=self.pause_yellow,
             hover_color=self.pause_yellow_hover,
             text_color="#000000",
-            font=ctk.CTkFont(family=FONT_FAMILY, size=11),
+            font=themes.get_font(11),
             corner_radius=4,
             command=self._on_toggle_pause_click
         )
@@ -529,7 +530,7 @@ class CTkSessionCard(ctk.CTkFrame):
             fg_color=self.play_green,
             hover_color=self.play_green_hover,
             text_color="#ffffff",
-            font=ctk.CTkFont(family=FONT_FAMILY, size=11, weight="bold"),
+            font=themes.get_font(11, "bold"),
             corner_radius=4,
             command=self._on_toggle_pause_click
         )
@@ -544,7 +545,7 @@ class CTkSessionCard(ctk.CTkFrame):
         self.duration_label = ctk.CTkLabel(
             top_row,
             text=duration,
-            font=ctk.CTkFont(family=FONT_FAMILY, size=16, weight="bold"),
+            font=themes.get_font(16, "bold"),
             text_color=colors["success"] if not self.is_paused else colors["text_secondary"],
             anchor="e"
         )
@@ -557,12 +558,22 @@ class CTkSessionCard(ctk.CTkFrame):
         self.started_label = ctk.CTkLabel(
             bottom_row,
             text=f"Started: {started}",
-            font=ctk.CTkFont(family=FONT_FAMILY, size=11),
+            font=themes.get_font(11),
             text_color=colors["text_secondary"],
             anchor="w"
         )
         self.started_label.pack(side=ctk.LEFT)
 
+        # Budget progress (right), empty for projects without a budget
+        self.budget_label = ctk.CTkLabel(
+            bottom_row,
+            text=budget,
+            font=themes.get_font(11),
+            text_color=colors["danger"] if budget_over else colors["text_secondary"],
+            anchor="e"
+        )
+        self.budget_label.pack(side=ctk.RIGHT)
+
     def _on_stop_click(self):
         """Handle stop button click."""
         if self.on_stop:
@@ -577,6 +588,14 @@ class CTkSessionCard(ctk.CTkFrame):
         """Update the displayed duration."""
         self.duration_label.configure(text=duration)
 
+    def update_budget(self, budget: str, is_over: bool = False):
+        """Update the budget progress text (red when over budget)."""
+        colors = themes.get_colors()
+        self.budget_label.configure(
+            text=budget,
+            text_color=colors["danger"] if is_over else colors["text_secondary"]
+        )
+
     def update_pause_state(self, is_paused: bool):
         """Update the pause state and toggle Pause/Play button visibility."""
         colors = themes.get_colors()
@@ -644,7 +663,7 @@ class CTkSessionList(ctk.CTkFrame):
         self.empty_label = ctk.CTkLabel(
             self.scrollable_frame,
             text=self.empty_message,
-            font=ctk.CTkFont(family=FONT_FAMILY, size=12),
+            font=themes.get_font(12),
             text_color=colors["text_secondary"]
         )
         self.empty_label.pack(pady=20)
@@ -655,9 +674,21 @@ class CTkSessionList(ctk.CTkFrame):
         project_name: str,
         started: str,
         duration: str,
-        is_paused: bool = False
+        is_paused: bool = False,
+        first: bool = False,
+        budget: str = "",
+        budget_over: bool = False
     ) -> CTkSessionCard:
-        """Add a session card to the list."""
+        """
+        Add a session card to the list.
+
+        Args:
+            first: Put the card at the top instead of the bottom
+            budget: Budget progress text shown on the card
+            budget_over: Show the budget text as over budget
+        """
+        top_card = next(iter(self.cards.values()), None)
+
         # Hide empty message when adding first session
         if not self.cards:
             self.empty_label.pack_forget()
@@ -670,13 +701,27 @@ class CTkSessionList(ctk.CTkFrame):
             duration=duration,
             is_paused=is_paused,
             on_stop=self.on_stop,
-            on_toggle_pause=self.on_toggle_pause
+            on_toggle_pause=self.on_toggle_pause,
+            budget=budget,
+            budget_over=budget_over
         )
-        card.pack(fill=ctk.X, pady=(0, 10))
-
-        self.cards[session_id] = card
+        if first and top_card is not None:
+            card.pack(fill=ctk.X, pady=(0, 10), before=top_card)
+            self.cards = {session_id: card, **self.cards}
+        else:
+            card.pack(fill=ctk.X, pady=(0, 10))
+            self.cards[session_id] = card
         return card
 
+    def remove_session(self, session_id: str):
+        """Remove one session card (no-op if it isn't in this list)."""
+        card = self.cards.pop(session_id, None)
+        if card is None:
+            return
+        card.destroy()
+        if not self.cards:
+            self.empty_label.pack(pady=20)
+
     def clear(self):
         """Remove all session cards."""
         # Use batch_update to defer painting until all changes are done
@@ -698,6 +743,12 @@ class CTkSessionList(ctk.CTkFrame):
         if card:
             card.update_duration(duration)
 
+    def update_budget(self, session_id: str, budget: str, is_over: bool = False):
+        """Update the budget progress for a specific session."""
+        card = self.cards.get(session_id)
+        if card:
+            card.update_budget(budget, is_over)
+
     def update_pause_state(self, session_id: str, is_paused: bool):
         """Update the pause state for a specific session."""
         card = self.cards.get(session_id)
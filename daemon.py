@@ -0,0 +1,381 @@
+"""
+daemon.py - Long-running local server for the CLI (`tt serve`)
+
+A `tt` command normally opens SQLite, checks the schema and reads what it
+needs from scratch every time. `tt serve` keeps one process running that
+owns the database connection and caches the active sessions and project
+names; the CLI sends it requests over a Unix domain socket instead.
+
+Protocol: one JSON request per connection. The client connects, sends
+one line naming a db function and its arguments:
+    {"call": "start_session", "args": ["Reading"], "kwargs": {}}
+gets back one line, and the connection is closed:
+    {"ok": true, "value": ...}
+    {"ok": false, "error": "ValueError", "message": "..."}
+A command that stops to ask the user something holds no connection, so
+it never keeps the (single-threaded) server from answering others.
+
+Only the functions in SERVED_CALLS can be called. Datetimes, timedeltas
+and Sessions are tagged on the wire (see _encode/_decode).
+
+Other processes (the GUI, a CLI run with TT_NO_DAEMON=1) can still write
+to the database directly; the server notices through SQLite's
+`PRAGMA data_version` and drops its caches.
+
+Unix domain sockets aren't available on every platform (notably older
+Windows builds); there the CLI always uses the database directly.
+"""
+
+import json
+import os
+import signal
+import socket
+import socketserver
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Optional
+
+import db
+from models import Session
+
+
+# Socket file name, created in the data directory next to timetrack.db
+SOCKET_NAME = "derby.sock"
+
+# How long the CLI waits for a reply before giving up (seconds)
+CLIENT_TIMEOUT = 5.0
+
+# How long the server waits for a connected client to send its request
+REQUEST_READ_TIMEOUT = 1.0
+
+# Set this environment variable to make the CLI ignore a running server
+DISABLE_ENV = "TT_NO_DAEMON"
+
+# db functions the server will run, and whether each one writes
+SERVED_CALLS = {
+    "get_active_session": False,
+    "get_active_sessions": False,
+    "get_active_session_by_project": False,
+    "get_frecent_project_names": False,
+    "start_session": True,
+    "stop_session": True,
+    "stop_all_sessions": True,
+    "switch_session": True,
+    "log_session": True,
+    "pause_session": True,
+    "resume_session": True,
+    "delete_session": True,
+}
+
+
+def is_supported() -> bool:
+    """True if this platform has Unix domain sockets."""
+    return hasattr(socket, "AF_UNIX")
+
+
+def get_socket_path() -> Path:
+    """Path of the server socket for the current data directory."""
+    return db.get_data_directory() / SOCKET_NAME
+
+
+# =============================================================================
+# WIRE FORMAT
+# =============================================================================
+
+def _encode(value: Any) -> Any:
+    """Convert a value to JSON-friendly form, tagging non-JSON types."""
+    if isinstance(value, Session):
+        return {"__session__": value.to_dict()}
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, timedelta):
+        return {"__timedelta__": value.total_seconds()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _encode(v) for k, v in value.items()}
+    return value
+
+
+def _decode(value: Any) -> Any:
+    """Undo _encode()."""
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    if isinstance(value, dict):
+        if "__session__" in value:
+            return Session.from_dict(value["__session__"])
+        if "__datetime__" in value:
+            return datetime.fromisoformat(value["__datetime__"])
+        if "__timedelta__" in value:
+            return timedelta(seconds=value["__timedelta__"])
+        return {k: _decode(v) for k, v in value.items()}
+    return value
+
+
+# =============================================================================
+# CLIENT
+# =============================================================================
+
+class DaemonError(RuntimeError):
+    """The server failed to answer a request."""
+
+
+class DaemonUnavailable(DaemonError):
+    """The server couldn't be reached, so the request was never sent."""
+
+
+def _open_socket(path: Path) -> socket.socket:
+    """
+    Connect to the server socket.
+
+    Raises:
+        OSError: If nothing is listening on it
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CLIENT_TIMEOUT)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+class DaemonClient:
+    """
+    Client for a running `tt serve`.
+
+    Exposes the served db functions as methods, so a command can use a
+    client wherever it would use the db module:
+        store = connect() or db
+        store.get_active_sessions()
+
+    Every call makes its own short connection (see the protocol above).
+    """
+
+    def __init__(self, path: Path):
+        self._path = path
+
+    def call(self, name: str, *args, **kwargs) -> Any:
+        """
+        Run one db function in the server.
+
+        Raises:
+            ValueError: If the db function raised ValueError
+            DaemonUnavailable: If the server couldn't be reached
+            DaemonError: For any other failure
+        """
+        request = {"call": name, "args": _encode(args), "kwargs": _encode(kwargs)}
+        try:
+            sock = _open_socket(self._path)
+        except OSError as e:
+            raise DaemonUnavailable(f"Can't reach tt serve: {e}")
+
+        try:
+            with sock, sock.makefile("rwb") as f:
+                f.write(json.dumps(request).encode("utf-8") + b"\n")
+                f.flush()
+                line = f.readline()
+        except OSError as e:
+            raise DaemonError(f"Lost connection to tt serve: {e}")
+        if not line:
+            raise DaemonError("tt serve closed the connection")
+
+        reply = json.loads(line)
+        if reply.get("ok"):
+            return _decode(reply.get("value"))
+        if reply.get("error") == "ValueError":
+            raise ValueError(reply.get("message"))
+        raise DaemonError(f"{reply.get('error')}: {reply.get('message')}")
+
+    def __getattr__(self, name: str):
+        if name not in SERVED_CALLS:
+            raise AttributeError(name)
+        return lambda *args, **kwargs: self.call(name, *args, **kwargs)
+
+    def close(self):
+        """Nothing to release: connections only last for one call."""
+
+
+def connect() -> Optional[DaemonClient]:
+    """
+    Connect to `tt serve` if it's running.
+
+    Returns:
+        A DaemonClient, or None if there is no server (or it's disabled
+        with TT_NO_DAEMON) - callers then use the database directly
+    """
+    if not is_supported() or os.environ.get(DISABLE_ENV):
+        return None
+
+    path = get_socket_path()
+    if not path.exists():
+        return None
+
+    try:
+        # Probe: a stale socket file from a server that didn't shut down
+        # cleanly refuses connections
+        _open_socket(path).close()
+    except OSError:
+        return None
+    return DaemonClient(path)
+
+
+# =============================================================================
+# SERVER
+# =============================================================================
+
+class _Cache:
+    """
+    Results of the read-only calls, keyed by (name, args).
+
+    Cleared after every write made through the server, and whenever
+    another process has committed to the database.
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._entries: dict[str, Any] = {}
+        self._data_version = self._read_data_version()
+
+    def _read_data_version(self) -> int:
+        # data_version changes when *another* connection commits; our own
+        # writes don't change it, which is why writes clear() explicitly
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def check(self):
+        """Drop everything if the database changed behind our back."""
+        version = self._read_data_version()
+        if version != self._data_version:
+            self._data_version = version
+            self._entries.clear()
+
+    def get(self, key: str):
+        return self._entries.get(key)
+
+    def put(self, key: str, value: Any):
+        self._entries[key] = value
+
+    def clear(self):
+        self._entries.clear()
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Answers the connection's one JSON request, then closes it."""
+
+    # A client that connects and never sends its line would otherwise
+    # block every other client; well under CLIENT_TIMEOUT, so the ones
+    # waiting behind it still get their answer
+    timeout = REQUEST_READ_TIMEOUT
+
+    def handle(self):
+        try:
+            line = self.rfile.readline()
+        except OSError:
+            return
+        if not line.strip():
+            return  # connect() probing whether we're alive
+        reply = self.server.dispatch(line)
+        self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+        self.wfile.flush()
+
+
+class DaemonServer(socketserver.UnixStreamServer):
+    """
+    Single-threaded server that owns one database connection.
+
+    Requests are handled one at a time, so calls never overlap and the
+    shared connection (and its cache) needs no locking. Each connection
+    carries a single request, so no client can hold the server for
+    longer than one call.
+    """
+
+    def __init__(self, path: Path, conn):
+        self.cache = _Cache(conn)
+        super().__init__(str(path), _RequestHandler)
+
+    def dispatch(self, line: bytes) -> dict:
+        """Run one request and build its reply."""
+        try:
+            request = json.loads(line)
+            name = request["call"]
+            if name not in SERVED_CALLS:
+                return {"ok": False, "error": "UnknownCall", "message": name}
+            args = _decode(request.get("args") or [])
+            kwargs = _decode(request.get("kwargs") or {})
+        except (ValueError, KeyError, TypeError) as e:
+            return {"ok": False, "error": "BadRequest", "message": str(e)}
+
+        self.cache.check()
+        is_write = SERVED_CALLS[name]
+
+        key = None
+        if not is_write:
+            key = json.dumps([name, request.get("args"), request.get("kwargs")])
+            cached = self.cache.get(key)
+            if cached is not None:
+                return {"ok": True, "value": cached}
+
+        try:
+            value = _encode(getattr(db, name)(*args, **kwargs))
+        except Exception as e:
+            return {"ok": False, "error": type(e).__name__, "message": str(e)}
+        finally:
+            if is_write:
+                self.cache.clear()
+
+        if key is not None:
+            self.cache.put(key, value)
+        return {"ok": True, "value": value}
+
+
+def serve(on_ready=None):
+    """
+    Run the server until interrupted.
+
+    Args:
+        on_ready: Optional callback(path) run once the socket is listening
+
+    Raises:
+        RuntimeError: If Unix sockets aren't supported or a server is
+            already running for this data directory
+    """
+    if not is_supported():
+        raise RuntimeError("tt serve needs Unix domain sockets, which this platform doesn't support")
+
+    path = get_socket_path()
+    if path.exists():
+        probe = connect()
+        if probe is not None:
+            probe.close()
+            raise RuntimeError(f"tt serve is already running ({path})")
+        # Left behind by a server that crashed
+        path.unlink()
+
+    db.init_database()
+
+    with db.shared_connection() as conn:
+        # Create the socket owner-only: it gives full access to your data
+        old_umask = os.umask(0o177)
+        try:
+            server = DaemonServer(path, conn)
+        finally:
+            os.umask(old_umask)
+
+        # Treat `kill` like Ctrl+C so the socket file is cleaned up
+        signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
+
+        try:
+            if on_ready:
+                on_ready(path)
+            server.serve_forever()
+        finally:
+            server.server_close()
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _raise_keyboard_interrupt(signum, frame):
+    raise KeyboardInterrupt
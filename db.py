@@ -14,14 +14,19 @@ Key concepts:
 - Transaction: A group of operations that succeed or fail together
 """
 
+import math
 import shutil
 import sqlite3
+import threading
+import uuid
 from contextlib import contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 
 # Import our data models
+import completion
+from filters import Filter
 from models import Project, Session, Tag
 
 # Default data directory in user's home
@@ -85,6 +90,9 @@ def set_data_directory(new_path: Path, copy_existing: bool = False) -> bool:
 
         if copy_existing and DATABASE_PATH.exists():
             shutil.copy2(DATABASE_PATH, new_db_path)
+            # Archived years belong with it
+            for year in list_archive_years():
+                shutil.copy2(get_archive_path(year), new_path / get_archive_path(year).name)
 
         # Update the module-level variables
         DATA_DIR = new_path
@@ -96,6 +104,9 @@ def set_data_directory(new_path: Path, copy_existing: bool = False) -> bool:
         # Initialize the database at the new location
         init_database()
 
+        # Completion should offer the new database's names
+        refresh_completion_cache()
+
         return True
     except Exception as e:
         print(f"Error setting data directory: {e}")
@@ -140,6 +151,11 @@ DATA_DIR = _load_data_directory()
 DATA_DIR.mkdir(exist_ok=True)  # Create folder if it doesn't exist
 DATABASE_PATH = DATA_DIR / "timetrack.db"
 
+# Frecency: how quickly past use stops counting when ranking projects.
+# A start from one half-life ago is worth half a start today.
+FRECENCY_HALF_LIFE_DAYS = 7
+FRECENCY_EPOCH = datetime(2020, 1, 1)
+
 
 # =============================================================================
 # SCHEMA MIGRATION
@@ -271,6 +287,362 @@ def _migrate_database(conn: sqlite3.Connection):
         _set_schema_version(conn, 4)
         conn.commit()
 
+    if current_version < 5:
+        cursor = conn.cursor()
+
+        # Add frecency score to projects (NULL = never started)
+        try:
+            cursor.execute("""
+                ALTER TABLE projects
+                ADD COLUMN frecency REAL
+            """)
+        except sqlite3.OperationalError:
+            pass  # Column already exists
+
+        # Backfill scores from existing session history
+        scores: dict[str, float] = {}
+        cursor.execute("SELECT project_name, start_time FROM sessions")
+        for row in cursor:
+            name = row["project_name"]
+            scores[name] = _add_frecency(scores.get(name), datetime.fromisoformat(row["start_time"]))
+        cursor.executemany(
+            "UPDATE projects SET frecency = ? WHERE name = ?",
+            [(score, name) for name, score in scores.items()]
+        )
+
+        # Index so "most used" top-N lookups don't sort the whole table
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_projects_frecency
+                ON projects(is_background, frecency DESC)
+        """)
+
+        _set_schema_version(conn, 5)
+        conn.commit()
+
+    if current_version < 6:
+        cursor = conn.cursor()
+
+        # Flag for daily aggregate rows made by compact_sessions()
+        try:
+            cursor.execute("""
+                ALTER TABLE sessions
+                ADD COLUMN is_compacted INTEGER DEFAULT 0
+            """)
+        except sqlite3.OperationalError:
+            pass  # Column already exists
+
+        _set_schema_version(conn, 6)
+        conn.commit()
+
+    if current_version < 7:
+        cursor = conn.cursor()
+
+        # Stable IDs for sync: row IDs differ between machines, UUIDs don't
+        for table in ("sessions", "projects"):
+            try:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN uuid TEXT")
+            except sqlite3.OperationalError:
+                pass  # Column already exists
+            cursor.execute(f"UPDATE {table} SET uuid = {_NEW_UUID_SQL} WHERE uuid IS NULL")
+            cursor.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{table}_uuid ON {table}(uuid)")
+
+        # Change log: one row per insert, update or delete (see SYNC below)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS changes (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                entity TEXT NOT NULL,
+                uuid TEXT NOT NULL,
+                op TEXT NOT NULL,
+                changed_at TEXT NOT NULL,
+                origin TEXT NOT NULL
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_changes_entity ON changes(entity, uuid)")
+
+        cursor.execute(
+            "INSERT OR IGNORE INTO settings (key, value) VALUES ('sync_device_id', ?)",
+            (uuid.uuid4().hex,)
+        )
+
+        # Everything that exists now is the first change, so a first
+        # export carries the whole history
+        for entity, table in (("project", "projects"), ("session", "sessions")):
+            cursor.execute(f"""
+                INSERT INTO changes (entity, uuid, op, changed_at, origin)
+                SELECT '{entity}', uuid, 'upsert', {_NOW_SQL}, {_DEVICE_SQL}
+                FROM {table}
+                ORDER BY id
+            """)
+
+        cursor.executescript(_SYNC_TRIGGERS_SQL)
+
+        _set_schema_version(conn, 7)
+        conn.commit()
+
+    if current_version < 8:
+        cursor = conn.cursor()
+
+        # Full-text index over notes and project names (see SEARCH below)
+        _create_search_index(cursor, "main")
+
+        _set_schema_version(conn, 8)
+        conn.commit()
+
+    if current_version < 9:
+        cursor = conn.cursor()
+
+        # Project hierarchy as a closure table: one row for every
+        # (ancestor, descendant) pair, including each project with itself
+        # at depth 0 (see PROJECT HIERARCHY below)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS project_closure (
+                ancestor_id INTEGER NOT NULL,
+                descendant_id INTEGER NOT NULL,
+                depth INTEGER NOT NULL,
+                PRIMARY KEY (ancestor_id, descendant_id)
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_project_closure_descendant
+                ON project_closure(descendant_id, depth)
+        """)
+        cursor.execute("""
+            INSERT OR IGNORE INTO project_closure (ancestor_id, descendant_id, depth)
+            SELECT id, id, 0 FROM projects
+        """)
+        cursor.executescript(_HIERARCHY_TRIGGERS_SQL)
+
+        _set_schema_version(conn, 9)
+        conn.commit()
+
+    if current_version < 10:
+        cursor = conn.cursor()
+
+        # Billing terms (NULL = not set here; inherited from the nearest
+        # ancestor that has them, see BILLING below)
+        for column, sql_type in (
+            ("hourly_rate", "REAL"),
+            ("billing_increment", "INTEGER"),
+            ("billing_minimum", "INTEGER"),
+        ):
+            try:
+                cursor.execute(f"ALTER TABLE projects ADD COLUMN {column} {sql_type}")
+            except sqlite3.OperationalError:
+                pass  # Column already exists
+
+        _set_schema_version(conn, 10)
+        conn.commit()
+
+    if current_version < 11:
+        # Read before any write below: archives can't be ATTACHed once a
+        # transaction has started
+        source = _sessions_source(conn)
+        cursor = conn.cursor()
+
+        # Hour budgets per project and period (see BUDGETS below)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS budgets (
+                project_id INTEGER NOT NULL,
+                period TEXT NOT NULL,
+                hours REAL NOT NULL,
+                PRIMARY KEY (project_id, period)
+            )
+        """)
+
+        # Running totals of closed sessions, one row per project and
+        # week/month/all time, kept current by triggers
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS time_counters (
+                project_name TEXT NOT NULL,
+                period TEXT NOT NULL,
+                period_start TEXT NOT NULL,
+                seconds INTEGER NOT NULL,
+                PRIMARY KEY (project_name, period, period_start)
+            ) WITHOUT ROWID
+        """)
+        # Count everything closed so far, archives included
+        cursor.execute("DELETE FROM time_counters")
+        for period, start_sql in _COUNTER_PERIODS:
+            cursor.execute(f"""
+                INSERT INTO time_counters (project_name, period, period_start, seconds)
+                SELECT project_name, '{period}', {start_sql.format(row="s")}, SUM({_worked_seconds_sql("s.")})
+                FROM {source} s
+                WHERE s.end_time IS NOT NULL
+                GROUP BY 1, 3
+            """)
+        cursor.executescript(_COUNTER_TRIGGERS_SQL)
+
+        _set_schema_version(conn, 11)
+        conn.commit()
+
+
+# Every project is its own root until given a parent. Deleting a project
+# moves its children up to its own parent (or makes them roots).
+_HIERARCHY_TRIGGERS_SQL = """
+    CREATE TRIGGER IF NOT EXISTS projects_closure_insert AFTER INSERT ON projects
+    BEGIN
+        INSERT OR IGNORE INTO project_closure (ancestor_id, descendant_id, depth)
+        VALUES (NEW.id, NEW.id, 0);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS projects_closure_delete AFTER DELETE ON projects
+    BEGIN
+        UPDATE project_closure SET depth = depth - 1
+        WHERE ancestor_id IN (
+                SELECT ancestor_id FROM project_closure
+                WHERE descendant_id = OLD.id AND depth > 0
+            )
+          AND descendant_id IN (
+                SELECT descendant_id FROM project_closure
+                WHERE ancestor_id = OLD.id AND depth > 0
+            );
+        DELETE FROM project_closure
+        WHERE ancestor_id = OLD.id OR descendant_id = OLD.id;
+    END;
+"""
+
+
+def _worked_seconds_sql(prefix: str = "") -> str:
+    """
+    SQL for a closed session's worked seconds (paused time excluded).
+
+    julianday() is several times cheaper than strftime('%s') and, rounded,
+    gives the same whole seconds.
+    """
+    return f"""MAX(0,
+        CAST(ROUND((julianday({prefix}end_time) - julianday({prefix}start_time)) * 86400) AS INTEGER)
+        - COALESCE({prefix}paused_seconds, 0)
+    )"""
+
+
+# Counter periods and the SQL for the start of the one a session is in.
+# Sessions are split at midnight, so each belongs to the day it starts on.
+# ('weekday 0' moves to the coming Sunday, or stays on one; Monday is 6
+# days before it.)
+_COUNTER_PERIODS = (
+    ("week", "date({row}.start_time, 'weekday 0', '-6 days')"),
+    ("month", "strftime('%Y-%m-01', {row}.start_time)"),
+    ("total", "''"),
+)
+
+_COUNTING_SQL = "(SELECT value FROM settings WHERE key = 'counters_suppress') IS NULL"
+
+
+def _count_session_sql(row: str, sign: str) -> str:
+    """Trigger statements adding a closed session (OLD or NEW) to its counters, or taking it off."""
+    return "".join(
+        f"""
+        INSERT INTO time_counters (project_name, period, period_start, seconds)
+        SELECT {row}.project_name, '{period}', {start_sql.format(row=row)}, {sign}{_worked_seconds_sql(row + ".")}
+        WHERE {row}.end_time IS NOT NULL AND {_COUNTING_SQL}
+        ON CONFLICT (project_name, period, period_start)
+        DO UPDATE SET seconds = seconds + excluded.seconds;
+        """
+        for period, start_sql in _COUNTER_PERIODS
+    )
+
+
+# Only closed sessions count; an update takes the old row off and adds the
+# new one, so edits, renames and stops all land in the right counters.
+# Pausing an active session doesn't touch them.
+_COUNTER_TRIGGERS_SQL = f"""
+    CREATE TRIGGER IF NOT EXISTS sessions_count_insert AFTER INSERT ON sessions
+    WHEN NEW.end_time IS NOT NULL
+    BEGIN
+        {_count_session_sql("NEW", "+")}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS sessions_count_update
+    AFTER UPDATE OF project_name, start_time, end_time, paused_seconds ON sessions
+    WHEN OLD.end_time IS NOT NULL OR NEW.end_time IS NOT NULL
+    BEGIN
+        {_count_session_sql("OLD", "-")}
+        {_count_session_sql("NEW", "+")}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS sessions_count_delete AFTER DELETE ON sessions
+    WHEN OLD.end_time IS NOT NULL
+    BEGIN
+        {_count_session_sql("OLD", "-")}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS projects_budgets_delete AFTER DELETE ON projects
+    BEGIN
+        DELETE FROM budgets WHERE project_id = OLD.id;
+    END;
+"""
+
+
+# SQL snippets shared by the sync migration and triggers
+_NEW_UUID_SQL = "lower(hex(randomblob(16)))"
+_NOW_SQL = "strftime('%Y-%m-%dT%H:%M:%fZ', 'now')"
+_DEVICE_SQL = "(SELECT value FROM settings WHERE key = 'sync_device_id')"
+_LOGGING_SQL = "(SELECT value FROM settings WHERE key = 'sync_suppress') IS NULL"
+
+
+def _log_change_sql(entity: str, uuid_sql: str, op: str) -> str:
+    """Trigger statement that appends one row to the change log."""
+    return f"""
+        INSERT INTO changes (entity, uuid, op, changed_at, origin)
+        SELECT '{entity}', {uuid_sql}, '{op}', {_NOW_SQL}, {_DEVICE_SQL}
+        WHERE {_LOGGING_SQL};
+    """
+
+
+# Triggers keep the change log up to date whatever code writes the rows.
+# New rows get a UUID here too (ALTER TABLE can't add a column with a
+# random default). The UPDATE that sets it has OLD.uuid NULL, which the
+# update triggers ignore, so each insert is logged once.
+_SYNC_TRIGGERS_SQL = f"""
+    CREATE TRIGGER IF NOT EXISTS sessions_sync_insert AFTER INSERT ON sessions
+    BEGIN
+        UPDATE sessions SET uuid = {_NEW_UUID_SQL} WHERE id = NEW.id AND uuid IS NULL;
+        {_log_change_sql("session", "(SELECT uuid FROM sessions WHERE id = NEW.id)", "upsert")}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS sessions_sync_update AFTER UPDATE ON sessions
+    WHEN OLD.uuid IS NOT NULL
+    BEGIN
+        {_log_change_sql("session", "NEW.uuid", "upsert")}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS sessions_sync_delete AFTER DELETE ON sessions
+    BEGIN
+        {_log_change_sql("session", "OLD.uuid", "delete")}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS projects_sync_insert AFTER INSERT ON projects
+    BEGIN
+        UPDATE projects SET uuid = {_NEW_UUID_SQL} WHERE id = NEW.id AND uuid IS NULL;
+        {_log_change_sql("project", "(SELECT uuid FROM projects WHERE id = NEW.id)", "upsert")}
+    END;
+
+    -- Not frecency: it's local usage bookkeeping and changes on every start
+    CREATE TRIGGER IF NOT EXISTS projects_sync_update
+    AFTER UPDATE OF name, priority, is_background ON projects
+    WHEN OLD.uuid IS NOT NULL
+    BEGIN
+        {_log_change_sql("project", "NEW.uuid", "upsert")}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS projects_sync_delete AFTER DELETE ON projects
+    BEGIN
+        {_log_change_sql("project", "OLD.uuid", "delete")}
+    END;
+
+    -- A project's tags travel with the project
+    CREATE TRIGGER IF NOT EXISTS project_tags_sync_insert AFTER INSERT ON project_tags
+    BEGIN
+        {_log_change_sql("project", "(SELECT uuid FROM projects WHERE id = NEW.project_id)", "upsert")}
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS project_tags_sync_delete AFTER DELETE ON project_tags
+    WHEN (SELECT uuid FROM projects WHERE id = OLD.project_id) IS NOT NULL
+    BEGIN
+        {_log_change_sql("project", "(SELECT uuid FROM projects WHERE id = OLD.project_id)", "upsert")}
+    END;
+"""
+
 
 # =============================================================================
 # CONNECTION MANAGEMENT
@@ -291,6 +663,19 @@ def get_connection():
             cursor = conn.cursor()
             # ... do stuff
     """
+    # Inside shared_connection()/transaction() every call reuses one connection
+    shared = getattr(_local, "conn", None)
+    if shared is not None:
+        try:
+            yield shared
+        except BaseException:
+            # Mirror closing a private connection: uncommitted work from the
+            # failed call is discarded (unless an outer transaction owns it)
+            if not shared.txn_depth and shared.in_transaction:
+                shared.rollback()
+            raise
+        return
+
     conn = sqlite3.connect(DATABASE_PATH)
     # Row factory controls how rows are returned
     # sqlite3.Row allows both index access (row[0]) and name access (row["column"])
@@ -301,6 +686,183 @@ def get_connection():
         conn.close()
 
 
+# Per-thread state for shared_connection(): _local.conn is the connection
+# get_connection() hands out instead of opening a new one
+_local = threading.local()
+
+
+class _SharedConnection(sqlite3.Connection):
+    """
+    A connection reused by every get_connection() call on one thread.
+
+    The db functions each commit their own work. While a transaction() is
+    open (txn_depth > 0) commit() does nothing, which turns a series of
+    those calls into one all-or-nothing unit; transaction() issues the
+    real COMMIT at the end.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.txn_depth = 0
+        # Set when a write inside a transaction needs a fresh completion
+        # cache; it's rewritten once, after the commit
+        self.completion_pending = False
+
+    def commit(self):
+        if self.txn_depth == 0:
+            super().commit()
+
+
+@contextmanager
+def shared_connection():
+    """
+    Route every database call on this thread through one connection.
+
+    Opening a SQLite connection is cheap but not free; code that makes
+    many calls in a row (tt batch, long-running front ends) can wrap them
+    in this to pay for it once. Nested uses reuse the outer connection.
+
+    Usage:
+        with shared_connection():
+            for line in lines:
+                db.log_session(...)
+    """
+    existing = getattr(_local, "conn", None)
+    if existing is not None:
+        yield existing
+        return
+
+    conn = sqlite3.connect(DATABASE_PATH, factory=_SharedConnection)
+    conn.row_factory = sqlite3.Row
+    _local.conn = conn
+    try:
+        yield conn
+    finally:
+        _local.conn = None
+        conn.close()
+
+
+@contextmanager
+def transaction(immediate: bool = False):
+    """
+    Run a group of db calls as one transaction.
+
+    Everything inside commits together when the block exits normally and
+    is rolled back if it raises. Nested transaction() blocks become
+    savepoints, so an inner failure only undoes the inner block.
+
+    Args:
+        immediate: Take the write lock up front (BEGIN IMMEDIATE). Use this
+            when the block reads something and then writes based on it, so
+            no other process can change it in between. Ignored when nested.
+
+    Usage:
+        with transaction():
+            db.stop_session("Reading")
+            db.start_session("Writing")
+    """
+    with shared_connection() as conn:
+        if conn.txn_depth:
+            with savepoint() as inner:
+                yield inner
+            return
+
+        # Each db function commits its own work, so nothing should be
+        # pending here; flush it anyway rather than folding it in
+        if conn.in_transaction:
+            sqlite3.Connection.commit(conn)
+
+        # ATTACH isn't allowed once the transaction starts, and calls
+        # inside it may need any archive (see ARCHIVES below)
+        _attach_archives(conn)
+
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        conn.txn_depth = 1
+        conn.completion_pending = False
+        try:
+            yield conn
+        except BaseException:
+            conn.txn_depth = 0
+            conn.rollback()
+            raise
+        conn.txn_depth = 0
+        conn.commit()
+
+        if conn.completion_pending:
+            refresh_completion_cache()
+
+
+@contextmanager
+def savepoint():
+    """
+    Run part of an open transaction() so it can fail on its own.
+
+    If the block raises, only its changes are rolled back and the
+    exception propagates; the surrounding transaction carries on.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is None or not conn.txn_depth:
+        raise RuntimeError("savepoint() must be used inside transaction()")
+
+    name = f"sp_{conn.txn_depth}"
+    conn.execute(f"SAVEPOINT {name}")
+    conn.txn_depth += 1
+    try:
+        yield conn
+    except BaseException:
+        conn.execute(f"ROLLBACK TO {name}")
+        conn.execute(f"RELEASE {name}")
+        raise
+    else:
+        conn.execute(f"RELEASE {name}")
+    finally:
+        conn.txn_depth -= 1
+
+
+def get_data_version() -> int:
+    """
+    Return SQLite's data_version counter for this thread's connection.
+
+    The number changes whenever *another* connection commits to the
+    database, so a long-running reader can poll it (it costs no disk I/O)
+    and only re-query when something actually changed. Comparisons are
+    only meaningful on one connection, i.e. inside shared_connection().
+    """
+    with get_connection() as conn:
+        return conn.execute("PRAGMA data_version").fetchone()[0]
+
+
+def _names_changed():
+    """
+    Note that project or tag names (or their order) changed.
+
+    Rewrites the shell completion cache, or marks it to be rewritten when
+    the surrounding transaction() commits.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is not None and conn.txn_depth:
+        conn.completion_pending = True
+    else:
+        refresh_completion_cache()
+
+
+def refresh_completion_cache():
+    """
+    Rewrite the shell completion cache (see completion.py).
+
+    Failing to write it only makes completion stale, so errors are ignored.
+    """
+    try:
+        tags = [tag.name for tag in list_tags()]
+        completion.write(get_frecent_project_names(), tags)
+    except (OSError, sqlite3.Error):
+        pass
+
+
+# Database file init_database() has already set up in this process
+_initialized_path: Optional[Path] = None
+
+
 def init_database():
     """
     Create tables if they don't already exist.
@@ -315,6 +877,12 @@ def init_database():
     - UNIQUE: No two rows can have the same value
     - DEFAULT: Value used if none provided
     """
+    global _initialized_path
+
+    # Tables and migrations only need checking once per process and file
+    if _initialized_path == DATABASE_PATH:
+        return
+
     with get_connection() as conn:
         # cursor() creates a cursor object for executing SQL
         cursor = conn.cursor()
@@ -361,6 +929,12 @@ def init_database():
     # Split any existing sessions that span midnight
     split_sessions_at_midnight()
 
+    # First run (or the cache was deleted): give completion something to read
+    if not completion.CACHE_PATH.exists():
+        refresh_completion_cache()
+
+    _initialized_path = DATABASE_PATH
+
 
 # =============================================================================
 # SETTINGS OPERATIONS
@@ -450,6 +1024,8 @@ def create_project(name: str, priority: int = 3, tags: list[str] = None, is_back
         for tag_name in tags:
             add_tag_to_project(project_id, tag_name)
 
+    _names_changed()
+
     return Project(id=project_id, name=name, priority=priority, tags=tags or [], is_background=is_background)
 
 
@@ -464,7 +1040,7 @@ def get_project(name: str) -> Optional[Project]:
         cursor = conn.cursor()
 
         cursor.execute(
-            "SELECT id, name, created_at, priority, is_background FROM projects WHERE name = ?",
+            "SELECT id, name, created_at, priority, is_background, frecency FROM projects WHERE name = ?",
             (name,)
         )
 
@@ -486,7 +1062,8 @@ def get_project(name: str) -> Optional[Project]:
             created_at=datetime.fromisoformat(row["created_at"]),
             priority=row["priority"] if row["priority"] is not None else 3,
             tags=tags,
-            is_background=is_background
+            is_background=is_background,
+            frecency=row["frecency"]
         )
 
 
@@ -503,7 +1080,12 @@ def get_or_create_project(name: str) -> Project:
     return project
 
 
-def list_projects(tag: Optional[str] = None, min_priority: Optional[int] = None, is_background: Optional[bool] = None) -> list[Project]:
+def list_projects(
+    tag: Optional[str] = None,
+    min_priority: Optional[int] = None,
+    is_background: Optional[bool] = None,
+    filter_by: Optional[Filter] = None
+) -> list[Project]:
     """
     Get all projects, with optional filtering.
 
@@ -511,14 +1093,18 @@ def list_projects(tag: Optional[str] = None, min_priority: Optional[int] = None,
         tag: Filter to projects with this tag (only applies to regular projects)
         min_priority: Filter to projects with priority <= this value (1 is highest)
         is_background: If True, only background tasks; if False, only regular projects; if None, all
+        filter_by: Only projects matching this filter (no session-only terms)
 
     Returns:
         List of Project objects (may be empty)
+
+    Raises:
+        FilterError: If filter_by uses session-only terms (since, until, notes)
     """
     with get_connection() as conn:
         cursor = conn.cursor()
 
-        query = "SELECT id, name, created_at, priority, is_background FROM projects"
+        query = "SELECT id, name, created_at, priority, is_background, frecency FROM projects"
         params: list = []
 
         conditions = []
@@ -530,20 +1116,33 @@ def list_projects(tag: Optional[str] = None, min_priority: Optional[int] = None,
             conditions.append("is_background = ?")
             params.append(1 if is_background else 0)
 
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
+        if tag:
+            # Background tasks have no tags, so the tag filter passes them through
+            conditions.append("""(is_background = 1 OR id IN (
+                SELECT pt.project_id FROM project_tags pt
+                JOIN tags t ON t.id = pt.tag_id
+                WHERE t.name = ?
+            ))""")
+            params.append(tag)
 
-        query += " ORDER BY is_background ASC, priority ASC, name COLLATE NOCASE"
+        if filter_by:
+            filter_sql, filter_params = filter_by.projects_sql("projects")
+            conditions.append(f"({filter_sql})")
+            params.extend(filter_params)
+
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        query += where + " ORDER BY is_background ASC, priority ASC, name COLLATE NOCASE"
 
         cursor.execute(query, params)
         rows = cursor.fetchall()
 
-        # Fetch ALL project-tag associations in a single query
-        cursor.execute("""
+        # Fetch the tags of the listed projects in a single query
+        cursor.execute(f"""
             SELECT pt.project_id, t.name
             FROM project_tags pt
             JOIN tags t ON t.id = pt.tag_id
-        """)
+            WHERE pt.project_id IN (SELECT id FROM projects{where})
+        """, params)
         tag_rows = cursor.fetchall()
 
     # Build a dictionary mapping project_id -> list of tag names
@@ -560,22 +1159,99 @@ def list_projects(tag: Optional[str] = None, min_priority: Optional[int] = None,
         # Background tasks have empty tag lists; regular projects look up from the map
         tags = [] if row_is_background else project_tags_map.get(row["id"], [])
 
-        # Filter by tag if specified (only applies to regular projects)
-        if tag and not row_is_background and tag.lower() not in [t.lower() for t in tags]:
-            continue
-
         projects.append(Project(
             id=row["id"],
             name=row["name"],
             created_at=datetime.fromisoformat(row["created_at"]),
             priority=row["priority"] if row["priority"] is not None else 3,
             tags=tags,
-            is_background=row_is_background
+            is_background=row_is_background,
+            frecency=row["frecency"]
         ))
 
     return projects
 
 
+def get_frecent_project_names(limit: Optional[int] = None, is_background: Optional[bool] = None) -> list[str]:
+    """
+    Get project names ordered by frecency (most used recently first).
+
+    Projects that have never been started come last, alphabetically.
+
+    Args:
+        limit: Maximum number of names to return (None for all)
+        is_background: If True, only background tasks; if False, only regular projects; if None, all
+
+    Returns:
+        List of project names
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+
+        query = "SELECT name FROM projects"
+        params: list = []
+
+        if is_background is not None:
+            query += " WHERE is_background = ?"
+            params.append(1 if is_background else 0)
+
+        # NULLs sort lowest, so DESC puts never-used projects last
+        query += " ORDER BY frecency DESC, name COLLATE NOCASE"
+
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        cursor.execute(query, params)
+        return [row["name"] for row in cursor.fetchall()]
+
+
+def _frecency_points(when: datetime) -> float:
+    """
+    Score of a single use at the given time, in log2 units.
+
+    Each use is worth 2^(t / half-life), measured from a fixed epoch.
+    Because every score grows against the same epoch, decaying "now"
+    is the same for all projects and never needs to be written back,
+    so ORDER BY frecency stays correct as time passes.
+    """
+    elapsed = (when - FRECENCY_EPOCH).total_seconds()
+    return elapsed / (FRECENCY_HALF_LIFE_DAYS * 86400)
+
+
+def _add_frecency(score: Optional[float], when: datetime) -> float:
+    """
+    Add one use at the given time to a stored frecency score.
+
+    Scores are kept as log2 of the sum of 2^points, so adding a use is
+    a log-sum-exp that never overflows.
+
+    Args:
+        score: Current stored score (None if never used)
+        when: Time of the new use
+
+    Returns:
+        Updated score
+    """
+    points = _frecency_points(when)
+    if score is None:
+        return points
+    high, low = max(score, points), min(score, points)
+    return high + math.log2(1 + 2 ** (low - high))
+
+
+def _record_project_use(cursor: sqlite3.Cursor, project_name: str, when: datetime):
+    """Bump a project's frecency score using an open cursor."""
+    cursor.execute("SELECT frecency FROM projects WHERE name = ?", (project_name,))
+    row = cursor.fetchone()
+    if row is None:
+        return
+    cursor.execute(
+        "UPDATE projects SET frecency = ? WHERE name = ?",
+        (_add_frecency(row["frecency"], when), project_name)
+    )
+
+
 # =============================================================================
 # TAG OPERATIONS
 # =============================================================================
@@ -590,6 +1266,8 @@ def create_tag(name: str) -> Tag:
 
         tag_id = cursor.lastrowid
 
+    _names_changed()
+
     return Tag(id=tag_id, name=name.strip())
 
 
@@ -644,6 +1322,27 @@ def list_tags() -> list[Tag]:
         ]
 
 
+def list_tags_with_counts() -> list[tuple[str, int]]:
+    """
+    Get all tags with the number of projects using each, in one query.
+
+    Returns:
+        List of (tag_name, project_count) tuples, sorted alphabetically
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            SELECT t.name, COUNT(pt.project_id) AS project_count
+            FROM tags t
+            LEFT JOIN project_tags pt ON pt.tag_id = t.id
+            GROUP BY t.id
+            ORDER BY t.name COLLATE NOCASE
+        """)
+
+        return [(row["name"], row["project_count"]) for row in cursor.fetchall()]
+
+
 def get_project_tags(project_id: int) -> list[str]:
     """Get all tag names for a project."""
     with get_connection() as conn:
@@ -787,6 +1486,8 @@ def rename_project(old_name: str, new_name: str) -> Optional[Project]:
         return None
 
     with get_connection() as conn:
+        # Attach first: ATTACH isn't allowed once the UPDATEs have begun
+        archives = _attach_archives(conn)
         cursor = conn.cursor()
 
         # Update project name
@@ -800,9 +1501,18 @@ def rename_project(old_name: str, new_name: str) -> Optional[Project]:
             "UPDATE sessions SET project_name = ? WHERE project_name = ?",
             (new_name, old_name)
         )
+        for schema in archives:
+            _count_archived_sessions(cursor, schema, "project_name = ?", (old_name,), "-")
+            cursor.execute(
+                f"UPDATE {schema}.sessions SET project_name = ? WHERE project_name = ?",
+                (new_name, old_name)
+            )
+            _count_archived_sessions(cursor, schema, "project_name = ?", (new_name,), "+")
 
         conn.commit()
 
+    _names_changed()
+
     project.name = new_name
     return project
 
@@ -824,6 +1534,7 @@ def delete_project(project_name: str, delete_sessions: bool = False) -> bool:
         return False
 
     with get_connection() as conn:
+        archives = _attach_archives(conn) if delete_sessions else []
         cursor = conn.cursor()
 
         # Delete associated sessions if requested
@@ -832,6 +1543,12 @@ def delete_project(project_name: str, delete_sessions: bool = False) -> bool:
                 "DELETE FROM sessions WHERE project_name = ?",
                 (project_name,)
             )
+            for schema in archives:
+                _count_archived_sessions(cursor, schema, "project_name = ?", (project_name,), "-")
+                cursor.execute(
+                    f"DELETE FROM {schema}.sessions WHERE project_name = ?",
+                    (project_name,)
+                )
 
         # Delete project-tag associations (handled by CASCADE, but explicit for clarity)
         cursor.execute(
@@ -846,14 +1563,18 @@ def delete_project(project_name: str, delete_sessions: bool = False) -> bool:
         )
 
         conn.commit()
-        return cursor.rowcount > 0
+        deleted = cursor.rowcount > 0
+
+    _names_changed()
+
+    return deleted
 
 
 # =============================================================================
 # SESSION OPERATIONS
 # =============================================================================
 
-def start_session(project_name: str) -> Session:
+def start_session(project_name: str, start_time: Optional[datetime] = None) -> Session:
     """
     Begin a new tracking session for the given project.
 
@@ -861,6 +1582,7 @@ def start_session(project_name: str) -> Session:
 
     Args:
         project_name: Which project to track time for
+        start_time: When the session started (defaults to now)
 
     Returns:
         The newly created Session object
@@ -869,7 +1591,7 @@ def start_session(project_name: str) -> Session:
     get_or_create_project(project_name)
 
     # Record current time as the start
-    now = datetime.now()
+    now = start_time or datetime.now()
 
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -878,9 +1600,15 @@ def start_session(project_name: str) -> Session:
             "INSERT INTO sessions (project_name, start_time) VALUES (?, ?)",
             (project_name, now.isoformat())  # isoformat() converts datetime to string
         )
+        session_id = cursor.lastrowid
+
+        # Starting a session counts as a "use" for picker ordering
+        _record_project_use(cursor, project_name, now)
 
         conn.commit()
-        session_id = cursor.lastrowid
+
+    # Completion lists projects most-used first
+    _names_changed()
 
     return Session(
         id=session_id,
@@ -1024,6 +1752,15 @@ def get_session_by_id(session_id: int) -> Optional[Session]:
 
         row = cursor.fetchone()
 
+        # Not in the live table - it may have been archived
+        if row is None and list_archive_years():
+            cursor.execute(f"""
+                SELECT {SESSION_COLUMNS}
+                FROM {_sessions_source(conn)}
+                WHERE id = ?
+            """, (session_id,))
+            row = cursor.fetchone()
+
         if row is None:
             return None
 
@@ -1039,7 +1776,11 @@ def get_session_by_id(session_id: int) -> Optional[Session]:
         )
 
 
-def stop_session(project_name: Optional[str] = None, notes: str = "") -> Optional[Session]:
+def stop_session(
+    project_name: Optional[str] = None,
+    notes: str = "",
+    when: Optional[datetime] = None
+) -> Optional[Session]:
     """
     Stop an active session.
 
@@ -1049,98 +1790,136 @@ def stop_session(project_name: Optional[str] = None, notes: str = "") -> Optiona
         project_name: If provided, stop session for this specific project.
                      If None, stop the most recent active session.
         notes: Optional description of what you worked on
+        when: When the session ended (defaults to now)
 
     Returns:
         The stopped Session, or None if no matching session was active
     """
-    # Find the target session
-    if project_name:
-        active = get_active_session_by_project(project_name)
-    else:
-        active = get_active_session()
+    # Finding and stopping the session happen in one transaction, so no
+    # other process can stop (or pause) it in between
+    with transaction(immediate=True) as conn:
+        if project_name:
+            active = get_active_session_by_project(project_name)
+        else:
+            active = get_active_session()
 
-    if active is None:
-        return None
+        if active is None:
+            return None
 
-    now = datetime.now()
+        _end_session(conn.cursor(), active, when or datetime.now(), notes)
 
-    # If session was paused, accumulate the final paused time
-    final_paused_seconds = active.paused_seconds
-    if active.is_paused and active.pause_started_at:
-        additional_paused = int((now - active.pause_started_at).total_seconds())
-        final_paused_seconds += additional_paused
+    return active
 
-    with get_connection() as conn:
-        cursor = conn.cursor()
 
-        # UPDATE modifies existing rows
-        # SET specifies which columns to change
-        # WHERE ensures we only update the right row
-        cursor.execute("""
-            UPDATE sessions
-            SET end_time = ?, notes = ?, is_paused = 0, pause_started_at = NULL, paused_seconds = ?
-            WHERE id = ?
-        """, (now.isoformat(), notes, final_paused_seconds, active.id))
+def stop_all_sessions(notes: str = "", when: Optional[datetime] = None) -> list[Session]:
+    """
+    Stop ALL currently active sessions.
 
-        conn.commit()
+    All sessions end at the same moment, in one transaction, and paused
+    sessions have their open pause folded in just like stop_session().
 
-    # Update the in-memory object to reflect the change
-    active.end_time = now
-    active.notes = notes
-    active.is_paused = False
-    active.pause_started_at = None
-    active.paused_seconds = final_paused_seconds
+    Args:
+        notes: Optional notes applied to all stopped sessions
+        when: When the sessions ended (defaults to now)
 
-    # Split any sessions that crossed midnight boundaries
-    split_sessions_at_midnight()
+    Returns:
+        List of stopped Session objects
+    """
+    with transaction(immediate=True) as conn:
+        active_sessions = get_active_sessions()
 
-    return active
+        now = when or datetime.now()
+        cursor = conn.cursor()
+        for session in active_sessions:
+            _end_session(cursor, session, now, notes)
+
+    return active_sessions
 
 
-def stop_all_sessions(notes: str = "") -> list[Session]:
+def switch_session(
+    to_project: str,
+    from_project: Optional[str] = None,
+    notes: str = ""
+) -> tuple[Optional[Session], Session]:
     """
-    Stop ALL currently active sessions.
+    Stop one session and start another, as a single transaction.
+
+    The stop and the start share one timestamp, so no time is lost or
+    double-counted between them, and a crash can't leave only half of
+    the switch done.
 
     Args:
-        notes: Optional notes applied to all stopped sessions
+        to_project: Project to start tracking (created if needed)
+        from_project: Project to stop; defaults to the most recent active session
+        notes: Notes for the stopped session
 
     Returns:
-        List of stopped Session objects
+        Tuple of (stopped Session or None if nothing was active, new Session)
+
+    Raises:
+        ValueError: If to_project is already being tracked
     """
-    active_sessions = get_active_sessions()
+    if from_project and from_project == to_project:
+        raise ValueError(f"Already tracking {to_project}")
 
-    if not active_sessions:
-        return []
+    with transaction(immediate=True) as conn:
+        if get_active_session_by_project(to_project) is not None:
+            raise ValueError(f"{to_project} is already being tracked")
 
-    now = datetime.now()
+        if from_project:
+            stopped = get_active_session_by_project(from_project)
+        else:
+            stopped = get_active_session()
 
-    with get_connection() as conn:
-        cursor = conn.cursor()
+        now = datetime.now()
+        if stopped is not None:
+            _end_session(conn.cursor(), stopped, now, notes)
 
-        # Stop each session
-        for session in active_sessions:
-            cursor.execute("""
-                UPDATE sessions
-                SET end_time = ?, notes = ?
-                WHERE id = ?
-            """, (now.isoformat(), notes, session.id))
-            session.end_time = now
-            session.notes = notes
+        started = start_session(to_project, start_time=now)
 
-        conn.commit()
+    return stopped, started
 
-    # Split any sessions that crossed midnight boundaries
-    split_sessions_at_midnight()
 
-    return active_sessions
+def _end_session(cursor: sqlite3.Cursor, session: Session, now: datetime, notes: str):
+    """
+    End an active session at `now` and split it if it crossed midnight.
+
+    Folds any open pause into paused_seconds and updates the Session
+    object to match. The caller commits.
+    """
+    # If session was paused, accumulate the final paused time
+    final_paused_seconds = session.paused_seconds
+    if session.is_paused and session.pause_started_at:
+        additional_paused = int((now - session.pause_started_at).total_seconds())
+        final_paused_seconds += additional_paused
+
+    # UPDATE modifies existing rows
+    # SET specifies which columns to change
+    # WHERE ensures we only update the right row
+    cursor.execute("""
+        UPDATE sessions
+        SET end_time = ?, notes = ?, is_paused = 0, pause_started_at = NULL, paused_seconds = ?
+        WHERE id = ?
+    """, (now.isoformat(), notes, final_paused_seconds, session.id))
 
+    # Update the in-memory object to reflect the change
+    session.end_time = now
+    session.notes = notes
+    session.is_paused = False
+    session.pause_started_at = None
+    session.paused_seconds = final_paused_seconds
+
+    # Split this session if it crossed midnight (no need to scan the table)
+    _split_session(cursor, session.id)
 
-def pause_session(session_id: int) -> Optional[Session]:
+
+def pause_session(session_id: int, when: Optional[datetime] = None) -> Optional[Session]:
     """
     Pause an active session.
 
     Args:
         session_id: ID of the session to pause
+        when: When the pause began (defaults to now)
 
     Returns:
         The paused Session, or None if session not found or already paused
@@ -1174,7 +1953,7 @@ def pause_session(session_id: int) -> Optional[Session]:
                 pause_started_at=datetime.fromisoformat(row["pause_started_at"]) if row["pause_started_at"] else None
             )
 
-        now = datetime.now()
+        now = when or datetime.now()
 
         cursor.execute("""
             UPDATE sessions
@@ -1196,12 +1975,13 @@ def pause_session(session_id: int) -> Optional[Session]:
         )
 
 
-def resume_session(session_id: int) -> Optional[Session]:
+def resume_session(session_id: int, when: Optional[datetime] = None) -> Optional[Session]:
     """
     Resume a paused session.
 
     Args:
         session_id: ID of the session to resume
+        when: When the pause ended (defaults to now)
 
     Returns:
         The resumed Session, or None if session not found or not paused
@@ -1235,9 +2015,9 @@ def resume_session(session_id: int) -> Optional[Session]:
                 pause_started_at=None
             )
 
-        now = datetime.now()
+        now = when or datetime.now()
         pause_started = datetime.fromisoformat(row["pause_started_at"]) if row["pause_started_at"] else now
-        additional_paused = int((now - pause_started).total_seconds())
+        additional_paused = max(0, int((now - pause_started).total_seconds()))
         new_paused_seconds = (row["paused_seconds"] or 0) + additional_paused
 
         cursor.execute("""
@@ -1295,11 +2075,14 @@ def log_session(
             INSERT INTO sessions (project_name, start_time, end_time, notes)
             VALUES (?, ?, ?, ?)
         """, (project_name, start_time.isoformat(), end_time.isoformat(), notes))
+        session_id = cursor.lastrowid
+
+        # Split the new session if it crosses midnight
+        _split_session(cursor, session_id)
 
         conn.commit()
-        session_id = cursor.lastrowid
 
-    session = Session(
+    return Session(
         id=session_id,
         project_name=project_name,
         start_time=start_time,
@@ -1307,17 +2090,13 @@ def log_session(
         notes=notes
     )
 
-    # Split any sessions that crossed midnight boundaries
-    split_sessions_at_midnight()
-
-    return session
-
 
 def get_sessions(
     project_name: Optional[str] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    limit: int = 50
+    limit: int = 50,
+    filter_by: Optional[Filter] = None
 ) -> list[Session]:
     """
     Query sessions with optional filters.
@@ -1327,6 +2106,7 @@ def get_sessions(
     - start_date: Only sessions that started on or after this time
     - end_date: Only sessions that started before this time
     - limit: Maximum number of results
+    - filter_by: Only sessions matching this filter (filters.parse_filter)
 
     Returns sessions in reverse chronological order (newest first).
     """
@@ -1335,9 +2115,9 @@ def get_sessions(
 
         # Build query dynamically based on which filters are provided
         # Start with base query
-        query = """
+        query = f"""
             SELECT id, project_name, start_time, end_time, notes
-            FROM sessions
+            FROM {_sessions_source(conn, start_date, end_date)}
             WHERE end_time IS NOT NULL
         """
         # We exclude active sessions (end_time IS NOT NULL) because
@@ -1359,6 +2139,11 @@ def get_sessions(
             query += " AND start_time < ?"
             params.append(end_date.isoformat())
 
+        if filter_by:
+            filter_sql, filter_params = filter_by.sessions_sql()
+            query += f" AND ({filter_sql})"
+            params.extend(filter_params)
+
         # Order by most recent first, cap results
         query += " ORDER BY start_time DESC LIMIT ?"
         params.append(limit)
@@ -1378,9 +2163,141 @@ def get_sessions(
         ]
 
 
+def iter_sessions(
+    project_name: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    limit: Optional[int] = None,
+    filter_by: Optional[Filter] = None
+) -> Iterator[sqlite3.Row]:
+    """
+    Stream completed sessions as raw rows, newest first.
+
+    Same filters as get_sessions(), but rows are yielded straight from the
+    cursor without building Session objects, so large listings use
+    constant memory. Each row has: id, project_name, start_time, end_time,
+    duration_seconds, notes.
+
+    The connection stays open until the generator is exhausted or closed.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+
+        query = f"""
+            SELECT
+                id,
+                project_name,
+                start_time,
+                end_time,
+                CAST(strftime('%s', end_time) - strftime('%s', start_time) AS INTEGER) AS duration_seconds,
+                COALESCE(notes, '') AS notes
+            FROM {_sessions_source(conn, start_date, end_date)}
+            WHERE end_time IS NOT NULL
+        """
+        params: list = []
+
+        if project_name:
+            query += " AND project_name = ?"
+            params.append(project_name)
+
+        if start_date:
+            query += " AND start_time >= ?"
+            params.append(start_date.isoformat())
+
+        if end_date:
+            query += " AND start_time < ?"
+            params.append(end_date.isoformat())
+
+        if filter_by:
+            filter_sql, filter_params = filter_by.sessions_sql()
+            query += f" AND ({filter_sql})"
+            params.extend(filter_params)
+
+        query += " ORDER BY start_time DESC"
+
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        # Iterating the cursor fetches rows lazily instead of fetchall()
+        yield from cursor.execute(query, params)
+
+
+def get_sessions_page(
+    project_name: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    after: Optional[Session] = None,
+    limit: int = 100
+) -> list[Session]:
+    """
+    Get one page of completed sessions, newest first.
+
+    Same filters as get_sessions(). Pass the last session of the previous
+    page as `after` to get the next one. Paging by position ("keyset"
+    paging) instead of OFFSET means every page is a quick index lookup,
+    however deep into the history it is, and no connection has to stay
+    open between pages.
+
+    Usage:
+        page = get_sessions_page(limit=100)
+        while page:
+            ...
+            page = get_sessions_page(after=page[-1], limit=100)
+
+    Returns:
+        Up to `limit` sessions; fewer (or none) at the end of the history
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+
+        query = f"""
+            SELECT id, project_name, start_time, end_time, notes
+            FROM {_sessions_source(conn, start_date, end_date)}
+            WHERE end_time IS NOT NULL
+        """
+        params: list = []
+
+        if project_name:
+            query += " AND project_name = ?"
+            params.append(project_name)
+
+        if start_date:
+            query += " AND start_time >= ?"
+            params.append(start_date.isoformat())
+
+        if end_date:
+            query += " AND start_time < ?"
+            params.append(end_date.isoformat())
+
+        if after is not None:
+            # Sessions sharing a start time are ordered by ID, so none are
+            # skipped or repeated at a page boundary
+            after_start = after.start_time.isoformat()
+            query += " AND (start_time < ? OR (start_time = ? AND id < ?))"
+            params.extend([after_start, after_start, after.id])
+
+        query += " ORDER BY start_time DESC, id DESC LIMIT ?"
+        params.append(limit)
+
+        cursor.execute(query, params)
+
+        return [
+            Session(
+                id=row["id"],
+                project_name=row["project_name"],
+                start_time=datetime.fromisoformat(row["start_time"]),
+                end_time=datetime.fromisoformat(row["end_time"]),
+                notes=row["notes"] or ""
+            )
+            for row in cursor.fetchall()
+        ]
+
+
 def get_summary(
     start_date: Optional[datetime] = None,
-    end_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None,
+    filter_by: Optional[Filter] = None
 ) -> dict[str, int]:
     """
     Get total seconds tracked per project within a date range.
@@ -1388,6 +2305,7 @@ def get_summary(
     Args:
         start_date: Count sessions starting on or after this time
         end_date: Count sessions starting before this time
+        filter_by: Only count sessions matching this filter
 
     Returns:
         Dictionary mapping project names to total seconds
@@ -1403,13 +2321,13 @@ def get_summary(
         # Subtracting start from end gives duration in seconds
         # SUM() adds up all durations for each project
         # GROUP BY creates one row per project
-        query = """
+        query = f"""
             SELECT
                 project_name,
                 SUM(
                     strftime('%s', end_time) - strftime('%s', start_time)
                 ) as total_seconds
-            FROM sessions
+            FROM {_sessions_source(conn, start_date, end_date)}
             WHERE end_time IS NOT NULL
         """
 
@@ -1423,6 +2341,11 @@ def get_summary(
             query += " AND start_time < ?"
             params.append(end_date.isoformat())
 
+        if filter_by:
+            filter_sql, filter_params = filter_by.sessions_sql()
+            query += f" AND ({filter_sql})"
+            params.extend(filter_params)
+
         query += " GROUP BY project_name ORDER BY total_seconds DESC"
 
         cursor.execute(query, params)
@@ -1439,7 +2362,8 @@ def get_summary(
 def get_summary_with_priority(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    is_background: Optional[bool] = None
+    is_background: Optional[bool] = None,
+    filter_by: Optional[Filter] = None
 ) -> dict[str, dict]:
     """
     Get total seconds tracked per project with priority info.
@@ -1448,6 +2372,7 @@ def get_summary_with_priority(
         start_date: Count sessions starting on or after this time
         end_date: Count sessions starting before this time
         is_background: If True, only background tasks; if False, only regular projects; if None, all
+        filter_by: Only count sessions matching this filter
 
     Returns:
         Dictionary mapping project names to {seconds, priority, is_background}
@@ -1457,7 +2382,7 @@ def get_summary_with_priority(
     with get_connection() as conn:
         cursor = conn.cursor()
 
-        query = """
+        query = f"""
             SELECT
                 s.project_name,
                 COALESCE(p.priority, 3) as priority,
@@ -1465,7 +2390,7 @@ def get_summary_with_priority(
                 SUM(
                     strftime('%s', s.end_time) - strftime('%s', s.start_time)
                 ) as total_seconds
-            FROM sessions s
+            FROM {_sessions_source(conn, start_date, end_date)} s
             LEFT JOIN projects p ON s.project_name = p.name
             WHERE s.end_time IS NOT NULL
         """
@@ -1485,6 +2410,11 @@ def get_summary_with_priority(
             params.append(1 if is_background else 0)
             params.append(1 if is_background else 0)
 
+        if filter_by:
+            filter_sql, filter_params = filter_by.sessions_sql()
+            query += f" AND ({filter_sql})"
+            params.extend(filter_params)
+
         query += " GROUP BY s.project_name ORDER BY priority ASC, total_seconds DESC"
 
         cursor.execute(query, params)
@@ -1504,7 +2434,8 @@ def get_summary_with_priority(
 def get_summary_by_day(
     start_date: datetime,
     end_date: datetime,
-    is_background: Optional[bool] = None
+    is_background: Optional[bool] = None,
+    filter_by: Optional[Filter] = None
 ) -> dict[str, dict]:
     """
     Get per-project, per-day breakdown of time tracked.
@@ -1513,6 +2444,7 @@ def get_summary_by_day(
         start_date: Count sessions starting on or after this time
         end_date: Count sessions starting before this time
         is_background: If True, only background tasks; if False, only regular projects; if None, all
+        filter_by: Only count sessions matching this filter
 
     Returns:
         Dictionary with structure:
@@ -1522,7 +2454,7 @@ def get_summary_by_day(
     with get_connection() as conn:
         cursor = conn.cursor()
 
-        query = """
+        query = f"""
             SELECT
                 s.project_name,
                 COALESCE(p.priority, 3) as priority,
@@ -1531,7 +2463,7 @@ def get_summary_by_day(
                 SUM(
                     strftime('%s', s.end_time) - strftime('%s', s.start_time)
                 ) as total_seconds
-            FROM sessions s
+            FROM {_sessions_source(conn, start_date, end_date)} s
             LEFT JOIN projects p ON s.project_name = p.name
             WHERE s.end_time IS NOT NULL
               AND s.start_time >= ?
@@ -1545,6 +2477,11 @@ def get_summary_by_day(
             params.append(1 if is_background else 0)
             params.append(1 if is_background else 0)
 
+        if filter_by:
+            filter_sql, filter_params = filter_by.sessions_sql()
+            query += f" AND ({filter_sql})"
+            params.extend(filter_params)
+
         query += " GROUP BY s.project_name, date(s.start_time)"
 
         cursor.execute(query, params)
@@ -1574,7 +2511,8 @@ def get_summary_by_day(
 
 def get_summary_by_tag(
     start_date: datetime,
-    end_date: datetime
+    end_date: datetime,
+    filter_by: Optional[Filter] = None
 ) -> dict[str, dict]:
     """
     Get per-tag, per-project, per-day breakdown of time tracked.
@@ -1585,6 +2523,7 @@ def get_summary_by_tag(
     Args:
         start_date: Count sessions starting on or after this time
         end_date: Count sessions starting before this time
+        filter_by: Only count sessions matching this filter
 
     Returns:
         Dictionary with structure:
@@ -1633,22 +2572,30 @@ def get_summary_by_tag(
         project_id_to_name: dict[int, str] = {row["id"]: row["name"] for row in project_rows}
 
         # Get per-day session data for regular projects
-        cursor.execute("""
+        query = f"""
             SELECT
                 s.project_name,
                 date(s.start_time) as session_date,
                 SUM(
                     strftime('%s', s.end_time) - strftime('%s', s.start_time)
                 ) as total_seconds
-            FROM sessions s
+            FROM {_sessions_source(conn, start_date, end_date)} s
             LEFT JOIN projects p ON s.project_name = p.name
             WHERE s.end_time IS NOT NULL
               AND s.start_time >= ?
               AND s.start_time < ?
               AND (p.is_background = 0 OR p.is_background IS NULL)
-            GROUP BY s.project_name, date(s.start_time)
-        """, (start_date.isoformat(), end_date.isoformat()))
+        """
+        params: list = [start_date.isoformat(), end_date.isoformat()]
+
+        if filter_by:
+            filter_sql, filter_params = filter_by.sessions_sql()
+            query += f" AND ({filter_sql})"
+            params.extend(filter_params)
 
+        query += " GROUP BY s.project_name, date(s.start_time)"
+
+        cursor.execute(query, params)
         session_rows = cursor.fetchall()
 
     # Build project data structure
@@ -1736,50 +2683,86 @@ def split_sessions_at_midnight() -> int:
               AND date(start_time) != date(end_time)
         """)
 
-        sessions_to_split = cursor.fetchall()
+        for row in cursor.fetchall():
+            splits_created += _split_session_row(cursor, row)
+
+        conn.commit()
 
-        for row in sessions_to_split:
-            session_id = row["id"]
-            project_name = row["project_name"]
-            start_time = datetime.fromisoformat(row["start_time"])
-            end_time = datetime.fromisoformat(row["end_time"])
-            notes = row["notes"] or ""
+    return splits_created
 
-            # Calculate the end of the first day (23:59:59)
-            first_day_end = start_time.replace(hour=23, minute=59, second=59, microsecond=0)
 
-            # Update original session to end at midnight of the first day
-            cursor.execute("""
-                UPDATE sessions
-                SET end_time = ?
-                WHERE id = ?
-            """, (first_day_end.isoformat(), session_id))
+def _split_session(cursor: sqlite3.Cursor, session_id: int) -> int:
+    """
+    Split one session if it spans midnight.
 
-            # Create sessions for each subsequent day
-            current_day_start = (start_time.replace(hour=0, minute=0, second=0, microsecond=0)
-                                + timedelta(days=1))
+    Used right after a session is stopped or logged, instead of scanning
+    every session with split_sessions_at_midnight(). The caller commits.
 
-            while current_day_start.date() <= end_time.date():
-                # Determine the end time for this day's segment
-                if current_day_start.date() == end_time.date():
-                    # This is the final day - use the actual end time
-                    segment_end = end_time
-                else:
-                    # Not the final day - end at 23:59:59
-                    segment_end = current_day_start.replace(hour=23, minute=59, second=59, microsecond=0)
+    Returns:
+        Number of new sessions created
+    """
+    cursor.execute("""
+        SELECT id, project_name, start_time, end_time, notes
+        FROM sessions
+        WHERE id = ?
+          AND end_time IS NOT NULL
+          AND date(start_time) != date(end_time)
+    """, (session_id,))
+
+    row = cursor.fetchone()
+    if row is None:
+        return 0
+    return _split_session_row(cursor, row)
 
-                # Insert new session for this day
-                cursor.execute("""
-                    INSERT INTO sessions (project_name, start_time, end_time, notes)
-                    VALUES (?, ?, ?, ?)
-                """, (project_name, current_day_start.isoformat(), segment_end.isoformat(), notes))
 
-                splits_created += 1
+def _split_session_row(cursor: sqlite3.Cursor, row: sqlite3.Row) -> int:
+    """
+    Split a midnight-spanning session row into one session per day.
+
+    Returns:
+        Number of new sessions created
+    """
+    splits_created = 0
+
+    session_id = row["id"]
+    project_name = row["project_name"]
+    start_time = datetime.fromisoformat(row["start_time"])
+    end_time = datetime.fromisoformat(row["end_time"])
+    notes = row["notes"] or ""
 
-                # Move to next day
-                current_day_start += timedelta(days=1)
+    # Calculate the end of the first day (23:59:59)
+    first_day_end = start_time.replace(hour=23, minute=59, second=59, microsecond=0)
 
-        conn.commit()
+    # Update original session to end at midnight of the first day
+    cursor.execute("""
+        UPDATE sessions
+        SET end_time = ?
+        WHERE id = ?
+    """, (first_day_end.isoformat(), session_id))
+
+    # Create sessions for each subsequent day
+    current_day_start = (start_time.replace(hour=0, minute=0, second=0, microsecond=0)
+                        + timedelta(days=1))
+
+    while current_day_start.date() <= end_time.date():
+        # Determine the end time for this day's segment
+        if current_day_start.date() == end_time.date():
+            # This is the final day - use the actual end time
+            segment_end = end_time
+        else:
+            # Not the final day - end at 23:59:59
+            segment_end = current_day_start.replace(hour=23, minute=59, second=59, microsecond=0)
+
+        # Insert new session for this day
+        cursor.execute("""
+            INSERT INTO sessions (project_name, start_time, end_time, notes)
+            VALUES (?, ?, ?, ?)
+        """, (project_name, current_day_start.isoformat(), segment_end.isoformat(), notes))
+
+        splits_created += 1
+
+        # Move to next day
+        current_day_start += timedelta(days=1)
 
     return splits_created
 
@@ -1792,35 +2775,60 @@ def delete_session(session_id: int) -> bool:
     Use with caution—there's no undo.
     """
     with get_connection() as conn:
+        # Attach before writing: ATTACH isn't allowed inside a transaction
+        archives = _attach_archives(conn)
         cursor = conn.cursor()
 
         cursor.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
 
+        # rowcount tells us how many rows were affected
+        deleted = cursor.rowcount
+
+        # Not in the live table - it may have been archived
+        for schema in archives:
+            if deleted:
+                break
+            _count_archived_sessions(cursor, schema, "id = ?", (session_id,), "-")
+            cursor.execute(f"DELETE FROM {schema}.sessions WHERE id = ?", (session_id,))
+            deleted = cursor.rowcount
+
         conn.commit()
 
-        # rowcount tells us how many rows were affected
-        return cursor.rowcount > 0
+        return deleted > 0
 
 
-def export_sessions_csv(filepath: str):
+def export_sessions_csv(filepath: str, filter_by: Optional[Filter] = None):
     """
     Export all completed sessions to a CSV file.
 
     CSV (Comma-Separated Values) is a simple text format that
     spreadsheet programs like Excel can open.
+
+    Args:
+        filepath: CSV file to write
+        filter_by: Only export sessions matching this filter
     """
     import csv  # Standard library CSV writer
 
     with get_connection() as conn:
         cursor = conn.cursor()
 
-        cursor.execute("""
+        query = f"""
             SELECT project_name, start_time, end_time, notes,
                    (strftime('%s', end_time) - strftime('%s', start_time)) as duration_seconds
-            FROM sessions
+            FROM {_sessions_source(conn)}
             WHERE end_time IS NOT NULL
-            ORDER BY start_time
-        """)
+        """
+        params: list = []
+
+        if filter_by:
+            filter_sql, filter_params = filter_by.sessions_sql()
+            query += f" AND ({filter_sql})"
+            params.extend(filter_params)
+
+        query += " ORDER BY start_time"
+
+        cursor.execute(query, params)
 
         rows = cursor.fetchall()
 
@@ -1851,3 +2859,1714 @@ def export_sessions_csv(filepath: str):
                 hours,
                 row["notes"]
             ])
+
+
+# Columns of an incremental export file
+INCREMENTAL_EXPORT_HEADER = [
+    "Change",
+    "Session UUID",
+    "Project",
+    "Start Time",
+    "End Time",
+    "Duration (seconds)",
+    "Duration (hours)",
+    "Notes"
+]
+
+
+def export_sessions_incremental(filepath: str, feed: str = "default") -> int:
+    """
+    Append sessions changed since the last incremental export to a CSV file.
+
+    Each feed remembers how far it has exported (a watermark in the
+    settings table: the change log sequence number it reached). A run
+    reads only the change log entries after that, so its cost depends on
+    what changed, not on the size of the history.
+
+    Rows start with a Change column: "upsert" for a new or edited session
+    (replace any earlier row with the same Session UUID) or "delete" for
+    a removed one. Active sessions are left for the run after they stop.
+
+    Args:
+        filepath: CSV file to append to (created with a header if missing)
+        feed: Name of the watermark, so several pipelines can export
+              independently
+
+    Returns:
+        Number of rows written
+
+    Raises:
+        ValueError: If the file exists with a different header (e.g. a
+                    full export), so the rows wouldn't match its columns
+    """
+    import csv
+
+    path = Path(filepath)
+    write_header = not path.exists() or path.stat().st_size == 0
+    if not write_header:
+        with open(path, newline="", encoding="utf-8") as f:
+            header = next(csv.reader(f), None)
+        if header != INCREMENTAL_EXPORT_HEADER:
+            raise ValueError(f"{path} isn't an incremental export (its columns differ); choose another file")
+
+    watermark_key = f"export_watermark_{feed}"
+    watermark = int(get_setting(watermark_key, "0"))
+
+    with shared_connection() as conn:
+        source = _sessions_source(conn)
+
+        # One read transaction: the rows and the new watermark must match
+        with transaction():
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT c.seq, c.uuid, c.op,
+                       EXISTS (
+                           SELECT 1 FROM changes earlier
+                           WHERE earlier.entity = 'session'
+                             AND earlier.uuid = c.uuid
+                             AND earlier.seq <= ?
+                       ) as seen_before
+                FROM changes c
+                JOIN (
+                    SELECT MAX(seq) as seq FROM changes
+                    WHERE entity = 'session' AND seq > ?
+                    GROUP BY uuid
+                ) latest ON c.seq = latest.seq
+                ORDER BY c.seq
+            """, (watermark, watermark))
+            changes = cursor.fetchall()
+
+            new_watermark = cursor.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0]
+
+            rows = []
+            for change in changes:
+                if change["op"] == "delete":
+                    # Created and deleted since the last run: never exported
+                    if change["seen_before"]:
+                        rows.append(["delete", change["uuid"], "", "", "", "", "", ""])
+                    continue
+
+                cursor.execute(f"""
+                    SELECT project_name, start_time, end_time, notes,
+                           (strftime('%s', end_time) - strftime('%s', start_time)) as duration_seconds
+                    FROM {source}
+                    WHERE uuid = ? AND end_time IS NOT NULL
+                """, (change["uuid"],))
+                row = cursor.fetchone()
+                if row is None:
+                    continue  # Still running
+                secs = int(row["duration_seconds"])
+                rows.append([
+                    "upsert",
+                    change["uuid"],
+                    row["project_name"],
+                    row["start_time"],
+                    row["end_time"],
+                    secs,
+                    round(secs / 3600, 2),
+                    row["notes"],
+                ])
+
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        if write_header:
+            writer.writerow(INCREMENTAL_EXPORT_HEADER)
+        writer.writerows(rows)
+
+    # Only move the watermark once the rows are safely written; a session
+    # still running is picked up again when it stops (that's a new change)
+    set_setting(watermark_key, str(new_watermark))
+
+    return len(rows)
+
+
+# =============================================================================
+# ARCHIVES
+# =============================================================================
+#
+# Closed sessions can be moved out of timetrack.db into one archive file
+# per year (timetrack_archive_2024.db, ...) next to it, so the live file
+# stays small: backups, the midnight splitter and everyday queries only
+# deal with recent data.
+#
+# Queries that read completed sessions use _sessions_source() in their
+# FROM clause. It ATTACHes the archives whose years overlap the query's
+# date range to the connection and returns a UNION ALL of them with the
+# live table - so "today" and "this week" never open an archive, and
+# all-time queries see everything.
+
+# Archive file names: ARCHIVE_PREFIX + year + ".db"
+ARCHIVE_PREFIX = "timetrack_archive_"
+
+# Session columns kept in archives (and read through _sessions_source)
+SESSION_COLUMNS = "id, project_name, start_time, end_time, notes, is_paused, paused_seconds, pause_started_at, is_compacted, uuid"
+
+
+def get_archive_path(year: int) -> Path:
+    """Path of the archive file for one year."""
+    return DATABASE_PATH.parent / f"{ARCHIVE_PREFIX}{year}.db"
+
+
+def list_archive_years() -> list[int]:
+    """Years that have an archive file, oldest first."""
+    years = []
+    for path in DATABASE_PATH.parent.glob(f"{ARCHIVE_PREFIX}*.db"):
+        suffix = path.stem[len(ARCHIVE_PREFIX):]
+        if suffix.isdigit():
+            years.append(int(suffix))
+    return sorted(years)
+
+
+def _attach_archives(
+    conn: sqlite3.Connection,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> list[str]:
+    """
+    Attach the archives that may hold sessions in a date range.
+
+    Archives already attached to this connection are reused. SQLite can't
+    ATTACH inside a transaction: transaction() attaches every archive
+    before it begins, and callers on their own connection attach before
+    writing.
+
+    Returns:
+        Schema names of the attached archives (e.g. "archive_2024")
+
+    Raises:
+        sqlite3.OperationalError: If an archive that isn't attached is
+            needed inside a transaction (rather than leaving its sessions
+            out of the result)
+    """
+    years = [
+        year for year in list_archive_years()
+        if (end_date is None or datetime(year, 1, 1) < end_date)
+        and (start_date is None or datetime(year + 1, 1, 1) > start_date)
+    ]
+    if not years:
+        return []
+
+    attached = {row[1] for row in conn.execute("PRAGMA database_list")}
+    schemas = []
+    for year in years:
+        schema = f"archive_{year}"
+        if schema not in attached:
+            if conn.in_transaction:
+                raise sqlite3.OperationalError(
+                    f"Archive {year} can't be attached inside a transaction"
+                )
+            conn.execute(f"ATTACH DATABASE ? AS {schema}", (str(get_archive_path(year)),))
+        schemas.append(schema)
+    return schemas
+
+
+def _sessions_source(
+    conn: sqlite3.Connection,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> str:
+    """
+    SQL for the FROM clause of a completed-sessions query.
+
+    Just "sessions" unless archives overlap the date range; then a
+    subquery combining the live table with them. SQLite pushes the outer
+    WHERE into each part, so every file still uses its start_time index.
+    """
+    schemas = _attach_archives(conn, start_date, end_date)
+    if not schemas:
+        return "sessions"
+
+    parts = [f"SELECT {SESSION_COLUMNS} FROM main.sessions"]
+    parts += [f"SELECT {SESSION_COLUMNS} FROM {schema}.sessions" for schema in schemas]
+    return "(" + " UNION ALL ".join(parts) + ")"
+
+
+def _count_archived_sessions(cursor: sqlite3.Cursor, schema: str, where: str, params: tuple, sign: str):
+    """
+    Add archived sessions to the budget counters ("+") or take them off ("-").
+
+    The counter triggers only see main.sessions, so code that edits an
+    archive calls this with "-" before and "+" after (see BUDGETS below).
+    """
+    for period, start_sql in _COUNTER_PERIODS:
+        cursor.execute(f"""
+            INSERT INTO main.time_counters (project_name, period, period_start, seconds)
+            SELECT project_name, '{period}', {start_sql.format(row="s")}, {sign}SUM({_worked_seconds_sql("s.")})
+            FROM {schema}.sessions s
+            WHERE s.end_time IS NOT NULL AND ({where})
+            GROUP BY 1, 3
+            ON CONFLICT (project_name, period, period_start)
+            DO UPDATE SET seconds = seconds + excluded.seconds
+        """, params)
+
+
+def archive_sessions(before: datetime) -> dict[int, int]:
+    """
+    Move closed sessions that started before a date into yearly archives.
+
+    Sessions keep their IDs. Everything is moved in one transaction
+    across all the files, so an interruption leaves each session in
+    exactly one place. Afterwards the live database is VACUUMed so the
+    file actually shrinks.
+
+    Args:
+        before: Archive sessions starting before this time
+
+    Returns:
+        Dictionary mapping year to the number of sessions archived
+        Example: {2023: 1200, 2024: 310}
+    """
+    cutoff = before.isoformat()
+    moved: dict[int, int] = {}
+
+    with get_connection() as conn:
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            SELECT DISTINCT strftime('%Y', start_time) as year
+            FROM sessions
+            WHERE end_time IS NOT NULL AND start_time < ?
+        """, (cutoff,))
+        years = sorted(int(row["year"]) for row in cursor.fetchall())
+        if not years:
+            return moved
+
+        # Sessions are split at midnight, so each one belongs to the year
+        # it starts in. ATTACH creates missing archive files.
+        attached = {row[1] for row in cursor.execute("PRAGMA database_list")}
+        for year in years:
+            schema = f"archive_{year}"
+            if schema not in attached:
+                cursor.execute(f"ATTACH DATABASE ? AS {schema}", (str(get_archive_path(year)),))
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {schema}.sessions (
+                    id INTEGER PRIMARY KEY,
+                    project_name TEXT NOT NULL,
+                    start_time TEXT NOT NULL,
+                    end_time TEXT,
+                    notes TEXT DEFAULT '',
+                    is_paused INTEGER DEFAULT 0,
+                    paused_seconds INTEGER DEFAULT 0,
+                    pause_started_at TEXT,
+                    is_compacted INTEGER DEFAULT 0,
+                    uuid TEXT
+                )
+            """)
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {schema}.idx_sessions_start_time ON sessions(start_time)")
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {schema}.idx_sessions_project ON sessions(project_name)")
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {schema}.idx_sessions_uuid ON sessions(uuid)")
+            _create_search_index(cursor, schema)
+
+        # Moving rows between files isn't a change to sync, or to the
+        # budget counters: the sessions still exist (see SYNC, BUDGETS below)
+        cursor.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('sync_suppress', '1')")
+        cursor.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('counters_suppress', '1')")
+
+        for year in years:
+            # Within the year and before the cutoff
+            params = (f"{year:04d}-01-01", f"{year + 1:04d}-01-01", cutoff)
+            where = "end_time IS NOT NULL AND start_time >= ? AND start_time < ? AND start_time < ?"
+
+            cursor.execute(f"""
+                INSERT INTO archive_{year}.sessions ({SESSION_COLUMNS})
+                SELECT {SESSION_COLUMNS} FROM main.sessions WHERE {where}
+            """, params)
+            cursor.execute(f"DELETE FROM main.sessions WHERE {where}", params)
+            moved[year] = cursor.rowcount
+
+        cursor.execute("DELETE FROM settings WHERE key IN ('sync_suppress', 'counters_suppress')")
+        conn.commit()
+
+        # Give the freed pages back to the file system (only the live file;
+        # it's the one that gets backed up and scanned)
+        if not getattr(conn, "txn_depth", 0):
+            cursor.execute("VACUUM main")
+
+    return moved
+
+
+# =============================================================================
+# COMPACTION
+# =============================================================================
+#
+# Old history rarely needs individual sessions. Compaction replaces all of
+# a project's sessions on one old day with a single row flagged
+# is_compacted: it starts at midnight, lasts the day's total, has the
+# day's paused time as its paused_seconds and carries the day's notes
+# joined together.
+#
+# Every summary groups by project and date(start_time) and adds up
+# end - start (less paused time for worked time), so they return the same
+# numbers before and after (for date ranges that start and end at
+# midnight, which is all the app uses).
+# The removed rows are saved to a JSON file first; restore_compaction()
+# puts them back.
+
+# Default age (in days) below which sessions are left alone; overridden
+# by the "compact_horizon_days" setting
+DEFAULT_COMPACT_HORIZON_DAYS = 365
+
+# Separator between the notes of compacted sessions
+COMPACT_NOTES_SEPARATOR = "; "
+
+
+def get_compact_horizon_days() -> int:
+    """Days of history compaction leaves untouched (setting or default)."""
+    value = get_setting("compact_horizon_days")
+    return int(value) if value and value.isdigit() else DEFAULT_COMPACT_HORIZON_DAYS
+
+
+def _compactable_days(cursor: sqlite3.Cursor, before: datetime) -> list[sqlite3.Row]:
+    """
+    (project, day) groups worth compacting, oldest first.
+
+    Only days with at least two sessions (one row saves nothing) and at
+    least one not-yet-compacted session. Days adding up to 24 hours or
+    more (overlapping logged sessions) are skipped: their single row
+    would cross midnight and be split up again.
+
+    paused_seconds is what the day's row needs to keep its worked time
+    (total_seconds less the sessions' worked seconds). Billing rounds
+    each session up to its project's increment and minimum; one row per
+    day can only be rounded once, so compacted days may bill less than
+    the sessions they replace did.
+    """
+    cursor.execute(f"""
+        SELECT
+            project_name,
+            date(start_time) as day,
+            COUNT(*) as session_count,
+            SUM(
+                strftime('%s', end_time) - strftime('%s', start_time)
+            ) as total_seconds,
+            SUM(
+                strftime('%s', end_time) - strftime('%s', start_time)
+            ) - SUM({_worked_seconds_sql()}) as paused_seconds
+        FROM sessions
+        WHERE end_time IS NOT NULL
+          AND start_time < ?
+        GROUP BY project_name, date(start_time)
+        HAVING COUNT(*) >= 2
+           AND SUM(COALESCE(is_compacted, 0) = 0) >= 1
+           AND SUM(strftime('%s', end_time) - strftime('%s', start_time)) < 86400
+        ORDER BY day, project_name
+    """, (before.isoformat(),))
+    return cursor.fetchall()
+
+
+def compact_sessions(
+    before: datetime,
+    export_path: Optional[Path] = None,
+    dry_run: bool = False
+) -> dict:
+    """
+    Replace each project's sessions on days before a date with one row per day.
+
+    Args:
+        before: Compact days before this date (use a midnight)
+        export_path: Where to save the removed sessions as JSON (default:
+                     compaction_<timestamp>.json in the data directory)
+        dry_run: Only report what would happen
+
+    Returns:
+        Report dict: {"days": groups compacted, "sessions": rows removed,
+        "rows": rows created, "export": export file path or None}
+    """
+    import json  # Only needed here and in restore_compaction()
+
+    with get_connection() as conn:
+        cursor = conn.cursor()
+
+        groups = _compactable_days(cursor, before)
+        report = {
+            "days": len(groups),
+            "sessions": sum(row["session_count"] for row in groups),
+            "rows": len(groups),
+            "export": None,
+        }
+        if dry_run or not groups:
+            return report
+
+        if export_path is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            export_path = DATABASE_PATH.parent / f"compaction_{timestamp}.json"
+        export_path = Path(export_path)
+
+        # Collect the raw rows and build the replacement for each day. The
+        # replacements get their UUIDs here, so the export can name them
+        removed = []
+        replacements = []
+        compacted = []
+        for group in groups:
+            cursor.execute(f"""
+                SELECT {SESSION_COLUMNS}
+                FROM sessions
+                WHERE end_time IS NOT NULL
+                  AND project_name = ?
+                  AND start_time >= ? AND start_time < ?
+                ORDER BY start_time
+            """, (group["project_name"], group["day"], _next_day(group["day"])))
+            rows = [dict(row) for row in cursor.fetchall()]
+            removed.extend(rows)
+
+            day_start = datetime.fromisoformat(group["day"])
+            notes = COMPACT_NOTES_SEPARATOR.join(r["notes"] for r in rows if r["notes"])
+            row_uuid = uuid.uuid4().hex
+            compacted.append({"uuid": row_uuid, "sessions": [r["id"] for r in rows]})
+            replacements.append((
+                row_uuid,
+                group["project_name"],
+                day_start.isoformat(),
+                (day_start + timedelta(seconds=int(group["total_seconds"]))).isoformat(),
+                int(group["paused_seconds"]),
+                notes,
+            ))
+
+        # Save what's about to be removed before touching anything
+        with open(export_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": 2,
+                "created": datetime.now().isoformat(),
+                "before": before.isoformat(),
+                "sessions": removed,
+                "compacted": compacted,
+            }, f, ensure_ascii=False)
+
+        try:
+            cursor.executemany(
+                "DELETE FROM sessions WHERE id = ?",
+                [(r["id"],) for r in removed]
+            )
+            cursor.executemany("""
+                INSERT INTO sessions (uuid, project_name, start_time, end_time, paused_seconds, notes, is_compacted)
+                VALUES (?, ?, ?, ?, ?, ?, 1)
+            """, replacements)
+            conn.commit()
+        except BaseException:
+            # Nothing was removed, so the export would only confuse a restore
+            conn.rollback()
+            export_path.unlink(missing_ok=True)
+            raise
+
+        # Give the freed pages back to the file system
+        if not getattr(conn, "txn_depth", 0):
+            cursor.execute("VACUUM main")
+
+    report["export"] = str(export_path)
+    return report
+
+
+def restore_compaction(export_path: Path) -> int:
+    """
+    Undo a compaction from its export file.
+
+    Deletes the compacted rows the file names (by UUID, wherever they are
+    now: renamed, or moved to an archive) and puts the original sessions
+    back in their place with their original IDs, under the compacted
+    row's current project name. Days whose compacted row is gone are
+    skipped, so restoring twice is safe.
+
+    Exports written before compacted rows were recorded (version 1) are
+    matched by project name and day instead.
+
+    Returns:
+        Number of sessions restored
+
+    Raises:
+        ValueError: If the file isn't a compaction export
+    """
+    import json
+
+    try:
+        with open(export_path, encoding="utf-8") as f:
+            data = json.load(f)
+        sessions = data["sessions"]
+        by_id = {s["id"]: s for s in sessions}
+        compacted = [(c["uuid"], [by_id[i] for i in c["sessions"]]) for c in data.get("compacted", [])]
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Not a compaction export: {e}")
+
+    columns = [c.strip() for c in SESSION_COLUMNS.split(",")]
+    insert_sql = f"INSERT OR IGNORE INTO {{schema}}.sessions ({SESSION_COLUMNS}) VALUES ({', '.join('?' * len(columns))})"
+
+    with shared_connection() as conn:
+        # Attach before writing: ATTACH isn't allowed inside a transaction
+        archives = _attach_archives(conn)
+
+        with transaction(immediate=True):
+            cursor = conn.cursor()
+            restored = 0
+
+            if "compacted" not in data:
+                days = {(s["project_name"], s["start_time"][:10]) for s in sessions}
+                for project_name, day in days:
+                    cursor.execute("""
+                        DELETE FROM sessions
+                        WHERE is_compacted = 1
+                          AND project_name = ?
+                          AND start_time >= ? AND start_time < ?
+                    """, (project_name, day, _next_day(day)))
+                for session in sessions:
+                    cursor.execute(insert_sql.format(schema="main"), [session.get(c) for c in columns])
+                    restored += cursor.rowcount
+                return restored
+
+            for row_uuid, originals in compacted:
+                for schema in ["main", *archives]:
+                    cursor.execute(f"SELECT project_name FROM {schema}.sessions WHERE uuid = ?", (row_uuid,))
+                    row = cursor.fetchone()
+                    if row is not None:
+                        break
+                else:
+                    continue  # Restored already (or deleted since)
+
+                # The counter triggers only see main.sessions (see BUDGETS)
+                archived = schema != "main"
+                if archived:
+                    _count_archived_sessions(cursor, schema, "uuid = ?", (row_uuid,), "-")
+                cursor.execute(f"DELETE FROM {schema}.sessions WHERE uuid = ?", (row_uuid,))
+
+                for session in originals:
+                    values = {**session, "project_name": row["project_name"]}
+                    cursor.execute(insert_sql.format(schema=schema), [values.get(c) for c in columns])
+                    restored += cursor.rowcount
+                if archived:
+                    ids = [session["id"] for session in originals]
+                    _count_archived_sessions(
+                        cursor, schema, f"id IN ({', '.join('?' * len(ids))})", tuple(ids), "+"
+                    )
+
+    return restored
+
+
+def _next_day(day: str) -> str:
+    """The date after a YYYY-MM-DD date, in the same format."""
+    return (datetime.fromisoformat(day) + timedelta(days=1)).strftime("%Y-%m-%d")
+
+
+# =============================================================================
+# SYNC
+# =============================================================================
+#
+# Triggers (see _SYNC_TRIGGERS_SQL) append to the `changes` table whenever
+# a session or project is inserted, updated or deleted. Each change has a
+# sequence number (local to this database), the row's UUID (the same on
+# every machine), a UTC timestamp and the ID of the device that made it.
+#
+# export_changes(since) gathers the latest change for every row touched
+# after a sequence number, with the row's current contents. The other
+# machine's apply_changes() replays it: for each row, the change with the
+# newer timestamp wins, and equal timestamps are settled by comparing
+# device IDs - so both machines reach the same result whichever order
+# they sync in.
+
+# Changeset format identifier and version
+CHANGESET_FORMAT = "derby-changes"
+CHANGESET_VERSION = 1
+
+# Session fields carried in a changeset (everything but the local row ID)
+_SYNC_SESSION_FIELDS = [
+    "project_name", "start_time", "end_time", "notes",
+    "is_paused", "paused_seconds", "pause_started_at", "is_compacted",
+]
+
+
+def get_device_id() -> str:
+    """This database's sync device ID (made when the change log was created)."""
+    return get_setting("sync_device_id")
+
+
+def get_last_change_seq() -> int:
+    """Sequence number of the newest change (0 if none)."""
+    with get_connection() as conn:
+        row = conn.execute("SELECT MAX(seq) FROM changes").fetchone()
+        return row[0] or 0
+
+
+def export_changes(since: int = 0) -> dict:
+    """
+    Build a changeset of everything changed after a sequence number.
+
+    Only the latest change to each row is included, with the row as it
+    is now, so a row edited many times costs one entry.
+
+    Args:
+        since: Sequence number already sent (0 for everything)
+
+    Returns:
+        Changeset dict, ready for json.dump(). Its "until" value is the
+        `since` to use next time.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        # Archived sessions can still be the latest upsert of their row
+        source = _sessions_source(conn)
+
+        cursor.execute("""
+            SELECT c.seq, c.entity, c.uuid, c.op, c.changed_at, c.origin
+            FROM changes c
+            JOIN (
+                SELECT MAX(seq) as seq FROM changes
+                WHERE seq > ?
+                GROUP BY entity, uuid
+            ) latest ON c.seq = latest.seq
+            ORDER BY c.seq
+        """, (since,))
+        rows = cursor.fetchall()
+
+        changes = []
+        for row in rows:
+            change = {
+                "entity": row["entity"],
+                "uuid": row["uuid"],
+                "op": row["op"],
+                "changed_at": row["changed_at"],
+                "origin": row["origin"],
+                "data": None,
+            }
+            if row["op"] == "upsert":
+                if row["entity"] == "session":
+                    cursor.execute(
+                        f"SELECT {', '.join(_SYNC_SESSION_FIELDS)} FROM {source} WHERE uuid = ?",
+                        (row["uuid"],)
+                    )
+                    data = cursor.fetchone()
+                    change["data"] = dict(data) if data else None
+                else:
+                    change["data"] = _project_sync_data(cursor, row["uuid"])
+                if change["data"] is None:
+                    continue  # Merged into a project from another machine
+            changes.append(change)
+
+        until = cursor.execute("SELECT MAX(seq) FROM changes").fetchone()[0] or 0
+
+    return {
+        "format": CHANGESET_FORMAT,
+        "version": CHANGESET_VERSION,
+        "device": get_device_id(),
+        "since": since,
+        "until": max(until, since),
+        "changes": changes,
+    }
+
+
+def _project_sync_data(cursor: sqlite3.Cursor, project_uuid: str) -> Optional[dict]:
+    """A project's synced fields (including tag names), or None if it's gone."""
+    cursor.execute(
+        "SELECT id, name, priority, is_background FROM projects WHERE uuid = ?",
+        (project_uuid,)
+    )
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    cursor.execute("""
+        SELECT t.name FROM tags t
+        JOIN project_tags pt ON t.id = pt.tag_id
+        WHERE pt.project_id = ?
+        ORDER BY t.name
+    """, (row["id"],))
+    return {
+        "name": row["name"],
+        "priority": row["priority"],
+        "is_background": row["is_background"],
+        "tags": [r["name"] for r in cursor.fetchall()],
+    }
+
+
+def _check_changeset(changeset) -> None:
+    """
+    Check a changeset's structure before applying any of it.
+
+    Raises:
+        ValueError: If it isn't a changeset this version reads, or a
+                    change is missing a key or has one of the wrong type
+    """
+    if (not isinstance(changeset, dict)
+            or changeset.get("format") != CHANGESET_FORMAT
+            or changeset.get("version") != CHANGESET_VERSION):
+        raise ValueError("Not a Derby changeset (or one from a newer version)")
+    if not isinstance(changeset.get("device"), str):
+        raise ValueError("Changeset has no device ID")
+    until = changeset.get("until", 0)
+    if not isinstance(until, int) or isinstance(until, bool):
+        raise ValueError(f"Invalid changeset position: {until!r}")
+    if not isinstance(changeset.get("changes", []), list):
+        raise ValueError("Changeset changes must be a list")
+
+    scalar = (str, int, float, type(None))
+    for number, change in enumerate(changeset.get("changes", []), start=1):
+        if not isinstance(change, dict):
+            raise ValueError(f"Change {number} isn't an object")
+        for key in ("entity", "uuid", "op", "changed_at", "origin"):
+            if not isinstance(change.get(key), str):
+                raise ValueError(f"Change {number} has no valid {key!r}")
+        if change["op"] not in ("upsert", "delete"):
+            raise ValueError(f"Change {number} has an unknown op: {change['op']}")
+        if change["op"] == "delete":
+            continue
+
+        data = change.get("data")
+        if not isinstance(data, dict):
+            raise ValueError(f"Change {number} has no data")
+        if change["entity"] == "session":
+            if not all(isinstance(data.get(field), scalar) for field in _SYNC_SESSION_FIELDS):
+                raise ValueError(f"Change {number} has a session field of the wrong type")
+        elif change["entity"] == "project":
+            tags = data.get("tags") or []
+            if (not isinstance(data.get("name"), str)
+                    or not isinstance(data.get("priority"), int)
+                    or not isinstance(data.get("is_background"), (int, type(None)))
+                    or not isinstance(tags, list)
+                    or not all(isinstance(tag, str) for tag in tags)):
+                raise ValueError(f"Change {number} has a project field of the wrong type")
+
+
+def apply_changes(changeset: dict) -> dict:
+    """
+    Apply a changeset from another machine.
+
+    Runs in one transaction: either all of it lands or none of it does.
+    A change is skipped if this database has a newer change to the same
+    row, or if it's an echo of a change made here. A change that can't
+    be applied on its own (e.g. a rename onto a name that exists here)
+    is skipped and counted as a conflict.
+
+    Returns:
+        {"applied": n, "skipped": n, "conflicts": n}
+
+    Raises:
+        ValueError: If the changeset isn't in a format this version reads,
+                    or is malformed (see _check_changeset)
+    """
+    _check_changeset(changeset)
+
+    device = get_device_id()
+    report = {"applied": 0, "skipped": 0, "conflicts": 0}
+
+    with shared_connection() as conn:
+        # Archived sessions can be updated or deleted too; ATTACH has to
+        # happen before the transaction starts
+        archives = _attach_archives(conn)
+
+        with transaction(immediate=True):
+            cursor = conn.cursor()
+
+            for change in changeset.get("changes", []):
+                if change["origin"] == device:
+                    report["skipped"] += 1
+                    continue
+
+                # Last writer wins; same instant -> higher device ID wins
+                cursor.execute("""
+                    SELECT changed_at, origin FROM changes
+                    WHERE entity = ? AND uuid = ?
+                    ORDER BY seq DESC LIMIT 1
+                """, (change["entity"], change["uuid"]))
+                local = cursor.fetchone()
+                if local and (local["changed_at"], local["origin"]) >= (change["changed_at"], change["origin"]):
+                    report["skipped"] += 1
+                    continue
+
+                first_seq = cursor.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0]
+                try:
+                    with savepoint():
+                        if change["entity"] == "session":
+                            _apply_session_change(cursor, change, archives)
+                        elif change["entity"] == "project":
+                            _apply_project_change(cursor, change)
+                        else:
+                            raise ValueError(f"Unknown entity: {change['entity']}")
+                except (sqlite3.IntegrityError, ValueError):
+                    report["conflicts"] += 1
+                    continue
+
+                # The triggers logged this as a local change made just now;
+                # record when and where it really happened instead, so later
+                # comparisons are fair and it isn't echoed back as ours
+                cursor.execute(
+                    "UPDATE changes SET changed_at = ?, origin = ? WHERE seq > ?",
+                    (change["changed_at"], change["origin"], first_seq)
+                )
+                if cursor.rowcount == 0:
+                    # Nothing was logged (archive files have no triggers, and
+                    # deleting a missing row changes nothing): record it anyway
+                    cursor.execute("""
+                        INSERT INTO changes (entity, uuid, op, changed_at, origin)
+                        VALUES (?, ?, ?, ?, ?)
+                    """, (change["entity"], change["uuid"], change["op"], change["changed_at"], change["origin"]))
+                report["applied"] += 1
+
+            set_setting(f"sync_applied_{changeset['device']}", str(changeset.get("until", 0)))
+
+    _names_changed()
+    return report
+
+
+def _apply_session_change(cursor: sqlite3.Cursor, change: dict, archives: list[str]):
+    """Insert, update or delete one session by UUID."""
+    session_uuid = change["uuid"]
+
+    # Find which file holds the session now (if any)
+    schema = None
+    for candidate in ["main", *archives]:
+        cursor.execute(f"SELECT 1 FROM {candidate}.sessions WHERE uuid = ?", (session_uuid,))
+        if cursor.fetchone():
+            schema = candidate
+            break
+
+    # Archives have no counter triggers
+    if schema and schema != "main":
+        _count_archived_sessions(cursor, schema, "uuid = ?", (session_uuid,), "-")
+
+    if change["op"] == "delete":
+        if schema:
+            cursor.execute(f"DELETE FROM {schema}.sessions WHERE uuid = ?", (session_uuid,))
+        return
+
+    data = change["data"]
+    values = [data.get(field) for field in _SYNC_SESSION_FIELDS]
+    if schema:
+        assignments = ", ".join(f"{field} = ?" for field in _SYNC_SESSION_FIELDS)
+        cursor.execute(f"UPDATE {schema}.sessions SET {assignments} WHERE uuid = ?", values + [session_uuid])
+        if schema != "main":
+            _count_archived_sessions(cursor, schema, "uuid = ?", (session_uuid,), "+")
+    else:
+        cursor.execute(
+            f"INSERT INTO sessions ({', '.join(_SYNC_SESSION_FIELDS)}, uuid) "
+            f"VALUES ({', '.join('?' * len(_SYNC_SESSION_FIELDS))}, ?)",
+            values + [session_uuid]
+        )
+
+
+def _apply_project_change(cursor: sqlite3.Cursor, change: dict):
+    """Insert, update or delete one project (and its tags) by UUID."""
+    project_uuid = change["uuid"]
+    cursor.execute("SELECT id FROM projects WHERE uuid = ?", (project_uuid,))
+    row = cursor.fetchone()
+
+    if change["op"] == "delete":
+        if row:
+            cursor.execute("DELETE FROM project_tags WHERE project_id = ?", (row["id"],))
+            cursor.execute("DELETE FROM projects WHERE id = ?", (row["id"],))
+        return
+
+    data = change["data"]
+    if row is None:
+        cursor.execute("SELECT id, uuid FROM projects WHERE name = ?", (data["name"],))
+        same_name = cursor.fetchone()
+        if same_name:
+            # Created separately on both machines: they're the same project.
+            # Both sides keep the smaller UUID, so they end up agreeing.
+            if project_uuid > same_name["uuid"]:
+                raise ValueError(f"Project {data['name']} already exists here")
+            cursor.execute("UPDATE projects SET uuid = ? WHERE id = ?", (project_uuid, same_name["id"]))
+            row = same_name
+        else:
+            cursor.execute(
+                "INSERT INTO projects (name, priority, is_background, uuid) VALUES (?, ?, ?, ?)",
+                (data["name"], data["priority"], data["is_background"], project_uuid)
+            )
+            cursor.execute("SELECT id FROM projects WHERE uuid = ?", (project_uuid,))
+            row = cursor.fetchone()
+
+    project_id = row["id"]
+    cursor.execute(
+        "UPDATE projects SET name = ?, priority = ?, is_background = ? WHERE id = ?",
+        (data["name"], data["priority"], data["is_background"], project_id)
+    )
+
+    # Make the tags match exactly
+    cursor.execute("""
+        SELECT t.name FROM tags t
+        JOIN project_tags pt ON t.id = pt.tag_id
+        WHERE pt.project_id = ?
+    """, (project_id,))
+    current = {r["name"] for r in cursor.fetchall()}
+    wanted = set(data.get("tags") or [])
+    for tag_name in current - wanted:
+        cursor.execute("""
+            DELETE FROM project_tags
+            WHERE project_id = ? AND tag_id = (SELECT id FROM tags WHERE name = ?)
+        """, (project_id, tag_name))
+    for tag_name in wanted - current:
+        cursor.execute("INSERT OR IGNORE INTO tags (name) VALUES (?)", (tag_name,))
+        cursor.execute("""
+            INSERT OR IGNORE INTO project_tags (project_id, tag_id)
+            SELECT ?, id FROM tags WHERE name = ?
+        """, (project_id, tag_name))
+
+
+# =============================================================================
+# SEARCH
+# =============================================================================
+#
+# sessions_fts is an FTS5 index over each session's project name and
+# notes. It's an "external content" table: it stores only the index and
+# reads the text from sessions itself, and triggers keep it in step with
+# every insert, edit and delete. Each archive file has its own.
+
+# Marks around matched words in search snippets; callers swap them for
+# whatever highlighting they can show
+SNIPPET_START = "\x02"
+SNIPPET_END = "\x03"
+
+# Words of context in a snippet
+SNIPPET_WORDS = 12
+
+
+def _create_search_index(cursor: sqlite3.Cursor, schema: str):
+    """
+    Add the full-text index and its triggers to one database file.
+
+    Does nothing if the file already has them; otherwise indexes the
+    sessions already there.
+    """
+    exists = cursor.execute(
+        f"SELECT 1 FROM {schema}.sqlite_master WHERE name = 'sessions_fts'"
+    ).fetchone()
+    if exists:
+        return
+
+    # remove_diacritics: "cafe" finds "café"
+    cursor.execute(f"""
+        CREATE VIRTUAL TABLE {schema}.sessions_fts USING fts5(
+            project_name, notes,
+            content='sessions', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    # Trigger bodies can't name a schema; they use their own file's tables
+    cursor.execute(f"""
+        CREATE TRIGGER {schema}.sessions_fts_insert AFTER INSERT ON sessions
+        BEGIN
+            INSERT INTO sessions_fts (rowid, project_name, notes)
+            VALUES (NEW.id, NEW.project_name, NEW.notes);
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER {schema}.sessions_fts_delete AFTER DELETE ON sessions
+        BEGIN
+            INSERT INTO sessions_fts (sessions_fts, rowid, project_name, notes)
+            VALUES ('delete', OLD.id, OLD.project_name, OLD.notes);
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER {schema}.sessions_fts_update AFTER UPDATE OF project_name, notes ON sessions
+        BEGIN
+            INSERT INTO sessions_fts (sessions_fts, rowid, project_name, notes)
+            VALUES ('delete', OLD.id, OLD.project_name, OLD.notes);
+            INSERT INTO sessions_fts (rowid, project_name, notes)
+            VALUES (NEW.id, NEW.project_name, NEW.notes);
+        END
+    """)
+    cursor.execute(f"INSERT INTO {schema}.sessions_fts (sessions_fts) VALUES ('rebuild')")
+
+
+def _fts_query(text: str) -> str:
+    """
+    Turn what the user typed into an FTS5 query.
+
+    Every word must match (in any order); the last one may be the start
+    of a word, so results appear while typing. Words are quoted, so
+    punctuation like "O'Brien" or "Q3-report" is never read as query
+    syntax.
+
+    Raises:
+        ValueError: If there's nothing to search for
+    """
+    words = [word.replace('"', '""') for word in text.split()]
+    if not words:
+        raise ValueError("Search for at least one word")
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def search_sessions(
+    text: str,
+    project_name: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    limit: int = 20,
+    filter_by: Optional[Filter] = None
+) -> list[tuple[Session, str]]:
+    """
+    Find completed sessions whose notes or project name match some words.
+
+    Args:
+        text: Words to look for (see _fts_query)
+        project_name: Only sessions for this project
+        start_date: Only sessions that started on or after this time
+        end_date: Only sessions that started before this time
+        limit: Maximum number of results
+        filter_by: Only sessions matching this filter
+
+    Returns:
+        (session, snippet) pairs, best match first. The snippet is the
+        matching part of the notes (or project name) with matched words
+        between SNIPPET_START and SNIPPET_END.
+
+    Raises:
+        ValueError: If text has no words to search for
+    """
+    match = _fts_query(text)
+
+    with get_connection() as conn:
+        cursor = conn.cursor()
+
+        schemas = ["main"] + _attach_archives(conn, start_date, end_date)
+        for schema in schemas[1:]:
+            # Archives made before search existed get their index now
+            _create_search_index(cursor, schema)
+
+        # Project names are short, so a hit there says more than one in notes
+        query = """
+            SELECT s.id, s.project_name, s.start_time, s.end_time, s.notes,
+                   snippet(sessions_fts, -1, ?, ?, '…', ?) as snippet,
+                   bm25(sessions_fts, 2.0, 1.0) as rank
+            FROM {schema}.sessions_fts
+            JOIN {schema}.sessions s ON s.id = sessions_fts.rowid
+            WHERE sessions_fts MATCH ? AND s.end_time IS NOT NULL
+        """
+        params: list = [SNIPPET_START, SNIPPET_END, SNIPPET_WORDS, match]
+
+        if project_name:
+            query += " AND s.project_name = ?"
+            params.append(project_name)
+
+        if start_date:
+            query += " AND s.start_time >= ?"
+            params.append(start_date.isoformat())
+
+        if end_date:
+            query += " AND s.start_time < ?"
+            params.append(end_date.isoformat())
+
+        if filter_by:
+            # In a subquery: sessions_fts has project_name and notes columns too
+            filter_sql, filter_params = filter_by.sessions_sql()
+            query += f" AND s.id IN (SELECT id FROM {{schema}}.sessions WHERE {filter_sql})"
+            params.extend(filter_params)
+
+        query += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+
+        # Each file ranks its own matches; keep the best overall
+        rows = []
+        for schema in schemas:
+            cursor.execute(query.format(schema=schema), params)
+            rows.extend(cursor.fetchall())
+        rows.sort(key=lambda row: row["rank"])
+
+        return [
+            (
+                Session(
+                    id=row["id"],
+                    project_name=row["project_name"],
+                    start_time=datetime.fromisoformat(row["start_time"]),
+                    end_time=datetime.fromisoformat(row["end_time"]) if row["end_time"] else None,
+                    notes=row["notes"] or ""
+                ),
+                row["snippet"]
+            )
+            for row in rows[:limit]
+        ]
+
+
+# =============================================================================
+# PROJECT HIERARCHY
+# =============================================================================
+#
+# Projects can sit under other projects (client -> matter -> task). The
+# tree is kept as a closure table: project_closure has a row for every
+# ancestor/descendant pair with the distance between them, so "everything
+# under X" is one indexed lookup and subtree totals are one join, however
+# deep the tree goes. Background tasks stay out of the hierarchy.
+
+
+def set_project_parent(project_name: str, parent_name: Optional[str]) -> Optional[Project]:
+    """
+    Move a project (with everything under it) below another project.
+
+    Args:
+        project_name: Project to move
+        parent_name: New parent, or None to make it a top-level project
+
+    Returns:
+        The moved Project, or None if project_name doesn't exist
+
+    Raises:
+        ValueError: If the parent doesn't exist, is the project itself or
+                    one of its descendants, or either is a background task
+    """
+    project = get_project(project_name)
+    if project is None:
+        return None
+
+    parent = None
+    if parent_name is not None:
+        parent = get_project(parent_name)
+        if parent is None:
+            raise ValueError(f"Project not found: {parent_name}")
+        if parent.is_background or project.is_background:
+            raise ValueError("Background tasks can't be part of a project hierarchy")
+
+    with get_connection() as conn:
+        cursor = conn.cursor()
+
+        if parent is not None:
+            cursor.execute("""
+                SELECT 1 FROM project_closure
+                WHERE ancestor_id = ? AND descendant_id = ?
+            """, (project.id, parent.id))
+            if cursor.fetchone():
+                if parent.id == project.id:
+                    raise ValueError("A project can't be its own parent")
+                raise ValueError(f"{parent.name} is inside {project.name}, so it can't be its parent")
+
+        # Cut the subtree loose from its current ancestors...
+        cursor.execute("""
+            DELETE FROM project_closure
+            WHERE descendant_id IN (
+                    SELECT descendant_id FROM project_closure WHERE ancestor_id = ?
+                )
+              AND ancestor_id IN (
+                    SELECT ancestor_id FROM project_closure
+                    WHERE descendant_id = ? AND depth > 0
+                )
+        """, (project.id, project.id))
+
+        # ...and link every node in it to the new parent and its ancestors
+        if parent is not None:
+            cursor.execute("""
+                INSERT INTO project_closure (ancestor_id, descendant_id, depth)
+                SELECT above.ancestor_id, below.descendant_id, above.depth + below.depth + 1
+                FROM project_closure above
+                CROSS JOIN project_closure below
+                WHERE above.descendant_id = ? AND below.ancestor_id = ?
+            """, (parent.id, project.id))
+
+        conn.commit()
+
+    return project
+
+
+def get_project_parent(project_name: str) -> Optional[str]:
+    """Name of a project's parent, or None for a top-level project."""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT parent.name
+            FROM projects p
+            JOIN project_closure c ON c.descendant_id = p.id AND c.depth = 1
+            JOIN projects parent ON parent.id = c.ancestor_id
+            WHERE p.name = ?
+        """, (project_name,))
+        row = cursor.fetchone()
+        return row["name"] if row else None
+
+
+def get_project_path(project_name: str) -> list[str]:
+    """
+    Names from the top of the tree down to the project.
+
+    Example: ["Acme Corp", "Acme v. Henderson", "Discovery"]
+    Empty if the project doesn't exist.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT a.name
+            FROM projects p
+            JOIN project_closure c ON c.descendant_id = p.id
+            JOIN projects a ON a.id = c.ancestor_id
+            WHERE p.name = ?
+            ORDER BY c.depth DESC
+        """, (project_name,))
+        return [row["name"] for row in cursor.fetchall()]
+
+
+def get_summary_tree(
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    is_background: Optional[bool] = None,
+    filter_by: Optional[Filter] = None
+) -> list[dict]:
+    """
+    Time per project with subtree totals, in tree order.
+
+    Each project's own time is summed once; the closure table then adds
+    it to every ancestor in a single join.
+
+    Args:
+        start_date: Count sessions starting on or after this time
+        end_date: Count sessions starting before this time
+        is_background: If True, only background tasks; if False, only regular projects; if None, all
+        filter_by: Only count sessions matching this filter
+
+    Returns:
+        One dict per project with time in its subtree, parents before
+        their children, siblings by priority ASC then total DESC:
+        {"name", "parent", "depth", "priority", "is_background",
+         "own_seconds", "total_seconds", "has_children"}
+        Sessions of deleted projects are listed as top-level entries.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+
+        own_query = f"""
+            SELECT
+                project_name,
+                SUM(strftime('%s', end_time) - strftime('%s', start_time)) as seconds
+            FROM {_sessions_source(conn, start_date, end_date)}
+            WHERE end_time IS NOT NULL
+        """
+        params: list = []
+
+        if start_date:
+            own_query += " AND start_time >= ?"
+            params.append(start_date.isoformat())
+
+        if end_date:
+            own_query += " AND start_time < ?"
+            params.append(end_date.isoformat())
+
+        if filter_by:
+            filter_sql, filter_params = filter_by.sessions_sql()
+            own_query += f" AND ({filter_sql})"
+            params.extend(filter_params)
+
+        own_query += " GROUP BY project_name"
+
+        query = f"""
+            WITH own AS ({own_query})
+            SELECT
+                own.project_name,
+                a.name,
+                COALESCE(a.priority, 3) as priority,
+                COALESCE(a.is_background, 0) as is_background,
+                c.depth,
+                own.seconds
+            FROM own
+            LEFT JOIN projects p ON p.name = own.project_name
+            LEFT JOIN project_closure c ON c.descendant_id = p.id
+            LEFT JOIN projects a ON a.id = c.ancestor_id
+        """
+        if is_background is not None:
+            query += " WHERE COALESCE(a.is_background, 0) = ?"
+            params.append(1 if is_background else 0)
+
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+
+        cursor.execute("""
+            SELECT child.name as child, parent.name as parent
+            FROM project_closure c
+            JOIN projects child ON child.id = c.descendant_id
+            JOIN projects parent ON parent.id = c.ancestor_id
+            WHERE c.depth = 1
+        """)
+        parents = {row["child"]: row["parent"] for row in cursor.fetchall()}
+
+    # Fold the (ancestor, descendant's time) rows into one entry per project
+    nodes: dict[str, dict] = {}
+    for row in rows:
+        name = row["name"] or row["project_name"]  # No project row: deleted
+        node = nodes.setdefault(name, {
+            "name": name,
+            "parent": parents.get(name),
+            "priority": row["priority"],
+            "is_background": bool(row["is_background"]),
+            "own_seconds": 0,
+            "total_seconds": 0,
+        })
+        seconds = int(row["seconds"])
+        node["total_seconds"] += seconds
+        if not row["depth"]:
+            node["own_seconds"] += seconds
+
+    children: dict[Optional[str], list[dict]] = {}
+    for node in nodes.values():
+        parent = node["parent"] if node["parent"] in nodes else None
+        children.setdefault(parent, []).append(node)
+
+    result: list[dict] = []
+
+    def visit(parent: Optional[str], depth: int):
+        for node in sorted(children.get(parent, []), key=lambda n: (n["priority"], -n["total_seconds"], n["name"])):
+            node["depth"] = depth
+            node["has_children"] = node["name"] in children
+            result.append(node)
+            visit(node["name"], depth + 1)
+
+    visit(None, 0)
+    return result
+
+
+# =============================================================================
+# BILLING
+# =============================================================================
+#
+# A project can have an hourly rate, a rounding increment (e.g. 6 minutes:
+# every session is billed in tenths of an hour, rounded up) and a minimum
+# per session. Each term not set on a project comes from its nearest
+# ancestor in the project hierarchy that has it, so a rate set on a client
+# covers all of its matters and tasks.
+#
+# compute_billing() does the rounding and rate lookups for every session
+# inside one SQL aggregate, so a year of sessions is a single query rather
+# than a Python loop.
+
+
+def set_project_billing(
+    project_name: str,
+    hourly_rate: Optional[float],
+    increment_minutes: Optional[int] = None,
+    minimum_minutes: Optional[int] = None
+) -> bool:
+    """
+    Set (or clear) a project's billing terms.
+
+    Args:
+        project_name: Project to bill
+        hourly_rate: Rate per hour, or None to inherit (or not bill)
+        increment_minutes: Round each session up to a multiple of this;
+                           0 removes it, None keeps the current one
+        minimum_minutes: Bill at least this much per session; 0 removes
+                         it, None keeps the current one
+
+    Returns:
+        True if updated, False if the project doesn't exist
+
+    Raises:
+        ValueError: If a value is negative or not a finite number
+    """
+    for name, value in (("Rate", hourly_rate), ("Increment", increment_minutes), ("Minimum", minimum_minutes)):
+        if isinstance(value, float) and not math.isfinite(value):
+            raise ValueError(f"{name} must be a number: {value}")
+        if value is not None and value < 0:
+            raise ValueError(f"{name} can't be negative")
+
+    assignments = ["hourly_rate = ?"]
+    params: list = [hourly_rate]
+    for column, value in (("billing_increment", increment_minutes), ("billing_minimum", minimum_minutes)):
+        if value is not None:
+            assignments.append(f"{column} = ?")
+            params.append(value or None)
+
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"UPDATE projects SET {', '.join(assignments)} WHERE name = ?",
+            (*params, project_name)
+        )
+        conn.commit()
+        return cursor.rowcount > 0
+
+
+# Each project's effective terms: its own, else the nearest ancestor's
+_BILLING_TERMS_SQL = """
+    SELECT
+        p.name,
+        (SELECT a.hourly_rate FROM project_closure c JOIN projects a ON a.id = c.ancestor_id
+         WHERE c.descendant_id = p.id AND a.hourly_rate IS NOT NULL
+         ORDER BY c.depth LIMIT 1) as rate,
+        (SELECT a.billing_increment FROM project_closure c JOIN projects a ON a.id = c.ancestor_id
+         WHERE c.descendant_id = p.id AND a.billing_increment IS NOT NULL
+         ORDER BY c.depth LIMIT 1) as increment_minutes,
+        (SELECT a.billing_minimum FROM project_closure c JOIN projects a ON a.id = c.ancestor_id
+         WHERE c.descendant_id = p.id AND a.billing_minimum IS NOT NULL
+         ORDER BY c.depth LIMIT 1) as minimum_minutes,
+        p.hourly_rate IS NULL as inherited
+    FROM projects p
+"""
+
+
+def get_billing_terms() -> dict[str, dict]:
+    """
+    Effective billing terms of every billable project.
+
+    Returns:
+        {project_name: {"rate", "increment_minutes", "minimum_minutes", "inherited"}}
+        "inherited" is True if the rate comes from an ancestor.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT * FROM ({_BILLING_TERMS_SQL}) WHERE rate IS NOT NULL ORDER BY name COLLATE NOCASE")
+        return {
+            row["name"]: {
+                "rate": row["rate"],
+                "increment_minutes": row["increment_minutes"] or 0,
+                "minimum_minutes": row["minimum_minutes"] or 0,
+                "inherited": bool(row["inherited"]),
+            }
+            for row in cursor.fetchall()
+        }
+
+
+def compute_billing(
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    filter_by: Optional[Filter] = None
+) -> dict:
+    """
+    Billed time and amounts per project for a period.
+
+    Each session's worked time (paused time excluded) is rounded up to
+    the project's increment, then raised to its minimum; the rounded
+    times are summed and multiplied by the rate. Projects without a rate
+    (own or inherited) aren't billed; their time is reported as
+    unbilled_seconds. Compacted days (see compact_sessions) are one
+    session each.
+
+    Args:
+        start_date: Bill sessions starting on or after this time
+        end_date: Bill sessions starting before this time
+        filter_by: Only bill sessions matching this filter
+
+    Returns:
+        {"projects": {name: {"rate", "increment_minutes", "minimum_minutes",
+                             "sessions", "actual_seconds", "billed_seconds", "amount"}},
+         "actual_seconds": int, "billed_seconds": int, "amount": float,
+         "unbilled_seconds": int}
+        Projects are ordered by amount DESC.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+
+        sessions_query = f"""
+            SELECT project_name, {_worked_seconds_sql()} as seconds
+            FROM {_sessions_source(conn, start_date, end_date)}
+            WHERE end_time IS NOT NULL
+        """
+        params: list = []
+
+        if start_date:
+            sessions_query += " AND start_time >= ?"
+            params.append(start_date.isoformat())
+
+        if end_date:
+            sessions_query += " AND start_time < ?"
+            params.append(end_date.isoformat())
+
+        if filter_by:
+            filter_sql, filter_params = filter_by.sessions_sql()
+            sessions_query += f" AND ({filter_sql})"
+            params.extend(filter_params)
+
+        # Rounding in integer seconds: ceil(x / inc) * inc == ((x + inc - 1) / inc) * inc
+        cursor.execute(f"""
+            WITH terms AS MATERIALIZED ({_BILLING_TERMS_SQL}),
+            worked AS ({sessions_query}),
+            billed AS (
+                SELECT
+                    w.project_name,
+                    t.rate,
+                    COALESCE(t.increment_minutes, 0) as increment_minutes,
+                    COALESCE(t.minimum_minutes, 0) as minimum_minutes,
+                    w.seconds,
+                    MAX(
+                        COALESCE(t.minimum_minutes, 0) * 60,
+                        CASE WHEN t.increment_minutes > 0
+                             THEN ((w.seconds + t.increment_minutes * 60 - 1) / (t.increment_minutes * 60))
+                                  * t.increment_minutes * 60
+                             ELSE w.seconds
+                        END
+                    ) as billed_seconds
+                FROM worked w
+                LEFT JOIN terms t ON t.name = w.project_name
+            )
+            SELECT
+                project_name,
+                rate,
+                increment_minutes,
+                minimum_minutes,
+                COUNT(*) as sessions,
+                SUM(seconds) as actual_seconds,
+                SUM(billed_seconds) as billed_seconds
+            FROM billed
+            GROUP BY project_name
+        """, params)
+        rows = cursor.fetchall()
+
+    projects: dict[str, dict] = {}
+    unbilled_seconds = 0
+    for row in rows:
+        if row["rate"] is None:
+            unbilled_seconds += int(row["actual_seconds"])
+            continue
+        billed_seconds = int(row["billed_seconds"])
+        projects[row["project_name"]] = {
+            "rate": row["rate"],
+            "increment_minutes": row["increment_minutes"],
+            "minimum_minutes": row["minimum_minutes"],
+            "sessions": row["sessions"],
+            "actual_seconds": int(row["actual_seconds"]),
+            "billed_seconds": billed_seconds,
+            "amount": round(billed_seconds / 3600 * row["rate"], 2),
+        }
+
+    projects = dict(sorted(projects.items(), key=lambda x: (-x[1]["amount"], x[0].lower())))
+    return {
+        "projects": projects,
+        "actual_seconds": sum(p["actual_seconds"] for p in projects.values()),
+        "billed_seconds": sum(p["billed_seconds"] for p in projects.values()),
+        "amount": round(sum(p["amount"] for p in projects.values()), 2),
+        "unbilled_seconds": unbilled_seconds,
+    }
+
+
+def export_invoice_csv(filepath: str, billing: dict, title: str = ""):
+    """
+    Write compute_billing() results as an invoice CSV: one line per
+    project and a total line.
+    """
+    import csv
+
+    with open(filepath, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        if title:
+            writer.writerow([title])
+        writer.writerow([
+            "Project",
+            "Sessions",
+            "Worked (hours)",
+            "Billed (hours)",
+            "Increment (minutes)",
+            "Minimum (minutes)",
+            "Rate",
+            "Amount"
+        ])
+        for name, line in billing["projects"].items():
+            writer.writerow([
+                name,
+                line["sessions"],
+                round(line["actual_seconds"] / 3600, 2),
+                round(line["billed_seconds"] / 3600, 2),
+                line["increment_minutes"],
+                line["minimum_minutes"],
+                f"{line['rate']:.2f}",
+                f"{line['amount']:.2f}"
+            ])
+        writer.writerow([
+            "Total",
+            sum(line["sessions"] for line in billing["projects"].values()),
+            round(billing["actual_seconds"] / 3600, 2),
+            round(billing["billed_seconds"] / 3600, 2),
+            "",
+            "",
+            "",
+            f"{billing['amount']:.2f}"
+        ])
+
+
+# =============================================================================
+# BUDGETS
+# =============================================================================
+#
+# A project can have an hour budget per week, per month and/or in total.
+# Progress comes from the time_counters table, which triggers on sessions
+# keep current (see _COUNTER_TRIGGERS_SQL): closing, editing, moving or
+# deleting a session adjusts its week, month and all-time rows (edits to
+# archived sessions do the same through _count_archived_sessions). Reading
+# progress is then one primary-key lookup per budget, however much
+# history there is. Time of still-active sessions isn't in the counters;
+# callers add it from the sessions they already have (see budgets.py).
+
+BUDGET_PERIODS = ("week", "month", "total")
+
+
+def budget_period_start(period: str, now: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    Start of the current budget period: Monday, the 1st, or None for "total".
+
+    Raises:
+        ValueError: If period isn't one of BUDGET_PERIODS
+    """
+    if period not in BUDGET_PERIODS:
+        raise ValueError(f"Unknown budget period: {period} (use {', '.join(BUDGET_PERIODS)})")
+    if period == "total":
+        return None
+
+    today = (now or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == "week":
+        return today - timedelta(days=today.weekday())
+    return today.replace(day=1)
+
+
+def set_project_budget(project_name: str, period: str, hours: Optional[float]) -> bool:
+    """
+    Set (or remove, with None) a project's hour budget for a period.
+
+    Returns:
+        True if updated, False if the project doesn't exist
+
+    Raises:
+        ValueError: If period is unknown or hours isn't a positive number
+    """
+    budget_period_start(period)
+    if hours is not None and not math.isfinite(hours):
+        raise ValueError(f"Budget must be a number of hours: {hours}")
+    if hours is not None and hours <= 0:
+        raise ValueError("Budget must be more than 0 hours")
+
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM projects WHERE name = ?", (project_name,))
+        row = cursor.fetchone()
+        if row is None:
+            return False
+
+        if hours is None:
+            cursor.execute("DELETE FROM budgets WHERE project_id = ? AND period = ?", (row["id"], period))
+        else:
+            cursor.execute("""
+                INSERT INTO budgets (project_id, period, hours) VALUES (?, ?, ?)
+                ON CONFLICT (project_id, period) DO UPDATE SET hours = excluded.hours
+            """, (row["id"], period, hours))
+        conn.commit()
+        return True
+
+
+def get_budget_progress(now: Optional[datetime] = None) -> list[dict]:
+    """
+    Every budget with the closed-session time counted against it so far.
+
+    Args:
+        now: Time whose week and month to report (default: now)
+
+    Returns:
+        [{"project", "period", "period_start" (datetime or None),
+          "budget_seconds", "used_seconds"}], by project then period.
+        used_seconds leaves out active sessions.
+    """
+    starts = {period: budget_period_start(period, now) for period in BUDGET_PERIODS}
+    keys = {period: start.strftime("%Y-%m-%d") if start else "" for period, start in starts.items()}
+
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT
+                p.name as project_name,
+                b.period,
+                b.hours,
+                COALESCE(c.seconds, 0) as used_seconds
+            FROM budgets b
+            JOIN projects p ON p.id = b.project_id
+            LEFT JOIN time_counters c
+                ON c.project_name = p.name
+               AND c.period = b.period
+               AND c.period_start = CASE b.period WHEN 'week' THEN ? WHEN 'month' THEN ? ELSE '' END
+            ORDER BY p.name COLLATE NOCASE, CASE b.period WHEN 'week' THEN 0 WHEN 'month' THEN 1 ELSE 2 END
+        """, (keys["week"], keys["month"]))
+
+        return [
+            {
+                "project": row["project_name"],
+                "period": row["period"],
+                "period_start": starts[row["period"]],
+                "budget_seconds": int(round(row["hours"] * 3600)),
+                "used_seconds": int(row["used_seconds"]),
+            }
+            for row in cursor.fetchall()
+        ]
@@ -0,0 +1,337 @@
+"""
+filters.py - Filter expressions for sessions and projects
+
+A small query language for picking sessions or projects, e.g.:
+
+    tag:client-a AND NOT tag:internal priority<=2 since:2025-01-01
+    project:~Acme OR (tag:ops background:no)
+
+Terms:
+    tag:NAME            Project has this tag (any case)
+    project:NAME        Exactly this project
+    project:~TEXT       Project name contains TEXT (any case)
+    under:NAME          NAME or any project below it in the hierarchy
+    priority<=N         Priority compared with N (also <, >, >=, =, :, !=)
+    background:yes|no   Background tasks / regular projects only
+    since:YYYY-MM-DD    Sessions starting on or after this date
+    until:YYYY-MM-DD    Sessions starting on or before this date
+    notes:~TEXT         Session notes contain TEXT (any case)
+    TEXT                A bare word is short for project:~TEXT
+
+Terms next to each other must all match (AND is optional). OR, NOT (or a
+leading "-") and parentheses combine them. Values with spaces go in
+double quotes: tag:"client a".
+
+Expressions compile to parameterized SQL, so filtering happens in SQLite
+with its indexes (tag lookups go through the tags name index and the
+project_tags junction table) instead of in Python after fetching
+everything. Session-only terms (since, until, notes) can't be used to
+filter projects.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+
+class FilterError(ValueError):
+    """A filter expression couldn't be parsed or doesn't apply here."""
+
+
+# field -> operators it accepts
+FIELDS = {
+    "tag": (":", "=", "!="),
+    "project": (":", "=", "!=", ":~"),
+    "priority": (":", "=", "!=", "<", "<=", ">", ">="),
+    "background": (":", "="),
+    "since": (":",),
+    "until": (":",),
+    "notes": (":~",),
+    "under": (":",),
+}
+
+# Terms about the session itself rather than its project
+SESSION_FIELDS = ("since", "until", "notes")
+
+_TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<paren>[()])
+      | (?P<neg>-)?(?P<field>[A-Za-z_]+)(?P<op>:~|<=|>=|!=|[:<>=])(?P<value>"[^"]*"|[^\s()"]*)
+      | (?P<word>-?(?:"[^"]*"|[^\s()"]+))
+    )
+""", re.VERBOSE)
+
+_KEYWORDS = ("AND", "OR", "NOT")
+
+_YES = ("yes", "y", "true", "1")
+_NO = ("no", "n", "false", "0")
+
+
+# =============================================================================
+# PARSING
+# =============================================================================
+#
+# Parsed expressions are nested tuples:
+#   ("and", [node, ...])   ("or", [node, ...])   ("not", node)
+#   ("term", field, op, value)
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value.startswith('"') and value.endswith('"'):
+        return value[1:-1]
+    return value
+
+
+def _tokenize(text: str) -> list[tuple]:
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = _TOKEN_RE.match(text, pos)
+        if match is None or match.end() == pos:
+            raise FilterError(f"Can't read filter at: {text[pos:].strip()}")
+        pos = match.end()
+
+        if match["paren"]:
+            tokens.append((match["paren"],))
+        elif match["field"]:
+            if match["neg"]:
+                # "-field:value" is NOT field:value
+                tokens.append(("NOT",))
+            tokens.append(_term(match["field"].lower(), match["op"], _unquote(match["value"])))
+        else:
+            word = match["word"]
+            if word.upper() in _KEYWORDS:
+                tokens.append((word.upper(),))
+            elif word.startswith("-") and len(word) > 1:
+                # "-word" is NOT project:~word
+                tokens.append(("NOT",))
+                tokens.append(_term("project", ":~", _unquote(word[1:])))
+            else:
+                tokens.append(_term("project", ":~", _unquote(word)))
+    return tokens
+
+
+def _term(field: str, op: str, value: str) -> tuple:
+    """Check one field:value term and convert its value."""
+    if field not in FIELDS:
+        raise FilterError(f"Unknown filter field: {field} (use {', '.join(FIELDS)})")
+    if op not in FIELDS[field]:
+        raise FilterError(f"{field} can't be used with {op}")
+    if value == "":
+        raise FilterError(f"Missing value for {field}{op}")
+
+    converted: Any = value
+    if field == "priority":
+        try:
+            converted = int(value)
+        except ValueError:
+            raise FilterError(f"Priority must be a number: {value}")
+    elif field == "background":
+        if value.lower() in _YES:
+            converted = True
+        elif value.lower() in _NO:
+            converted = False
+        else:
+            raise FilterError(f"background must be yes or no: {value}")
+    elif field in ("since", "until"):
+        try:
+            converted = datetime.fromisoformat(value)
+        except ValueError:
+            raise FilterError(f"Invalid {field} date: {value} (use YYYY-MM-DD)")
+
+    return ("term", field, op, converted)
+
+
+class _Parser:
+    """Recursive descent: OR binds loosest, then AND, then NOT."""
+
+    def __init__(self, tokens: list[tuple]):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos][0] if self.pos < len(self.tokens) else None
+
+    def take(self):
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def parse(self):
+        node = self.parse_or()
+        if self.pos < len(self.tokens):
+            raise FilterError(f"Unexpected {self.peek()} in filter")
+        return node
+
+    def parse_or(self):
+        nodes = [self.parse_and()]
+        while self.peek() == "OR":
+            self.take()
+            nodes.append(self.parse_and())
+        return nodes[0] if len(nodes) == 1 else ("or", nodes)
+
+    def parse_and(self):
+        nodes = [self.parse_not()]
+        while self.peek() not in (None, "OR", ")"):
+            if self.peek() == "AND":
+                self.take()
+            nodes.append(self.parse_not())
+        return nodes[0] if len(nodes) == 1 else ("and", nodes)
+
+    def parse_not(self):
+        if self.peek() == "NOT":
+            self.take()
+            return ("not", self.parse_not())
+        return self.parse_atom()
+
+    def parse_atom(self):
+        kind = self.peek()
+        if kind is None:
+            raise FilterError("Filter ends too early")
+        if kind == "(":
+            self.take()
+            node = self.parse_or()
+            if self.peek() != ")":
+                raise FilterError("Missing ) in filter")
+            self.take()
+            return node
+        if kind == "term":
+            return self.take()
+        raise FilterError(f"Unexpected {kind} in filter")
+
+
+# =============================================================================
+# SQL
+# =============================================================================
+
+_SQL_OPS = {":": "=", "=": "=", "!=": "!=", "<": "<", "<=": "<=", ">": ">", ">=": ">="}
+
+
+def _like(text: str) -> str:
+    """LIKE pattern for "contains text", with wildcards in text escaped."""
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _project_term_sql(field: str, op: str, value: Any, alias: str) -> tuple[str, list]:
+    """SQL for a term about a project, with projects aliased as alias."""
+    if field == "tag":
+        # tags.name is COLLATE NOCASE, so this uses its index in any case
+        sql = f"""{alias}.id IN (
+            SELECT fpt.project_id FROM project_tags fpt
+            JOIN tags ft ON ft.id = fpt.tag_id
+            WHERE ft.name = ?
+        )"""
+        return (f"NOT {sql}" if op == "!=" else sql), [value]
+    if field == "project":
+        if op == ":~":
+            return f"{alias}.name LIKE ? ESCAPE '\\'", [_like(value)]
+        return f"{alias}.name {_SQL_OPS[op]} ?", [value]
+    if field == "under":
+        # One indexed lookup in the closure table, however deep the tree
+        return f"""{alias}.id IN (
+            SELECT fc.descendant_id FROM project_closure fc
+            JOIN projects fa ON fa.id = fc.ancestor_id
+            WHERE fa.name = ?
+        )""", [value]
+    if field == "priority":
+        return f"COALESCE({alias}.priority, 3) {_SQL_OPS[op]} ?", [value]
+    if field == "background":
+        return f"COALESCE({alias}.is_background, 0) = ?", [1 if value else 0]
+    raise FilterError(f"{field}: only applies to sessions, not projects")
+
+
+def _session_term_sql(field: str, op: str, value: Any) -> tuple[str, list]:
+    """SQL for a term about a session (sessions columns unqualified)."""
+    if field == "project":
+        # Straight on the sessions column, so its index can be used
+        if op == ":~":
+            return "project_name LIKE ? ESCAPE '\\'", [_like(value)]
+        return f"project_name {_SQL_OPS[op]} ?", [value]
+    if field == "since":
+        return "start_time >= ?", [value.isoformat()]
+    if field == "until":
+        # Inclusive: everything that starts on that day
+        return "start_time < ?", [(value + timedelta(days=1)).isoformat()]
+    if field == "notes":
+        return "COALESCE(notes, '') LIKE ? ESCAPE '\\'", [_like(value)]
+
+    if field == "background" and not value:
+        # Sessions of deleted projects count as regular ones
+        return "project_name NOT IN (SELECT fp.name FROM projects fp WHERE fp.is_background = 1)", []
+
+    # Project properties: find the matching projects first
+    sql, params = _project_term_sql(field, op, value, "fp")
+    return f"project_name IN (SELECT fp.name FROM projects fp WHERE {sql})", params
+
+
+def _compile(node, term_sql) -> tuple[str, list]:
+    kind = node[0]
+    if kind == "term":
+        return term_sql(*node[1:])
+    if kind == "not":
+        sql, params = _compile(node[1], term_sql)
+        return f"NOT ({sql})", params
+
+    parts, params = [], []
+    for child in node[1]:
+        sql, child_params = _compile(child, term_sql)
+        parts.append(f"({sql})")
+        params.extend(child_params)
+    return f" {kind.upper()} ".join(parts), params
+
+
+def _fields(node) -> set[str]:
+    if node[0] == "term":
+        return {node[1]}
+    if node[0] == "not":
+        return _fields(node[1])
+    return set().union(*(_fields(child) for child in node[1]))
+
+
+@dataclass(frozen=True)
+class Filter:
+    """A parsed filter expression (see parse_filter)."""
+
+    text: str
+    tree: tuple
+
+    @property
+    def session_only(self) -> bool:
+        """True if it uses terms that only apply to sessions."""
+        return bool(_fields(self.tree) & set(SESSION_FIELDS))
+
+    def sessions_sql(self) -> tuple[str, list]:
+        """
+        WHERE condition (and its parameters) selecting matching sessions.
+
+        Columns are unqualified (project_name, start_time, notes), so it
+        works against the sessions table or db._sessions_source().
+        """
+        return _compile(self.tree, _session_term_sql)
+
+    def projects_sql(self, alias: str = "projects") -> tuple[str, list]:
+        """
+        WHERE condition (and its parameters) selecting matching projects.
+
+        Raises:
+            FilterError: If the filter uses session-only terms
+        """
+        return _compile(self.tree, lambda field, op, value: _project_term_sql(field, op, value, alias))
+
+    def __str__(self) -> str:
+        return self.text
+
+
+def parse_filter(text: str) -> Filter:
+    """
+    Parse a filter expression.
+
+    Raises:
+        FilterError: If the expression is empty or invalid
+    """
+    tokens = _tokenize(text)
+    if not tokens:
+        raise FilterError("Empty filter")
+    return Filter(text=text.strip(), tree=_Parser(tokens).parse())
@@ -8,14 +8,18 @@ but with a visual interface and live timer updates.
 Run with: python gui.py
 """
 
+import time
+from datetime import datetime
 import tkinter as tk
 from tkinter import filedialog
 import customtkinter as ctk
 
 import db
 import themes
+from budgets import BudgetTracker, tightest
 from themes import FONT_FAMILY
 from gui_utils import batch_update
+from write_queue import WriteQueue
 
 # Import tab components
 from timer_tab import TimerTab, LogSessionDialog
@@ -25,6 +29,14 @@ from projects_tab import ProjectsTab
 from appearance_tab import AppearanceTab
 from dialogs import CTkMessagebox, CTkConfirmDialog
 
+# Timer tick modes, from most to least work per tick
+TICK_FULL = "full"        # Focused: every second, status bar + visible tab
+TICK_STATUS = "status"    # Visible but unfocused: every second, status bar only
+TICK_IDLE = "idle"        # Minimized: once a minute, status bar only
+
+# How often to check for finished background writes (ms)
+WRITE_POLL_MS = 50
+
 
 class DerbyApp:
     """Main application window."""
@@ -50,11 +62,31 @@ class DerbyApp:
         # Status bar variable
         self.status_var = ctk.StringVar(value="Ready")
 
+        # Timer actions write through a background thread (see queue_write)
+        self.writer = WriteQueue(on_error=self._on_write_error)
+        self._write_poll_id = None
+
+        # Active sessions as last read from the database, plus any changes
+        # made by queued writes that haven't landed yet
+        self._active_sessions = None
+        self._active_fetched_at = 0.0
+
+        # Budget counters, kept between ticks (see budgets.py)
+        self.budgets = BudgetTracker()
+
         # Build UI components
         self._create_menu()
         self._create_tabview()
         self._create_status_bar()
 
+        # Timer tick state
+        self._tick_after_id = None
+        self._tick_mode = TICK_FULL
+
+        # Catch up immediately when the window is restored or refocused
+        self.root.bind("<Map>", self._on_window_activity, add="+")
+        self.root.bind("<FocusIn>", self._on_window_activity, add="+")
+
         # Start timer update loop
         self._schedule_timer_update()
 
@@ -162,23 +194,77 @@ class DerbyApp:
         status_label.pack(fill=ctk.X, padx=10, pady=5)
 
     def _schedule_timer_update(self):
-        """Schedule periodic timer updates."""
+        """Schedule the next timer tick on a wall-clock boundary.
+
+        Ticks are aligned to the start of the next second (or minute when
+        minimized) rather than chained with a fixed delay, so the time
+        spent updating never accumulates into drift or skipped seconds.
+        """
+        period = 60.0 if self._tick_mode == TICK_IDLE else 1.0
+        delay = period - (time.time() % period)
+        # Land a few ms after the boundary, never just before it
+        self._tick_after_id = self.root.after(int(delay * 1000) + 5, self._on_timer_tick)
+
+    def _on_timer_tick(self):
+        """Run one timer tick and schedule the next."""
+        self._tick_after_id = None
         self._update_timers()
-        self.root.after(1000, self._schedule_timer_update)
+        self._schedule_timer_update()
+
+    def _on_window_activity(self, event=None):
+        """Tick right away if the window just became more visible."""
+        if self._get_tick_mode() == self._tick_mode:
+            return
+
+        if self._tick_after_id is not None:
+            self.root.after_cancel(self._tick_after_id)
+        self._tick_after_id = self.root.after_idle(self._on_timer_tick)
+
+    def _get_tick_mode(self) -> str:
+        """Work out how much the next tick needs to update."""
+        try:
+            if self.root.state() in ("iconic", "withdrawn"):
+                return TICK_IDLE
+            focused = self.root.focus_get() is not None
+        except KeyError:
+            # focus_get() can't resolve some internal popdown widgets,
+            # which only happens while one of ours has focus
+            focused = True
+        except tk.TclError:
+            return TICK_IDLE
+        return TICK_FULL if focused else TICK_STATUS
 
     def _update_timers(self):
-        """Update all active session durations."""
-        # Update timer tab
-        self.timer_tab.update_durations()
+        """Update active session durations for the current tick mode."""
+        self._tick_mode = self._get_tick_mode()
+
+        # Re-query the database every tick only while the user is looking;
+        # otherwise durations are computed from the cached sessions and the
+        # cache is refreshed once a minute to pick up external changes.
+        # While writes are queued the cache is ahead of the database, so
+        # it's used as-is.
+        if (self._tick_mode == TICK_FULL or self._active_sessions is None
+                or time.time() - self._active_fetched_at >= 60):
+            active = self.current_active_sessions()
+        else:
+            active = self._active_sessions
+
+        # Counted time plus the active sessions' elapsed time, in memory
+        budget_progress = self.budgets.progress(active)
+
+        # Only the Timer tab shows live durations, and only when focused
+        if self._tick_mode == TICK_FULL and self.current_tab == "Timer":
+            self.timer_tab.update_durations(active, budget_progress)
 
         # Update status bar
-        active = db.get_active_sessions()
         if not active:
             self.status_var.set("Idle - No active sessions")
         elif len(active) == 1:
             s = active[0]
             paused_indicator = " [PAUSED]" if s.is_paused else ""
-            self.status_var.set(f"Tracking: {s.project_name} ({s.format_duration()}){paused_indicator}")
+            budget = tightest(budget_progress.get(s.project_name, []))
+            budget_indicator = f" - {budget.format()}" if budget else ""
+            self.status_var.set(f"Tracking: {s.project_name} ({s.format_duration()}){paused_indicator}{budget_indicator}")
         else:
             total = sum(s.duration_seconds for s in active)
             paused_count = sum(1 for s in active if s.is_paused)
@@ -186,7 +272,72 @@ class DerbyApp:
             m = (total % 3600) // 60
             sec = total % 60
             paused_indicator = f" [{paused_count} paused]" if paused_count > 0 else ""
-            self.status_var.set(f"Tracking: {len(active)} sessions (Total: {h}h {m:02d}m {sec:02d}s){paused_indicator}")
+            over_count = sum(
+                1 for name in {s.project_name for s in active}
+                if any(p.is_over for p in budget_progress.get(name, []))
+            )
+            budget_indicator = f" - {over_count} over budget" if over_count else ""
+            self.status_var.set(f"Tracking: {len(active)} sessions (Total: {h}h {m:02d}m {sec:02d}s){paused_indicator}{budget_indicator}")
+
+    def current_active_sessions(self, refresh: bool = True) -> list:
+        """
+        Get the active sessions, re-read from the database.
+
+        While timer writes are still queued, the in-memory list is returned
+        instead: it already reflects those writes and the database doesn't.
+        Callers may update the returned list and Session objects
+        optimistically.
+
+        Args:
+            refresh: If False, return the in-memory list without reading
+                     the database (button handlers use this - the timer
+                     re-reads it at most a second ago)
+        """
+        if self._active_sessions is None or (refresh and not self.writer.pending):
+            self._active_sessions = db.get_active_sessions()
+            self._active_fetched_at = time.time()
+        return self._active_sessions
+
+    # =========================================================================
+    # Background Writes
+    # =========================================================================
+
+    def queue_write(self, func, *args, on_done=None, **kwargs):
+        """
+        Run a db write on the writer thread and return immediately.
+
+        Update the UI (and current_active_sessions()) before calling this;
+        once every queued write has landed the Timer tab is re-read from the
+        database, which swaps optimistic state for the real rows. Failures
+        are reported with a message box.
+
+        Args:
+            func: db function to call
+            on_done: Optional callback(result), run on the UI thread
+        """
+        self.writer.submit(func, *args, on_done=on_done, **kwargs)
+        if self._write_poll_id is None:
+            self._write_poll_id = self.root.after(WRITE_POLL_MS, self._poll_writes)
+
+    def _poll_writes(self):
+        """Handle finished writes; reconcile with the database when all are done."""
+        self._write_poll_id = None
+        self.writer.poll()
+
+        if self.writer.pending:
+            self._write_poll_id = self.root.after(WRITE_POLL_MS, self._poll_writes)
+            return
+
+        self._active_sessions = None
+        # Stopped sessions are in the budget counters now
+        self.budgets.invalidate()
+        if self.current_tab == "Timer":
+            self.timer_tab.refresh_sessions()
+        self._update_timers()
+
+    def _on_write_error(self, error: Exception):
+        """Report a background write that failed."""
+        CTkMessagebox(self.root, "Error", f"Could not save the change:\n{error}", "error")
 
     def _on_tab_change(self, tab_name: str = None):
         """Switch to a different tab and refresh its data."""
@@ -225,14 +376,17 @@ class DerbyApp:
 
     def _stop_all(self):
         """Stop all active sessions."""
-        active = db.get_active_sessions()
+        active = self.current_active_sessions()
         if not active:
             CTkMessagebox(self.root, "Info", "No active sessions to stop", "info")
             return
 
         if CTkConfirmDialog(self.root, "Confirm", f"Stop {len(active)} active session(s)?").get_result():
-            db.stop_all_sessions()
-            self.timer_tab.refresh()
+            # Clear the cards now; the write lands in the background
+            active.clear()
+            self.queue_write(db.stop_all_sessions, when=datetime.now())
+            self.timer_tab.refresh_sessions()
+            self._update_timers()
 
     def _show_log_dialog(self):
         """Show dialog to log manual entry."""
@@ -251,6 +405,14 @@ class DerbyApp:
 
     def _on_close(self):
         """Handle window close."""
+        if self._tick_after_id is not None:
+            self.root.after_cancel(self._tick_after_id)
+            self._tick_after_id = None
+        if self._write_poll_id is not None:
+            self.root.after_cancel(self._write_poll_id)
+            self._write_poll_id = None
+        # Don't lose clicks that haven't been written yet
+        self.writer.close()
         self.root.destroy()
 
     def run(self):
@@ -350,7 +512,7 @@ class DerbyApp:
 class TreeviewFrame(ctk.CTkFrame):
     """A frame containing a treeview with scrollbar (using tkinter Treeview)."""
 
-    def __init__(self, parent, columns, headings, widths, height=8, show_scrollbar=True, anchors=None):
+    def __init__(self, parent, columns, headings, widths, height=8, show_scrollbar=True, anchors=None, show="headings"):
         super().__init__(parent, fg_color=themes.get_colors()["bg_dark"])
 
         # Create treeview container
@@ -359,7 +521,8 @@ class TreeviewFrame(ctk.CTkFrame):
 
         # Create treeview (using tkinter since CustomTkinter doesn't have treeview)
         # TTK styles are configured centrally via themes.apply_ttk_styles()
-        self.tree = tk.ttk.Treeview(tree_container, columns=columns, show="headings", height=height)
+        # show="tree headings" adds the expandable tree column (#0)
+        self.tree = tk.ttk.Treeview(tree_container, columns=columns, show=show, height=height)
 
         # Default anchors to 'w' (left) if not provided
         if anchors is None:
@@ -383,11 +546,11 @@ class TreeviewFrame(ctk.CTkFrame):
         if children:
             self.tree.delete(*children)
 
-    def insert(self, values, iid=None, tags=None):
-        """Insert a row into the treeview."""
+    def insert(self, values, iid=None, tags=None, parent="", text="", open=False):
+        """Insert a row into the treeview (under parent, for tree views)."""
         if tags:
-            return self.tree.insert("", tk.END, iid=iid, values=values, tags=tags)
-        return self.tree.insert("", tk.END, iid=iid, values=values)
+            return self.tree.insert(parent, tk.END, iid=iid, values=values, tags=tags, text=text, open=open)
+        return self.tree.insert(parent, tk.END, iid=iid, values=values, text=text, open=open)
 
     def get_selection(self):
         """Get the current selection."""
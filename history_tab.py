@@ -11,6 +11,7 @@ import customtkinter as ctk
 import db
 import themes
 from dialogs import CTkMessagebox, CTkConfirmDialog
+from filters import FilterError, parse_filter
 from gui_utils import batch_update
 
 if TYPE_CHECKING:
@@ -26,6 +27,10 @@ class HistoryTab:
         self.project_filter = ctk.StringVar(value="All")
         self.period_filter = ctk.StringVar(value="All")
         self.limit_var = ctk.StringVar(value="50")
+        self.search_var = ctk.StringVar(value="")
+        self.filter_var = ctk.StringVar(value="")
+        # Pending after() call for search-as-you-type
+        self._search_job = None
         self._build_ui()
 
     def _build_ui(self):
@@ -71,6 +76,29 @@ class HistoryTab:
         refresh_btn = ctk.CTkButton(filter_row, text="Refresh", command=self.refresh)
         refresh_btn.pack(side=ctk.LEFT, padx=10)
 
+        # Second row: full-text search over notes and project names
+        search_row = ctk.CTkFrame(filter_frame, fg_color="transparent")
+        search_row.pack(fill=ctk.X, pady=5)
+
+        ctk.CTkLabel(search_row, text="Search:").pack(side=ctk.LEFT)
+        search_entry = ctk.CTkEntry(
+            search_row,
+            textvariable=self.search_var,
+            width=300
+        )
+        search_entry.pack(side=ctk.LEFT, padx=(5, 5))
+        search_entry.bind("<KeyRelease>", lambda _: self._schedule_search())
+        search_entry.bind("<Return>", lambda _: self.refresh())
+
+        clear_btn = ctk.CTkButton(search_row, text="Clear", width=60, command=self._clear_search)
+        clear_btn.pack(side=ctk.LEFT, padx=5)
+
+        # Filter expression (see filters.py), applied with Enter or Refresh
+        ctk.CTkLabel(search_row, text="Filter:").pack(side=ctk.LEFT, padx=(15, 0))
+        filter_entry = ctk.CTkEntry(search_row, textvariable=self.filter_var, width=260)
+        filter_entry.pack(side=ctk.LEFT, padx=5)
+        filter_entry.bind("<Return>", lambda _: self.refresh())
+
         # Sessions treeview
         self.tree_frame = TreeviewFrame(
             self.frame,
@@ -124,13 +152,38 @@ class HistoryTab:
         except ValueError:
             limit = 50
 
-        # Query sessions
-        sessions = db.get_sessions(
-            project_name=project,
-            start_date=start_date,
-            end_date=end_date,
-            limit=limit
-        )
+        filter_text = self.filter_var.get().strip()
+        try:
+            filter_by = parse_filter(filter_text) if filter_text else None
+        except FilterError as e:
+            CTkMessagebox(self.app.root, "Invalid Filter", str(e), "warning")
+            return
+
+        # Query sessions (best matches first while searching)
+        snippets = {}
+        search_text = self.search_var.get().strip()
+        if search_text:
+            results = db.search_sessions(
+                search_text,
+                project_name=project,
+                start_date=start_date,
+                end_date=end_date,
+                limit=limit,
+                filter_by=filter_by
+            )
+            sessions = [session for session, _ in results]
+            snippets = {
+                session.id: snippet.replace(db.SNIPPET_START, "").replace(db.SNIPPET_END, "")
+                for session, snippet in results
+            }
+        else:
+            sessions = db.get_sessions(
+                project_name=project,
+                start_date=start_date,
+                end_date=end_date,
+                limit=limit,
+                filter_by=filter_by
+            )
 
         # Use batch_update to defer painting during clear and repopulate
         with batch_update(self.tree_frame):
@@ -140,12 +193,29 @@ class HistoryTab:
             # Populate tree
             for session in sessions:
                 date_str = session.start_time.strftime("%Y-%m-%d") if session.start_time else ""
-                notes_preview = session.notes[:50] + "..." if len(session.notes) > 50 else session.notes
+                # While searching, show the part of the notes that matched
+                notes = snippets.get(session.id, session.notes)
+                notes_preview = notes[:50] + "..." if len(notes) > 50 else notes
                 self.tree_frame.insert(
                     values=(session.id, date_str, session.project_name, session.format_duration(), notes_preview),
                     iid=str(session.id)
                 )
 
+    def _schedule_search(self):
+        """Search shortly after typing stops, not on every keystroke."""
+        if self._search_job is not None:
+            self.frame.after_cancel(self._search_job)
+        self._search_job = self.frame.after(250, self._run_scheduled_search)
+
+    def _run_scheduled_search(self):
+        self._search_job = None
+        self.refresh()
+
+    def _clear_search(self):
+        """Go back to the plain session list."""
+        self.search_var.set("")
+        self.refresh()
+
     def delete_selected(self):
         """Delete the selected session."""
         selection = self.tree_frame.get_selection()
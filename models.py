@@ -50,6 +50,7 @@ class Project:
     priority: int = 3                  # Priority 1-5 (1=highest, 5=lowest), ignored for background tasks
     tags: list[str] = field(default_factory=list)  # List of tag names, empty for background tasks
     is_background: bool = False        # True if this is a background task
+    frecency: Optional[float] = None   # Recent-use score (higher = used more lately), None if never started
 
     def __post_init__(self):
         """
@@ -161,6 +162,40 @@ class Session:
         # f-string with :02d means "pad to 2 digits with zeros"
         return f"{hours}h {minutes:02d}m {seconds:02d}s"
 
+    def to_dict(self) -> dict:
+        """
+        Convert to a JSON-friendly dict (datetimes as ISO strings).
+
+        The inverse of Session.from_dict().
+        """
+        return {
+            "id": self.id,
+            "project_name": self.project_name,
+            "start_time": self.start_time.isoformat() if self.start_time else None,
+            "end_time": self.end_time.isoformat() if self.end_time else None,
+            "notes": self.notes,
+            "is_paused": self.is_paused,
+            "paused_seconds": self.paused_seconds,
+            "pause_started_at": self.pause_started_at.isoformat() if self.pause_started_at else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Session":
+        """Rebuild a Session from the output of to_dict()."""
+        def parse(value):
+            return datetime.fromisoformat(value) if value else None
+
+        return cls(
+            id=data.get("id"),
+            project_name=data.get("project_name", ""),
+            start_time=parse(data.get("start_time")),
+            end_time=parse(data.get("end_time")),
+            notes=data.get("notes") or "",
+            is_paused=bool(data.get("is_paused")),
+            paused_seconds=data.get("paused_seconds") or 0,
+            pause_started_at=parse(data.get("pause_started_at")),
+        )
+
 
 def parse_duration_string(duration_str: str) -> timedelta:
     """
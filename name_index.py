@@ -0,0 +1,224 @@
+"""
+name_index.py - In-memory search index over project names
+
+Provides fast, case-insensitive type-ahead filtering for the project
+picker and fuzzy name resolution for the CLI. The index is plain Python
+with no GUI or database imports, so it can be shared by any front end.
+"""
+
+import re
+from typing import Iterable
+
+
+# Fuzzy match kinds, best first
+MATCH_EXACT = "exact"          # Same name, different case
+MATCH_PREFIX = "prefix"        # Name (or one of its words) starts with the query
+MATCH_INITIALS = "initials"    # Query spells the first letters of the words ("js" -> "Job Search")
+MATCH_SUBSTRING = "substring"  # Query appears somewhere in the name
+MATCH_TYPO = "typo"            # Within a small edit distance of the name
+
+# Characters that separate words for prefix/initials matching
+_WORD_SPLIT = re.compile(r"[\s_\-./]+")
+
+
+class NameIndex:
+    """
+    Prefix/substring index over a list of names.
+
+    Names keep the order they were given in, so search results come back
+    in the caller's display order. Substring queries of three or more
+    characters are answered from a trigram index; shorter queries scan
+    the (already lowercased) names directly. A query that extends the
+    previous one only re-checks the previous matches, which keeps
+    keystroke-by-keystroke filtering cheap.
+
+    The trigram and word tables are built on first use, so a short-lived
+    index (one CLI command) only pays for the lookups it actually makes.
+    """
+
+    def __init__(self, names: Iterable[str] = ()):
+        self.names: list[str] = []
+        self._lower: list[str] = []
+        self._trigrams: dict[str, set[int]] | None = None
+        self._words: list[list[str]] | None = None
+        self._last_query: str | None = None
+        self._last_matches: list[int] = []
+        self.rebuild(names)
+
+    def rebuild(self, names: Iterable[str]):
+        """
+        Replace the indexed names.
+
+        Args:
+            names: Names in display order
+        """
+        self.names = list(names)
+        self._lower = [name.lower() for name in self.names]
+        self._trigrams = None
+        self._words = None
+        self._last_query = None
+        self._last_matches = []
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def search(self, query: str) -> list[str]:
+        """
+        Find names containing the query (case-insensitive).
+
+        Args:
+            query: Text typed by the user
+
+        Returns:
+            Matching names in index order (all names for an empty query)
+        """
+        return [self.names[i] for i in self._match_positions(query.strip().lower())]
+
+    def _match_positions(self, query: str) -> list[int]:
+        """Return sorted positions of names containing the lowercased query."""
+        if not query:
+            return list(range(len(self.names)))
+
+        if self._last_query is not None and query.startswith(self._last_query):
+            # Narrowing the previous query: only its matches can still match
+            candidates = self._last_matches
+        elif len(query) >= 3:
+            if self._trigrams is None:
+                self._build_trigrams()
+
+            # Intersect trigram postings, smallest first
+            postings = []
+            for i in range(len(query) - 2):
+                posting = self._trigrams.get(query[i:i + 3])
+                if not posting:
+                    postings = None
+                    break
+                postings.append(posting)
+            if postings is None:
+                candidates = []
+            else:
+                postings.sort(key=len)
+                candidates = sorted(set.intersection(*postings))
+        else:
+            candidates = range(len(self.names))
+
+        # Trigrams only narrow the candidates; confirm the full substring
+        lower = self._lower
+        matches = [i for i in candidates if query in lower[i]]
+
+        self._last_query = query
+        self._last_matches = matches
+        return matches
+
+    def fuzzy(self, query: str, limit: int = 9) -> list[tuple[str, str]]:
+        """
+        Rank names that loosely match the query.
+
+        Tries progressively looser kinds of match (see the MATCH_*
+        constants) and returns the first kind that finds anything, so a
+        clear prefix hit is never diluted by distant typo candidates.
+        Within a kind, names keep index order.
+
+        Args:
+            query: Name as typed by the user
+            limit: Maximum number of candidates to return
+
+        Returns:
+            List of (name, match_kind) tuples, best first
+        """
+        q = query.strip().lower()
+        if not q:
+            return []
+
+        lower = self._lower
+        exact = [i for i, name in enumerate(lower) if name == q]
+        if exact:
+            return [(self.names[i], MATCH_EXACT) for i in exact[:limit]]
+
+        if self._words is None:
+            self._words = [[w for w in _WORD_SPLIT.split(name) if w] for name in lower]
+        words = self._words
+
+        # Prefix and initials hits are equally strong signals
+        strong = []
+        for i, name in enumerate(lower):
+            if name.startswith(q) or any(w.startswith(q) for w in words[i]):
+                strong.append((i, MATCH_PREFIX))
+            elif len(q) > 1 and "".join(w[0] for w in words[i]).startswith(q):
+                strong.append((i, MATCH_INITIALS))
+        if strong:
+            return [(self.names[i], kind) for i, kind in strong[:limit]]
+
+        # A single linear scan is cheaper than building trigrams for one lookup
+        substring = [i for i, name in enumerate(lower) if q in name]
+        if substring:
+            return [(self.names[i], MATCH_SUBSTRING) for i in substring[:limit]]
+
+        # Allow roughly one typo per four characters, compared against the
+        # whole name and (for a mistyped abbreviation) its leading letters
+        max_distance = max(1, len(q) // 4)
+        typos = []
+        for i, name in enumerate(lower):
+            # Each letter of the query missing from the name costs at least
+            # one edit - a cheap bound that skips most of the DP work
+            if sum(1 for c in q if c not in name) > max_distance:
+                continue
+            distance = _edit_distance(q, name, max_distance)
+            if distance > max_distance and len(q) >= 3:
+                distance = _edit_distance(q, name[:len(q)], max_distance)
+            if distance <= max_distance:
+                typos.append((distance, i))
+        typos.sort()
+        return [(self.names[i], MATCH_TYPO) for _, i in typos[:limit]]
+
+    def _build_trigrams(self):
+        """Index every three-character slice of every name."""
+        self._trigrams = {}
+        for position, lowered in enumerate(self._lower):
+            for i in range(len(lowered) - 2):
+                self._trigrams.setdefault(lowered[i:i + 3], set()).add(position)
+
+
+def _edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Optimal string alignment distance between a and b, capped.
+
+    Counts insertions, deletions, substitutions and adjacent swaps. Only
+    cells within max_distance of the diagonal are computed, and the scan
+    stops once a whole row is out of range, so the cost is
+    O(len(a) * max_distance) rather than O(len(a) * len(b)).
+
+    Returns:
+        The distance, or max_distance + 1 if it exceeds max_distance
+    """
+    too_far = max_distance + 1
+    if abs(len(a) - len(b)) > max_distance:
+        return too_far
+
+    width = len(b) + 1
+    previous_previous = [too_far] * width
+    previous = [j if j <= max_distance else too_far for j in range(width)]
+
+    for i in range(1, len(a) + 1):
+        current = [too_far] * width
+        if i <= max_distance:
+            current[0] = i
+        row_best = current[0]
+        for j in range(max(1, i - max_distance), min(len(b), i + max_distance) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(
+                previous[j] + 1,         # Deletion
+                current[j - 1] + 1,      # Insertion
+                previous[j - 1] + cost   # Substitution
+            )
+            # Adjacent transposition ("ab" <-> "ba")
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+            if value < row_best:
+                row_best = value
+        if row_best > max_distance:
+            return too_far
+        previous_previous, previous = previous, current
+
+    return min(previous[-1], too_far)
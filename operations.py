@@ -0,0 +1,331 @@
+"""
+operations.py - Tracker operations as plain data
+
+Describes each write the CLI can make (start, stop, log, ...) as a dict,
+so a list of them can be read from a file or pipe and replayed in one
+process. Used by `tt batch`.
+
+An operation looks like:
+    {"op": "log", "project": "Reading", "duration": "45m", "notes": "Ch. 3"}
+
+The same operation can be written as a command line, in the same syntax
+as the CLI (the leading "tt" is optional):
+    log Reading 45m --notes "Ch. 3"
+
+Project names are used exactly as given - unlike the interactive CLI
+there is no fuzzy matching, since scripts should say what they mean.
+"""
+
+import json
+import math
+import shlex
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+import db
+from models import Session, parse_duration_string
+
+
+class OperationError(ValueError):
+    """An operation was malformed or could not be applied."""
+
+
+# Positional arguments each operation accepts, in order
+# (a trailing "?" marks an optional one)
+OPERATIONS = {
+    "start": ["project"],
+    "stop": ["project?"],
+    "stopall": [],
+    "switch": ["project"],
+    "log": ["project", "duration"],
+    "pause": ["project?"],
+    "resume": ["project?"],
+    "cancel": ["project?"],
+    "tag": ["project"],
+    "priority": ["project", "level"],
+}
+
+# Command-line options and the operation keys they set
+_OPTIONS = {
+    "--notes": "notes", "-n": "notes",
+    "--date": "date", "-d": "date",
+    "--from": "from", "-f": "from",
+    "--add": "add", "-a": "add",
+    "--remove": "remove", "-r": "remove",
+}
+
+# Options that may be repeated (collected into a list)
+_LIST_OPTIONS = {"add", "remove"}
+
+# Keys whose values must be strings when given (JSON can hold anything)
+_TEXT_KEYS = {"project", "notes", "date", "from"}
+
+
+def parse_line(line: str) -> Optional[dict[str, Any]]:
+    """
+    Turn one line of batch input into an operation dict.
+
+    Lines starting with "{" are read as JSON; anything else is split like
+    a shell command. Blank lines and "#" comments return None.
+
+    Raises:
+        OperationError: If the line can't be parsed
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+
+    if line.startswith("{"):
+        try:
+            op = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise OperationError(f"Invalid JSON: {e.msg}")
+        if not isinstance(op, dict) or "op" not in op:
+            raise OperationError('JSON operations need an "op" key')
+        return op
+
+    try:
+        words = shlex.split(line)
+    except ValueError as e:
+        raise OperationError(f"Can't parse line: {e}")
+
+    if words[0] == "tt":
+        words = words[1:]
+    if not words:
+        return None
+
+    name = words[0]
+    if name not in OPERATIONS:
+        raise OperationError(f"Unknown operation: {name}")
+
+    op: dict[str, Any] = {"op": name}
+    positional = []
+    i = 1
+    while i < len(words):
+        word = words[i]
+        if word.startswith("-") and len(word) > 1 and not word[1:].isdigit():
+            # Support both "--notes text" and "--notes=text"
+            flag, _, inline_value = word.partition("=")
+            key = _OPTIONS.get(flag)
+            if key is None:
+                raise OperationError(f"Unknown option: {flag}")
+            if inline_value:
+                value = inline_value
+            elif i + 1 < len(words):
+                i += 1
+                value = words[i]
+            else:
+                raise OperationError(f"Option {flag} needs a value")
+            if key in _LIST_OPTIONS:
+                op.setdefault(key, []).append(value)
+            else:
+                op[key] = value
+        else:
+            positional.append(word)
+        i += 1
+
+    slots = OPERATIONS[name]
+    if len(positional) > len(slots):
+        raise OperationError(f"Too many arguments for {name}")
+    for slot, value in zip(slots, positional):
+        op[slot.rstrip("?")] = value
+
+    return op
+
+
+def execute(op: dict[str, Any]) -> dict[str, Any]:
+    """
+    Apply one operation to the database.
+
+    Args:
+        op: Operation dict (see module docstring)
+
+    Returns:
+        Result dict with "op", "project", "session_id", "duration_seconds"
+        and a human-readable "message" (unused keys are None)
+
+    Raises:
+        OperationError: If the operation is malformed or can't be applied
+    """
+    name = op.get("op")
+    if name not in OPERATIONS:
+        raise OperationError(f"Unknown operation: {name}")
+
+    for slot in OPERATIONS[name]:
+        if not slot.endswith("?") and not op.get(slot):
+            raise OperationError(f"{name} needs a {slot}")
+    for key in _TEXT_KEYS:
+        if op.get(key) is not None and not isinstance(op[key], str):
+            raise OperationError(f"{key} must be a string: {op[key]!r}")
+
+    handler = _HANDLERS[name]
+    return handler(op)
+
+
+# =============================================================================
+# HANDLERS
+# =============================================================================
+
+def _result(name: str, message: str, session: Optional[Session] = None, project: Optional[str] = None) -> dict[str, Any]:
+    """Build a result dict, filling session fields if given."""
+    return {
+        "op": name,
+        "project": session.project_name if session else project,
+        "session_id": session.id if session else None,
+        "duration_seconds": session.duration_seconds if session else None,
+        "message": message,
+    }
+
+
+def _active_for(project: Optional[str]) -> Session:
+    """Find the active session for a project (or the most recent one)."""
+    session = db.get_active_session_by_project(project) if project else db.get_active_session()
+    if session is None:
+        raise OperationError(f"No active session for {project}" if project else "No active session")
+    return session
+
+
+def _start(op):
+    project = op["project"]
+    if db.get_active_session_by_project(project):
+        raise OperationError(f"{project} is already being tracked")
+    session = db.start_session(project)
+    return _result("start", f"Started tracking {project}", session)
+
+
+def _stop(op):
+    project = op.get("project")
+    session = db.stop_session(project_name=project, notes=op.get("notes") or "")
+    if session is None:
+        raise OperationError(f"No active session for {project}" if project else "No active session to stop")
+    return _result("stop", f"Stopped {session.project_name} — {session.format_duration()}", session)
+
+
+def _stopall(op):
+    stopped = db.stop_all_sessions(notes=op.get("notes") or "")
+    return _result("stopall", f"Stopped {len(stopped)} session(s)")
+
+
+def _switch(op):
+    project = op["project"]
+    try:
+        _, session = db.switch_session(project, from_project=op.get("from"), notes=op.get("notes") or "")
+    except ValueError as e:
+        raise OperationError(str(e))
+    return _result("switch", f"Switched to {project}", session)
+
+
+def _log(op):
+    project = op["project"]
+    duration = op["duration"]
+    if isinstance(duration, (int, float)) and not isinstance(duration, bool):
+        # JSON operations may give a plain number of seconds
+        if not math.isfinite(duration):
+            raise OperationError(f"Invalid duration: {duration}")
+        try:
+            td = timedelta(seconds=duration)
+        except OverflowError:
+            raise OperationError(f"Duration too long: {duration}")
+    elif not isinstance(duration, str):
+        raise OperationError(f"Invalid duration format: {duration!r}")
+    else:
+        try:
+            td = parse_duration_string(duration)
+        except Exception:
+            raise OperationError(f"Invalid duration format: {duration}")
+    if td.total_seconds() <= 0:
+        raise OperationError(f"Duration must be positive: {duration}")
+
+    end_time = None
+    date = op.get("date")
+    if date is not None:
+        if not isinstance(date, str):
+            raise OperationError(f"Invalid date format: {date!r} (use YYYY-MM-DD)")
+        try:
+            # A date ends the session at 5 PM, like `tt log --date`
+            end_time = datetime.strptime(date, "%Y-%m-%d").replace(hour=17)
+        except ValueError:
+            raise OperationError(f"Invalid date format: {date} (use YYYY-MM-DD)")
+
+    try:
+        (end_time or datetime.now()) - td
+    except OverflowError:
+        raise OperationError(f"Duration too long: {duration}")
+
+    session = db.log_session(project_name=project, duration=td, notes=op.get("notes") or "", date=end_time)
+    return _result("log", f"Logged {session.format_duration()} for {project}", session)
+
+
+def _pause(op):
+    session = _active_for(op.get("project"))
+    paused = db.pause_session(session.id)
+    return _result("pause", f"Paused {paused.project_name}", paused)
+
+
+def _resume(op):
+    session = _active_for(op.get("project"))
+    resumed = db.resume_session(session.id)
+    return _result("resume", f"Resumed {resumed.project_name}", resumed)
+
+
+def _cancel(op):
+    session = _active_for(op.get("project"))
+    db.delete_session(session.id)
+    return _result("cancel", f"Cancelled session for {session.project_name}", project=session.project_name)
+
+
+def _tag_names(op, key: str) -> list[str]:
+    """Tag names under "add" or "remove": a list, or one name as a string."""
+    value = op.get(key) or []
+    if isinstance(value, str):
+        return [value]
+    if not isinstance(value, list) or not all(isinstance(name, str) for name in value):
+        raise OperationError(f"tag {key} must be a tag name or a list of them")
+    return value
+
+
+def _tag(op):
+    project = db.get_project(op["project"])
+    if project is None:
+        raise OperationError(f"Project {op['project']} not found")
+    to_add = _tag_names(op, "add")
+    to_remove = _tag_names(op, "remove")
+    for tag_name in to_add:
+        db.add_tag_to_project(project.id, tag_name)
+    for tag_name in to_remove:
+        db.remove_tag_from_project(project.id, tag_name)
+    tags = db.get_project_tags(project.id)
+    return _result("tag", f"{project.name} tags: {', '.join(tags) if tags else 'none'}", project=project.name)
+
+
+def _priority(op):
+    level = op["level"]
+    if isinstance(level, float) and level.is_integer():
+        level = int(level)
+    if isinstance(level, bool) or not isinstance(level, (int, str)):
+        raise OperationError(f"Invalid priority: {level!r}")
+    try:
+        level = int(level)
+    except ValueError:
+        raise OperationError(f"Invalid priority: {level}")
+    try:
+        project = db.update_project_priority(op["project"], level)
+    except ValueError as e:
+        raise OperationError(str(e))
+    if project is None:
+        raise OperationError(f"Project {op['project']} not found")
+    return _result("priority", f"Set {project.name} priority to {level}", project=project.name)
+
+
+_HANDLERS = {
+    "start": _start,
+    "stop": _stop,
+    "stopall": _stopall,
+    "switch": _switch,
+    "log": _log,
+    "pause": _pause,
+    "resume": _resume,
+    "cancel": _cancel,
+    "tag": _tag,
+    "priority": _priority,
+}
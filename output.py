@@ -0,0 +1,104 @@
+"""
+output.py - Machine-readable output for the CLI
+
+Writes rows as JSON, NDJSON or TSV directly to stdout, one row at a time.
+This module deliberately imports nothing but the standard library so the
+machine output modes never pay for importing Rich.
+
+Formats:
+- json:   A single JSON array of objects (streamed, not built in memory)
+- ndjson: One JSON object per line, easy to consume with jq or line readers
+- tsv:    A header line, then tab-separated values; tabs, newlines and
+          backslashes inside values are escaped as \t, \n and \\
+"""
+
+import json
+import sys
+from typing import Any, Iterable, Optional, TextIO
+
+
+# Output formats accepted by the CLI ("table" is the Rich default)
+FORMAT_TABLE = "table"
+FORMAT_JSON = "json"
+FORMAT_NDJSON = "ndjson"
+FORMAT_TSV = "tsv"
+MACHINE_FORMATS = (FORMAT_JSON, FORMAT_NDJSON, FORMAT_TSV)
+
+
+class RowWriter:
+    """
+    Streams dict rows to a text stream in one machine format.
+
+    Usage:
+        writer = RowWriter("tsv", ["project", "seconds"])
+        for row in rows:
+            writer.write(row)
+        writer.close()
+    """
+
+    def __init__(self, fmt: str, columns: list[str], stream: Optional[TextIO] = None):
+        if fmt not in MACHINE_FORMATS:
+            raise ValueError(f"Unknown output format: {fmt}")
+        self.fmt = fmt
+        self.columns = columns
+        self.stream = stream or sys.stdout
+        self.count = 0
+
+        if fmt == FORMAT_JSON:
+            self.stream.write("[")
+        elif fmt == FORMAT_TSV:
+            self.stream.write("\t".join(columns) + "\n")
+
+    def write(self, row: dict[str, Any]):
+        """Write one row (keys not in columns are ignored)."""
+        if self.fmt == FORMAT_TSV:
+            self.stream.write("\t".join(_tsv_value(row.get(c)) for c in self.columns) + "\n")
+        else:
+            text = json.dumps({c: row.get(c) for c in self.columns}, ensure_ascii=False)
+            if self.fmt == FORMAT_JSON:
+                self.stream.write(("," if self.count else "") + "\n" + text)
+            else:
+                self.stream.write(text + "\n")
+        self.count += 1
+
+    def close(self):
+        """Finish the output (closes the JSON array)."""
+        if self.fmt == FORMAT_JSON:
+            self.stream.write("\n]\n" if self.count else "]\n")
+        self.stream.flush()
+
+
+def write_rows(fmt: str, columns: list[str], rows: Iterable[dict[str, Any]]) -> int:
+    """
+    Stream an iterable of dict rows to stdout.
+
+    Args:
+        fmt: One of MACHINE_FORMATS
+        columns: Keys to output, in order
+        rows: Rows to write (consumed lazily)
+
+    Returns:
+        Number of rows written
+    """
+    writer = RowWriter(fmt, columns)
+    for row in rows:
+        writer.write(row)
+    writer.close()
+    return writer.count
+
+
+def _tsv_value(value: Any) -> str:
+    """Render a single TSV cell."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (list, tuple)):
+        value = ",".join(str(v) for v in value)
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
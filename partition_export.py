@@ -0,0 +1,352 @@
+"""
+partition_export.py - Export sessions as one CSV file per month, project or tag
+
+`tt export --partition-by month` writes 2024-01.csv, 2024-02.csv, ... into
+a folder, plus a manifest.json listing every file with its row count,
+total time and checksum, so whoever receives the folder can check it's
+complete.
+
+Partitions are exported in worker processes, each on its own read-only
+connection, with a range query the sessions indexes can answer (start_time
+for months, project_name for projects and tags). On a multi-year database
+the files are written about as fast as the machine has cores, rather than
+one after another.
+
+The CSV columns are the same as `tt export` (db.export_sessions_csv).
+"""
+
+import csv
+import hashlib
+import io
+import json
+import os
+import re
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import db
+from filters import Filter
+
+
+PARTITION_BY = ("month", "project", "tag")
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_FORMAT = "derby-export-manifest"
+MANIFEST_VERSION = 1
+
+# Partition for sessions of projects without any tags (like get_summary_by_tag)
+UNTAGGED = "Untagged"
+
+CSV_HEADER = [
+    "Project",
+    "Start Time",
+    "End Time",
+    "Duration (seconds)",
+    "Duration (hours)",
+    "Notes"
+]
+
+
+# =============================================================================
+# WORKER (runs in a child process)
+# =============================================================================
+
+def export_partition(sources: list[str], where: str, params: list, path: str) -> dict:
+    """
+    Write one partition's completed sessions to a CSV file.
+
+    Runs in a worker process, so it takes and returns only plain,
+    picklable values.
+
+    Args:
+        sources: Database files to read: the main database, then any
+                 archives that may hold sessions for this partition
+        where: SQL condition selecting the partition's sessions
+        params: Parameters for the condition
+        path: CSV file to write (not created if the partition is empty)
+
+    Returns:
+        {"rows", "seconds", "sha256"}
+    """
+    # mode=ro: never create, migrate or lock anything for writing
+    conn = sqlite3.connect(f"{Path(sources[0]).resolve().as_uri()}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    try:
+        schemas = ["main"]
+        for i, archive in enumerate(sources[1:]):
+            conn.execute(f"ATTACH DATABASE ? AS archive_{i}", (f"{Path(archive).resolve().as_uri()}?mode=ro",))
+            schemas.append(f"archive_{i}")
+
+        # The condition goes inside each part so every file uses its own index
+        query = " UNION ALL ".join(
+            f"""
+            SELECT project_name, start_time, end_time, notes,
+                   (strftime('%s', end_time) - strftime('%s', start_time)) as duration_seconds
+            FROM {schema}.sessions
+            WHERE end_time IS NOT NULL AND ({where})
+            """
+            for schema in schemas
+        ) + " ORDER BY start_time"
+        rows = conn.execute(query, params * len(schemas)).fetchall()
+    finally:
+        conn.close()
+
+    if not rows:
+        return {"rows": 0, "seconds": 0, "sha256": None}
+
+    buffer = io.StringIO(newline="")
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_HEADER)
+    total = 0
+    for row in rows:
+        secs = int(row["duration_seconds"])
+        total += secs
+        writer.writerow([
+            row["project_name"],
+            row["start_time"],
+            row["end_time"],
+            secs,
+            round(secs / 3600, 2),
+            row["notes"]
+        ])
+
+    data = buffer.getvalue().encode("utf-8")
+    Path(path).write_bytes(data)
+    return {"rows": len(rows), "seconds": total, "sha256": hashlib.sha256(data).hexdigest()}
+
+
+# =============================================================================
+# PLANNING
+# =============================================================================
+
+def _range_condition(start_date: Optional[datetime], end_date: Optional[datetime]) -> tuple[str, list]:
+    conditions, params = [], []
+    if start_date:
+        conditions.append("start_time >= ?")
+        params.append(start_date.isoformat())
+    if end_date:
+        conditions.append("start_time < ?")
+        params.append(end_date.isoformat())
+    return " AND ".join(conditions) or "1", params
+
+
+def _file_name(label: str, used: set[str]) -> str:
+    """A safe, unique file name for a partition label."""
+    stem = re.sub(r"[^\w.-]+", "_", label).strip("._") or "partition"
+    name = f"{stem}.csv"
+    counter = 2
+    while name.lower() in used:
+        name = f"{stem}-{counter}.csv"
+        counter += 1
+    used.add(name.lower())
+    return name
+
+
+def _month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+
+def _next_month(value: datetime) -> datetime:
+    return datetime(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+
+def plan_partitions(
+    partition_by: str,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    filter_by: Optional[Filter] = None
+) -> list[dict]:
+    """
+    Split the sessions in a date range (and filter) into partitions.
+
+    Returns:
+        [{"partition": label, "sources": [db paths], "where": sql, "params": [...]}]
+
+    Raises:
+        ValueError: If partition_by isn't one of PARTITION_BY
+    """
+    if partition_by not in PARTITION_BY:
+        raise ValueError(f"Unknown partition: {partition_by} (use {', '.join(PARTITION_BY)})")
+
+    range_where, range_params = _range_condition(start_date, end_date)
+    if filter_by:
+        filter_sql, filter_params = filter_by.sessions_sql()
+        range_where = f"{range_where} AND ({filter_sql})"
+        range_params = range_params + filter_params
+    main_path = str(db.DATABASE_PATH)
+
+    with db.get_connection() as conn:
+        source = db._sessions_source(conn, start_date, end_date)
+        archives = {
+            year: str(db.get_archive_path(year))
+            for year in db.list_archive_years()
+            if (end_date is None or datetime(year, 1, 1) < end_date)
+            and (start_date is None or datetime(year + 1, 1, 1) > start_date)
+        }
+
+        if partition_by == "month":
+            row = conn.execute(f"""
+                SELECT MIN(start_time), MAX(start_time) FROM {source}
+                WHERE end_time IS NOT NULL AND {range_where}
+            """, range_params).fetchone()
+            if row[0] is None:
+                return []
+
+            partitions = []
+            month = _month_start(datetime.fromisoformat(row[0]))
+            last = datetime.fromisoformat(row[1])
+            while month <= last:
+                following = _next_month(month)
+                lower = max(month, start_date) if start_date else month
+                upper = min(following, end_date) if end_date else following
+                sources = [main_path]
+                if month.year in archives:
+                    sources.append(archives[month.year])
+                partitions.append({
+                    "partition": month.strftime("%Y-%m"),
+                    "sources": sources,
+                    "where": f"start_time >= ? AND start_time < ? AND {range_where}",
+                    "params": [lower.isoformat(), upper.isoformat()] + range_params,
+                })
+                month = following
+            return partitions
+
+        sources = [main_path] + list(archives.values())
+        names = [
+            row[0] for row in conn.execute(f"""
+                SELECT DISTINCT project_name FROM {source}
+                WHERE end_time IS NOT NULL AND {range_where}
+                ORDER BY project_name
+            """, range_params)
+        ]
+
+        if partition_by == "project":
+            return [
+                {
+                    "partition": name,
+                    "sources": sources,
+                    "where": f"project_name = ? AND {range_where}",
+                    "params": [name] + range_params,
+                }
+                for name in names
+            ]
+
+        # Tags: a project counts under each of its tags
+        by_tag: dict[str, list[str]] = {}
+        tagged = set()
+        for row in conn.execute("""
+            SELECT t.name as tag_name, p.name as project_name
+            FROM project_tags pt
+            JOIN projects p ON pt.project_id = p.id
+            JOIN tags t ON pt.tag_id = t.id
+            ORDER BY t.name, p.name
+        """):
+            if row["project_name"] in names:
+                by_tag.setdefault(row["tag_name"], []).append(row["project_name"])
+                tagged.add(row["project_name"])
+        untagged = [name for name in names if name not in tagged]
+        if untagged:
+            by_tag.setdefault(UNTAGGED, []).extend(untagged)
+
+    return [
+        {
+            "partition": tag_name,
+            "sources": sources,
+            "where": f"project_name IN ({', '.join('?' * len(projects))}) AND {range_where}",
+            "params": projects + range_params,
+        }
+        for tag_name, projects in by_tag.items()
+    ]
+
+
+# =============================================================================
+# EXPORT
+# =============================================================================
+
+def export_partitioned(
+    output_dir: Path,
+    partition_by: str,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    max_workers: Optional[int] = None,
+    filter_by: Optional[Filter] = None
+) -> dict:
+    """
+    Export sessions to one CSV file per partition, plus manifest.json.
+
+    Args:
+        output_dir: Folder for the files (created if needed)
+        partition_by: "month", "project" or "tag"
+        start_date: Export sessions starting on or after this time
+        end_date: Export sessions starting before this time
+        max_workers: Worker processes (default: one per CPU, at most one
+                     per partition)
+        filter_by: Only export sessions matching this filter
+
+    Returns:
+        The manifest: {"format", "version", "created_at", "partition_by",
+                       "start", "end", "rows", "seconds",
+                       "files": [{"file", "partition", "rows", "seconds", "sha256"}]}
+
+    Raises:
+        ValueError: If partition_by isn't one of PARTITION_BY
+    """
+    partitions = plan_partitions(partition_by, start_date, end_date, filter_by)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    used = {MANIFEST_NAME}
+    for partition in partitions:
+        partition["file"] = _file_name(partition["partition"], used)
+
+    def job(partition):
+        return (
+            partition["sources"],
+            partition["where"],
+            partition["params"],
+            str(output_dir / partition["file"])
+        )
+
+    results: dict[str, dict] = {}
+    if len(partitions) <= 1:
+        # Starting a process would cost more than it saves
+        for partition in partitions:
+            results[partition["file"]] = export_partition(*job(partition))
+    else:
+        workers = min(len(partitions), max_workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(export_partition, *job(p)): p["file"] for p in partitions}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+
+    files = []
+    for partition in partitions:
+        result = results[partition["file"]]
+        if result["rows"]:
+            files.append({
+                "file": partition["file"],
+                "partition": partition["partition"],
+                "rows": result["rows"],
+                "seconds": result["seconds"],
+                "sha256": result["sha256"],
+            })
+
+    manifest = {
+        "format": MANIFEST_FORMAT,
+        "version": MANIFEST_VERSION,
+        "created_at": datetime.now().isoformat(),
+        "partition_by": partition_by,
+        "start": start_date.isoformat() if start_date else None,
+        "end": end_date.isoformat() if end_date else None,
+        "filter": filter_by.text if filter_by else None,
+        # Tag partitions overlap (a project can have several tags), so
+        # these are totals of the files, not of distinct sessions
+        "rows": sum(f["rows"] for f in files),
+        "seconds": sum(f["seconds"] for f in files),
+        "files": files,
+    }
+    with open(output_dir / MANIFEST_NAME, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
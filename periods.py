@@ -0,0 +1,100 @@
+"""
+periods.py - Named reporting periods ("today", "week", ...)
+
+Turns the period names used by `tt summary` and the reporting API into
+datetime ranges. Ranges are half-open: the start is included and the end
+is not, matching how db.py filters sessions by start_time.
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+
+# Period names accepted by resolve_period()
+PERIODS = ("today", "week", "all")
+
+
+def get_today_range() -> tuple[datetime, datetime]:
+    """
+    Get datetime range for "today" (midnight to midnight).
+    
+    Returns:
+        Tuple of (start_of_today, start_of_tomorrow)
+        
+    Using start of tomorrow as the end bound makes the range exclusive,
+    which is standard for date ranges and avoids off-by-one issues.
+    """
+    now = datetime.now()
+    
+    # replace() creates a copy with some fields changed
+    # Setting hour/minute/second/microsecond to 0 gives midnight
+    start_of_today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    
+    # Add one day to get tomorrow's midnight
+    start_of_tomorrow = start_of_today + timedelta(days=1)
+    
+    return start_of_today, start_of_tomorrow
+
+
+def get_week_range() -> tuple[datetime, datetime]:
+    """
+    Get datetime range for "this week" (Monday to Sunday).
+    
+    weekday() returns 0 for Monday, 6 for Sunday.
+    """
+    now = datetime.now()
+    start_of_today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    
+    # Go back to Monday by subtracting the weekday number
+    start_of_week = start_of_today - timedelta(days=now.weekday())
+    
+    # Week ends 7 days after it starts
+    end_of_week = start_of_week + timedelta(days=7)
+    
+    return start_of_week, end_of_week
+
+
+def get_month_range(month: Optional[str] = None) -> tuple[datetime, datetime]:
+    """
+    Get datetime range for a calendar month.
+
+    Args:
+        month: "YYYY-MM", or None for the current month
+
+    Raises:
+        ValueError: If month isn't YYYY-MM
+    """
+    if month is None:
+        start_of_month = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    else:
+        try:
+            start_of_month = datetime.strptime(month, "%Y-%m")
+        except ValueError:
+            raise ValueError(f"Invalid month: {month} (use YYYY-MM)")
+
+    # Day 28 + 4 days is always in the next month
+    next_month = (start_of_month.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start_of_month, next_month
+
+
+def resolve_period(period: str) -> tuple[Optional[datetime], Optional[datetime]]:
+    """
+    Get the datetime range for a period name.
+
+    Args:
+        period: One of PERIODS (case-insensitive)
+
+    Returns:
+        (start, end); both None for "all"
+
+    Raises:
+        ValueError: If the period name is unknown
+    """
+    name = period.lower()
+    if name == "today":
+        return get_today_range()
+    if name == "week":
+        return get_week_range()
+    if name == "all":
+        return None, None
+    raise ValueError(f"Unknown period: {period} (use {', '.join(PERIODS)})")
@@ -10,7 +10,6 @@ import customtkinter as ctk
 
 import db
 import themes
-from themes import FONT_FAMILY
 from dialogs import CTkMessagebox
 from gui_utils import batch_update
 
@@ -51,7 +50,7 @@ class ProjectsTab:
         top_frame = ctk.CTkFrame(main_frame, fg_color=themes.get_colors()["container_bg"])
         top_frame.pack(fill=ctk.BOTH, expand=True, pady=(0, 5))
 
-        ctk.CTkLabel(top_frame, text="Projects", font=ctk.CTkFont(family=FONT_FAMILY, weight="bold")).pack(anchor="w", padx=10, pady=5)
+        ctk.CTkLabel(top_frame, text="Projects", font=themes.get_font(weight="bold")).pack(anchor="w", padx=10, pady=5)
 
         self.tree_frame = TreeviewFrame(
             top_frame,
@@ -88,7 +87,7 @@ class ProjectsTab:
         bottom_frame = ctk.CTkFrame(main_frame, fg_color=themes.get_colors()["container_bg"])
         bottom_frame.pack(fill=ctk.BOTH, expand=True, pady=(5, 0))
 
-        ctk.CTkLabel(bottom_frame, text="Background Tasks", font=ctk.CTkFont(family=FONT_FAMILY, weight="bold")).pack(anchor="w", padx=10, pady=5)
+        ctk.CTkLabel(bottom_frame, text="Background Tasks", font=themes.get_font(weight="bold")).pack(anchor="w", padx=10, pady=5)
 
         self.bg_tree_frame = TreeviewFrame(
             bottom_frame,
@@ -637,7 +636,7 @@ class DeleteProjectDialog:
             main_frame,
             text="(If unchecked, sessions will be kept but become orphaned)",
             text_color=themes.get_colors()["text_secondary"],
-            font=ctk.CTkFont(size=11)
+            font=themes.get_font(11, family=None)
         ).pack()
 
         # Buttons
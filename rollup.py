@@ -0,0 +1,289 @@
+"""
+rollup.py - Combined summaries across many Derby databases (`tt rollup`)
+
+Everyone keeps their own timetrack.db. A rollup reads a whole folder of
+them (say, one copied in from each person) and adds up time per project,
+per tag and per day.
+
+Each database is summarized in its own worker process, so a rollup of
+many files takes about as long as the slowest few of them on a machine
+with enough cores, rather than the sum of all of them. Workers send back
+small dicts of totals, which are merged here.
+
+Databases are opened read-only: a rollup never migrates, splits or
+otherwise changes anyone's file. Years a person has moved out with
+`tt archive` are read from the timetrack_archive_<year>.db files next to
+their database, so copy each person's data folder, archives included.
+"""
+
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Optional
+
+
+# Tag used for projects without any tags (same as get_summary_by_tag)
+UNTAGGED = "Untagged"
+
+# Yearly archives next to a database (db.ARCHIVE_PREFIX): read together
+# with it, as the same person's sessions
+ARCHIVE_PREFIX = "timetrack_archive_"
+
+# Files in a data folder that aren't anyone's database: archives (read
+# with their database) and backups (db.backup_database, copies of it)
+SKIPPED_PREFIXES = (ARCHIVE_PREFIX, "timetrack_backup_")
+
+
+def find_databases(paths: Iterable[Path]) -> list[Path]:
+    """
+    Expand files and folders into a list of database files.
+
+    Folders are searched recursively for *.db files, leaving out archive
+    and backup files (see SKIPPED_PREFIXES); files given by name are used
+    as they are, except archives, which only count with the database
+    next to them. Each file is listed once, however many of the given
+    paths lead to it.
+    """
+    found: dict[Path, Path] = {}
+    for path in paths:
+        if path.is_dir():
+            candidates = [
+                candidate for candidate in sorted(path.rglob("*.db"))
+                if not candidate.name.startswith(SKIPPED_PREFIXES)
+            ]
+        elif path.name.startswith(ARCHIVE_PREFIX):
+            candidates = []  # Read with the database next to it
+        else:
+            candidates = [path]
+        for candidate in candidates:
+            found.setdefault(candidate.resolve(), candidate)
+    return list(found.values())
+
+
+def find_archives(path: Path, start_date: Optional[datetime], end_date: Optional[datetime]) -> list[Path]:
+    """
+    Archive files next to a database that may hold sessions in a range.
+
+    Like db._attach_archives, for a database that isn't the current one.
+    """
+    archives = []
+    for archive in sorted(path.parent.glob(f"{ARCHIVE_PREFIX}*.db")):
+        suffix = archive.stem[len(ARCHIVE_PREFIX):]
+        if not suffix.isdigit():
+            continue
+        year = int(suffix)
+        if ((end_date is None or datetime(year, 1, 1) < end_date)
+                and (start_date is None or datetime(year + 1, 1, 1) > start_date)):
+            archives.append(archive)
+    return archives
+
+
+# =============================================================================
+# WORKER (runs in a child process)
+# =============================================================================
+
+def summarize_database(sources: list[str], start_iso: Optional[str], end_iso: Optional[str]) -> dict:
+    """
+    Totals for one database file and its archives.
+
+    Runs in a worker process, so it takes and returns only plain,
+    picklable values (ISO strings rather than datetimes).
+
+    Args:
+        sources: The database file, then any archives of it to include
+        start_iso: Count sessions starting on or after this time
+        end_iso: Count sessions starting before this time
+
+    Returns:
+        {"projects": {name: {"priority", "is_background", "days": {date: seconds}, "total"}},
+         "tags": {name: [tag, ...]}}
+
+    Raises:
+        ValueError: If the file isn't a readable Derby database
+    """
+    # mode=ro: fail rather than create a missing file, and never write
+    try:
+        conn = sqlite3.connect(f"{Path(sources[0]).resolve().as_uri()}?mode=ro", uri=True)
+    except sqlite3.Error as e:
+        raise ValueError(f"Can't open database: {e}")
+    conn.row_factory = sqlite3.Row
+    try:
+        schemas = ["main"]
+        for i, archive in enumerate(sources[1:]):
+            conn.execute(f"ATTACH DATABASE ? AS archive_{i}", (f"{Path(archive).resolve().as_uri()}?mode=ro",))
+            schemas.append(f"archive_{i}")
+
+        # The range goes inside each part so every file uses its own index
+        where = "end_time IS NOT NULL"
+        range_params: list = []
+        if start_iso:
+            where += " AND start_time >= ?"
+            range_params.append(start_iso)
+        if end_iso:
+            where += " AND start_time < ?"
+            range_params.append(end_iso)
+        union = " UNION ALL ".join(
+            f"SELECT project_name, start_time, end_time FROM {schema}.sessions WHERE {where}"
+            for schema in schemas
+        )
+
+        query = f"""
+            SELECT
+                s.project_name,
+                COALESCE(p.priority, 3) as priority,
+                COALESCE(p.is_background, 0) as is_background,
+                date(s.start_time) as session_date,
+                SUM(
+                    strftime('%s', s.end_time) - strftime('%s', s.start_time)
+                ) as total_seconds
+            FROM ({union}) s
+            LEFT JOIN projects p ON s.project_name = p.name
+            GROUP BY s.project_name, date(s.start_time)
+        """
+
+        projects: dict[str, dict] = {}
+        for row in conn.execute(query, range_params * len(schemas)):
+            info = projects.setdefault(row["project_name"], {
+                "priority": row["priority"],
+                "is_background": bool(row["is_background"]),
+                "days": {},
+                "total": 0
+            })
+            seconds = int(row["total_seconds"])
+            info["days"][row["session_date"]] = seconds
+            info["total"] += seconds
+
+        tags: dict[str, list[str]] = {}
+        for row in conn.execute("""
+            SELECT p.name as project_name, t.name as tag_name
+            FROM project_tags pt
+            JOIN projects p ON pt.project_id = p.id
+            JOIN tags t ON pt.tag_id = t.id
+            ORDER BY t.name
+        """):
+            if row["project_name"] in projects:
+                tags.setdefault(row["project_name"], []).append(row["tag_name"])
+    except sqlite3.DatabaseError as e:
+        # Not SQLite, or a file from before priorities/tags existed
+        raise ValueError(f"Not a readable Derby database: {e}")
+    finally:
+        conn.close()
+
+    return {"projects": projects, "tags": tags}
+
+
+# =============================================================================
+# MERGING
+# =============================================================================
+
+def _merge(partials: list[dict]) -> dict:
+    """Add up per-database totals into one rollup."""
+    projects: dict[str, dict] = {}
+    tags: dict[str, dict] = {}
+    days: dict[str, int] = {}
+
+    for partial in partials:
+        for name, info in partial["projects"].items():
+            merged = projects.setdefault(name, {
+                "priority": info["priority"],
+                "is_background": info["is_background"],
+                "days": {},
+                "total": 0,
+                "people": 0
+            })
+            # People may rank the same project differently; show the most urgent
+            merged["priority"] = min(merged["priority"], info["priority"])
+            merged["is_background"] = merged["is_background"] and info["is_background"]
+            merged["total"] += info["total"]
+            merged["people"] += 1
+            for day, seconds in info["days"].items():
+                merged["days"][day] = merged["days"].get(day, 0) + seconds
+                days[day] = days.get(day, 0) + seconds
+
+            # Like get_summary_by_tag, a project counts under each of its tags
+            for tag_name in partial["tags"].get(name) or [UNTAGGED]:
+                tag = tags.setdefault(tag_name, {"projects": {}, "days": {}, "total": 0})
+                tag["projects"][name] = tag["projects"].get(name, 0) + info["total"]
+                tag["total"] += info["total"]
+                for day, seconds in info["days"].items():
+                    tag["days"][day] = tag["days"].get(day, 0) + seconds
+
+    return {
+        # Sort by priority ASC, then total DESC (like the single-user summaries)
+        "projects": dict(sorted(projects.items(), key=lambda x: (x[1]["priority"], -x[1]["total"]))),
+        # Alphabetical with Untagged last, like get_summary_by_tag
+        "tags": dict(sorted(tags.items(), key=lambda x: (x[0] == UNTAGGED, x[0].lower()))),
+        "days": dict(sorted(days.items())),
+    }
+
+
+def rollup(
+    paths: list[Path],
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    max_workers: Optional[int] = None
+) -> dict:
+    """
+    Summarize many databases, one worker process per file.
+
+    Each database is read together with its archives (see find_archives).
+
+    Args:
+        paths: Database files (see find_databases)
+        start_date: Count sessions starting on or after this time
+        end_date: Count sessions starting before this time
+        max_workers: Worker processes (default: one per CPU, at most one
+                     per database)
+
+    Returns:
+        {"projects": {name: {"priority", "is_background", "days", "total", "people"}},
+         "tags": {name: {"projects": {name: seconds}, "days", "total"}},
+         "days": {date: seconds},
+         "databases": [paths summarized],
+         "errors": {path: message}}
+    """
+    start_iso = start_date.isoformat() if start_date else None
+    end_iso = end_date.isoformat() if end_date else None
+
+    partials = []
+    summarized = []
+    errors: dict[str, str] = {}
+
+    def collect(path: Path, result=None, error: Optional[Exception] = None):
+        if error is not None:
+            errors[str(path)] = str(error)
+        else:
+            partials.append(result)
+            summarized.append(str(path))
+
+    sources = {
+        path: [str(path)] + [str(archive) for archive in find_archives(path, start_date, end_date)]
+        for path in paths
+    }
+
+    if len(paths) <= 1:
+        # Starting a process would cost more than it saves
+        for path in paths:
+            try:
+                collect(path, summarize_database(sources[path], start_iso, end_iso))
+            except (ValueError, OSError) as e:
+                collect(path, error=e)
+    else:
+        workers = min(len(paths), max_workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(summarize_database, sources[path], start_iso, end_iso): path
+                for path in paths
+            }
+            for future in as_completed(futures):
+                try:
+                    collect(futures[future], future.result())
+                except (ValueError, OSError) as e:
+                    collect(futures[future], error=e)
+
+    result = _merge(partials)
+    result["databases"] = sorted(summarized)
+    result["errors"] = errors
+    return result
@@ -12,7 +12,8 @@ from tkinter import ttk
 import db
 import themes
 from ctk_table import CTkTable
-from themes import FONT_FAMILY
+from dialogs import CTkMessagebox
+from filters import FilterError, parse_filter
 from gui_utils import batch_update
 
 if TYPE_CHECKING:
@@ -41,6 +42,12 @@ class SummaryTab:
         self.period_var = ctk.StringVar(value="today")
         self.sort_var = ctk.StringVar(value="priority")
         self.group_var = ctk.BooleanVar(value=False)
+        self.tree_var = ctk.BooleanVar(value=False)
+        # Tree view rows the user has collapsed (kept across refreshes)
+        self._collapsed: set[str] = set()
+        self.filter_var = ctk.StringVar(value="")
+        # Parsed filter_var, applied to every summary query (None = everything)
+        self.filter = None
         self.current_view = "standard"  # "standard", "weekly", or "monthly"
         self.bg_current_view = "standard"  # Track bg table view separately
         self._tables_initialized = False  # Track if tables have been created
@@ -92,6 +99,21 @@ class SummaryTab:
         )
         group_check.pack(side=ctk.RIGHT, padx=10)
 
+        # Project hierarchy with subtotals (see db.set_project_parent)
+        tree_check = ctk.CTkCheckBox(
+            sort_frame,
+            text="Tree?",
+            variable=self.tree_var,
+            command=self.refresh
+        )
+        tree_check.pack(side=ctk.RIGHT, padx=10)
+
+        # Filter expression (see filters.py), applied with Enter
+        filter_entry = ctk.CTkEntry(sort_frame, textvariable=self.filter_var, width=260)
+        filter_entry.pack(side=ctk.RIGHT, padx=5)
+        filter_entry.bind("<Return>", lambda _: self.refresh())
+        ctk.CTkLabel(sort_frame, text="Filter:").pack(side=ctk.RIGHT, padx=(15, 0))
+
         # Main content area - use ttk.PanedWindow for resizable split
         colors = themes.get_colors()
 
@@ -107,7 +129,7 @@ class SummaryTab:
         # =====================================================================
         top_frame = ctk.CTkFrame(self.paned, fg_color=colors["container_bg"])
 
-        ctk.CTkLabel(top_frame, text="Projects", font=ctk.CTkFont(family=FONT_FAMILY, weight="bold")).pack(anchor="w", padx=10, pady=5)
+        ctk.CTkLabel(top_frame, text="Projects", font=themes.get_font(weight="bold")).pack(anchor="w", padx=10, pady=5)
 
         self.table_container = ctk.CTkFrame(top_frame, fg_color="transparent")
         self.table_container.pack(fill=ctk.BOTH, expand=True, padx=10)
@@ -116,10 +138,11 @@ class SummaryTab:
         self.table = None
         self.table_weekly = None
         self.table_monthly = None
+        self.table_tree = None
 
         # Project total label
         self.project_total_var = ctk.StringVar(value="Projects Total: 0h 00m")
-        project_total_label = ctk.CTkLabel(top_frame, textvariable=self.project_total_var, font=ctk.CTkFont(family=FONT_FAMILY, weight="bold"))
+        project_total_label = ctk.CTkLabel(top_frame, textvariable=self.project_total_var, font=themes.get_font(weight="bold"))
         project_total_label.pack(pady=3)
 
         # =====================================================================
@@ -127,7 +150,7 @@ class SummaryTab:
         # =====================================================================
         bottom_frame = ctk.CTkFrame(self.paned, fg_color=colors["container_bg"])
 
-        ctk.CTkLabel(bottom_frame, text="Background Tasks", font=ctk.CTkFont(family=FONT_FAMILY, weight="bold")).pack(anchor="w", padx=10, pady=5)
+        ctk.CTkLabel(bottom_frame, text="Background Tasks", font=themes.get_font(weight="bold")).pack(anchor="w", padx=10, pady=5)
 
         self.bg_table_container = ctk.CTkFrame(bottom_frame, fg_color="transparent")
         self.bg_table_container.pack(fill=ctk.BOTH, expand=True, padx=10)
@@ -139,7 +162,7 @@ class SummaryTab:
 
         # Background tasks total label
         self.bg_total_var = ctk.StringVar(value="Tasks Total: 0h 00m")
-        bg_total_label = ctk.CTkLabel(bottom_frame, textvariable=self.bg_total_var, font=ctk.CTkFont(family=FONT_FAMILY, weight="bold"))
+        bg_total_label = ctk.CTkLabel(bottom_frame, textvariable=self.bg_total_var, font=themes.get_font(weight="bold"))
         bg_total_label.pack(pady=3)
 
         # Add frames to paned window with weight for initial sizing
@@ -148,7 +171,7 @@ class SummaryTab:
 
         # Combined total at bottom
         self.total_var = ctk.StringVar(value="Combined Total: 0h 00m")
-        total_label = ctk.CTkLabel(self.frame, textvariable=self.total_var, font=ctk.CTkFont(family=FONT_FAMILY, size=14, weight="bold"))
+        total_label = ctk.CTkLabel(self.frame, textvariable=self.total_var, font=themes.get_font(14, "bold"))
         total_label.pack(pady=5)
 
     def _initialize_tables(self):
@@ -191,6 +214,20 @@ class SummaryTab:
             show_dividers=show_row_dividers
         )
 
+        # Tree view: projects under their parents, each row showing the
+        # time of its whole subtree (ttk.Treeview does the collapsing)
+        from gui import TreeviewFrame
+        self.table_tree = TreeviewFrame(
+            self.table_container,
+            columns=("own", "total", "hours"),
+            headings=["Own", "Total", "Hours"],
+            widths=[90, 90, 70],
+            height=12,
+            show="tree headings"
+        )
+        self.table_tree.tree.heading("#0", text="Project", anchor="w")
+        self.table_tree.tree.column("#0", width=300)
+
         # =====================================================================
         # BACKGROUND TASK TABLES
         # =====================================================================
@@ -255,6 +292,8 @@ class SummaryTab:
             self.table_weekly.pack_forget()
         if getattr(self, 'table_monthly', None):
             self.table_monthly.pack_forget()
+        if getattr(self, 'table_tree', None):
+            self.table_tree.pack_forget()
 
         # Pack the requested table
         if view == "standard":
@@ -263,6 +302,12 @@ class SummaryTab:
             self.table = self.table_weekly
         elif view == "monthly":
             self.table = self.table_monthly
+        elif view == "tree":
+            # The standard table stays current (hidden) for the totals
+            self.table = self.table_standard
+            self.table_tree.pack(fill=ctk.BOTH, expand=True)
+            self.current_view = view
+            return
 
         if self.table:
             self.table.pack(fill=ctk.BOTH, expand=True)
@@ -367,6 +412,13 @@ class SummaryTab:
         # Update divider settings on all tables (in case setting changed)
         self._update_table_divider_settings()
 
+        filter_text = self.filter_var.get().strip()
+        try:
+            self.filter = parse_filter(filter_text) if filter_text else None
+        except FilterError as e:
+            CTkMessagebox(self.app.root, "Invalid Filter", str(e), "warning")
+            return
+
         period = self.period_var.get()
 
         # Calculate date range
@@ -394,6 +446,14 @@ class SummaryTab:
             days_in_month = calendar.monthrange(start_date.year, start_date.month)[1]
             end_date = start_date + timedelta(days=days_in_month)
 
+        if self.tree_var.get():
+            if self.current_view != "tree":
+                self._show_table_view("tree")
+            if self.bg_current_view != "standard":
+                self._show_bg_table_view("standard")
+            self._refresh_tree(start_date, end_date)
+            return
+
         # Switch view type if needed (show/hide tables instead of destroy/create)
         if period == "week":
             if self.current_view != "weekly":
@@ -457,7 +517,7 @@ class SummaryTab:
 
         if sort_by == "priority":
             # Get project summary (regular projects only)
-            project_summary = db.get_summary_with_priority(start_date=start_date, end_date=end_date, is_background=False)
+            project_summary = db.get_summary_with_priority(start_date=start_date, end_date=end_date, is_background=False, filter_by=self.filter)
 
             if group_by:
                 # Aggregate by priority level
@@ -512,7 +572,7 @@ class SummaryTab:
             if end_date is None:
                 end_date = datetime(2100, 1, 1)
 
-            tag_summary = db.get_summary_by_tag(start_date=start_date, end_date=end_date)
+            tag_summary = db.get_summary_by_tag(start_date=start_date, end_date=end_date, filter_by=self.filter)
 
             if group_by:
                 # Display one row per tag
@@ -565,7 +625,7 @@ class SummaryTab:
                         row_counter += 1
 
         # Get background task summary
-        bg_summary = db.get_summary_with_priority(start_date=start_date, end_date=end_date, is_background=True)
+        bg_summary = db.get_summary_with_priority(start_date=start_date, end_date=end_date, is_background=True, filter_by=self.filter)
 
         # Populate background task table
         bg_total_seconds = 0
@@ -597,6 +657,47 @@ class SummaryTab:
         comb_m = (combined % 3600) // 60
         self.total_var.set(f"Combined Total: {comb_h}h {comb_m:02d}m ({round(combined/3600, 2)} hours)")
 
+    def _refresh_tree(self, start_date, end_date):
+        """Refresh the project hierarchy view (any period)."""
+        # Totals and the background task table are the same as the standard view
+        self._refresh_standard(start_date, end_date)
+
+        tree = self.table_tree.tree
+
+        # Remember what the user collapsed before rebuilding
+        def walk(item):
+            for child in tree.get_children(item):
+                if tree.get_children(child) and not tree.item(child, "open"):
+                    self._collapsed.add(child)
+                elif tree.item(child, "open"):
+                    self._collapsed.discard(child)
+                walk(child)
+        walk("")
+
+        nodes = db.get_summary_tree(
+            start_date=start_date,
+            end_date=end_date,
+            is_background=False,
+            filter_by=self.filter
+        )
+
+        with batch_update(self.table_tree):
+            self.table_tree.clear()
+            for node in nodes:
+                own = node["own_seconds"]
+                total = node["total_seconds"]
+                self.table_tree.insert(
+                    values=(
+                        self._format_time_short(own) if node["has_children"] and own else "",
+                        self._format_time_short(total),
+                        f"{total / 3600:.2f}"
+                    ),
+                    iid=node["name"],
+                    parent=node["parent"] if node["depth"] else "",
+                    text=node["name"],
+                    open=node["name"] not in self._collapsed
+                )
+
     def _refresh_weekly(self, start_date: datetime, end_date: datetime):
         """Refresh with weekly day-by-day view."""
         sort_by = self.sort_var.get()
@@ -648,7 +749,7 @@ class SummaryTab:
 
         if sort_by == "priority":
             # Get per-day summary for projects
-            project_summary = db.get_summary_by_day(start_date=start_date, end_date=end_date, is_background=False)
+            project_summary = db.get_summary_by_day(start_date=start_date, end_date=end_date, is_background=False, filter_by=self.filter)
 
             if group_by:
                 # Aggregate by priority level
@@ -702,7 +803,7 @@ class SummaryTab:
                     row_counter += 1
         else:
             # Tag-based sorting
-            tag_summary = db.get_summary_by_tag(start_date=start_date, end_date=end_date)
+            tag_summary = db.get_summary_by_tag(start_date=start_date, end_date=end_date, filter_by=self.filter)
 
             if group_by:
                 seen_projects = set()
@@ -775,7 +876,7 @@ class SummaryTab:
         self.table.add_row("total_row", ("TOTAL", "", "", *project_daily_total_values, project_total_str), is_total=True)
 
         # Get per-day summary for background tasks
-        bg_summary = db.get_summary_by_day(start_date=start_date, end_date=end_date, is_background=True)
+        bg_summary = db.get_summary_by_day(start_date=start_date, end_date=end_date, is_background=True, filter_by=self.filter)
 
         bg_total_seconds = 0
         bg_daily_totals = [0] * 7
@@ -879,7 +980,7 @@ class SummaryTab:
         row_counter = 0
 
         if sort_by == "priority":
-            project_summary = db.get_summary_by_day(start_date=start_date, end_date=end_date, is_background=False)
+            project_summary = db.get_summary_by_day(start_date=start_date, end_date=end_date, is_background=False, filter_by=self.filter)
 
             if group_by:
                 priority_period_totals: dict[int, list[int]] = {}
@@ -937,7 +1038,7 @@ class SummaryTab:
                     self.table.add_row(f"project_{row_counter}", (project_name, priority_label, tags_str, *period_values, total_str))
                     row_counter += 1
         else:
-            tag_summary = db.get_summary_by_tag(start_date=start_date, end_date=end_date)
+            tag_summary = db.get_summary_by_tag(start_date=start_date, end_date=end_date, filter_by=self.filter)
 
             if group_by:
                 seen_projects = set()
@@ -1019,7 +1120,7 @@ class SummaryTab:
         self.table.add_row("total_row", ("TOTAL", "", "", *project_period_total_values, project_total_str), is_total=True)
 
         # Get per-day summary for background tasks
-        bg_summary = db.get_summary_by_day(start_date=start_date, end_date=end_date, is_background=True)
+        bg_summary = db.get_summary_by_day(start_date=start_date, end_date=end_date, is_background=True, filter_by=self.filter)
 
         bg_total_seconds = 0
         bg_period_totals = [0] * 6
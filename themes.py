@@ -144,6 +144,12 @@ THEMES: dict[str, Theme] = {
 _current_theme: Theme = DARK_THEME
 _theme_change_callbacks: list[Callable[[], None]] = []
 
+# Style registry caches. Widgets used to build a fresh CTkFont (a Tk named
+# font) and a fresh color dict for every label, which adds up quickly in
+# tables with hundreds of cells. Both caches are reset on theme change.
+_font_cache: dict[tuple[Optional[str], Optional[int], str], ctk.CTkFont] = {}
+_colors_cache: Optional[dict[str, str]] = None
+
 
 # =============================================================================
 # PUBLIC API
@@ -159,8 +165,39 @@ def get_colors() -> dict[str, str]:
     Get current theme colors as dictionary.
 
     This provides backward compatibility with the existing COLORS usage.
+    The dictionary is cached until the next theme change, so callers
+    must treat it as read-only.
+    """
+    global _colors_cache
+
+    if _colors_cache is None:
+        _colors_cache = _current_theme.to_dict()
+    return _colors_cache
+
+
+def get_font(size: Optional[int] = None, weight: str = "normal",
+             family: Optional[str] = FONT_FAMILY) -> ctk.CTkFont:
     """
-    return _current_theme.to_dict()
+    Get a shared CTkFont from the style registry.
+
+    Fonts are keyed by (family, size, weight) and created on first use,
+    so every widget asking for the same style shares one Tk named font.
+    Must be called after the root window exists.
+
+    Args:
+        size: Point size (None uses the CustomTkinter default)
+        weight: "normal" or "bold"
+        family: Font family (None uses the CustomTkinter default)
+
+    Returns:
+        The cached CTkFont instance
+    """
+    key = (family, size, weight)
+    font = _font_cache.get(key)
+    if font is None:
+        font = ctk.CTkFont(family=family, size=size, weight=weight)
+        _font_cache[key] = font
+    return font
 
 
 def get_available_themes() -> list[tuple[str, str]]:
@@ -193,6 +230,9 @@ def set_theme(theme_name: str) -> Theme:
 
     _current_theme = THEMES[theme_name]
 
+    # Drop cached styles so the rebuilt UI picks up the new theme
+    _clear_style_cache()
+
     # Update CustomTkinter appearance mode
     ctk.set_appearance_mode(_current_theme.ctk_appearance_mode)
 
@@ -298,6 +338,14 @@ def save_theme_preference():
 # PRIVATE FUNCTIONS
 # =============================================================================
 
+def _clear_style_cache():
+    """Reset the font and color registry caches."""
+    global _colors_cache
+
+    _colors_cache = None
+    _font_cache.clear()
+
+
 def _notify_theme_change():
     """Call all registered theme change callbacks."""
     for callback in _theme_change_callbacks:
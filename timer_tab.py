@@ -8,44 +8,123 @@ from typing import TYPE_CHECKING
 
 import customtkinter as ctk
 
+import budgets
 import db
 import themes
-from themes import FONT_FAMILY
-from models import parse_duration_string
+from models import Project, Session, parse_duration_string
 from dialogs import CTkMessagebox
 from ctk_table import CTkSessionList
 from gui_utils import batch_update
 from projects_tab import PRIORITY_LABELS
+from name_index import NameIndex
 
 if TYPE_CHECKING:
     from gui import DerbyApp
-    from models import Project
+
+
+def _card_id(session: Session) -> str:
+    """Session card key: the session ID, or a placeholder until it's saved."""
+    return str(session.id) if session.id is not None else f"new:{session.project_name}"
+
+
+# -----------------------------------------------------------------------------
+# Writes run on the app's background writer thread (see DerbyApp.queue_write).
+# They look sessions up by project name, since a session started a moment
+# ago may not have its database ID yet; a project has one active session.
+# Each takes the time of the click (`when`), so a write that waits in the
+# queue still records the moment the user acted.
+# -----------------------------------------------------------------------------
+
+def _write_start(project_name: str, when: datetime, create_background: bool = False) -> Session:
+    """Start a session (creating a background task first if asked)."""
+    if db.get_active_session_by_project(project_name):
+        raise ValueError(f"'{project_name}' is already being tracked")
+    if create_background and db.get_project(project_name) is None:
+        db.create_project(project_name, is_background=True)
+    return db.start_session(project_name, start_time=when)
+
+
+def _write_stop(project_name: str, when: datetime, notes: str = "") -> Session:
+    """Stop a project's active session."""
+    session = db.stop_session(project_name=project_name, notes=notes, when=when)
+    if session is None:
+        raise ValueError(f"'{project_name}' is no longer being tracked")
+    return session
+
+
+def _write_set_paused(project_name: str, paused: bool, when: datetime) -> Session:
+    """Pause or resume a project's active session."""
+    session = db.get_active_session_by_project(project_name)
+    if session is None:
+        raise ValueError(f"'{project_name}' is no longer being tracked")
+    if paused:
+        return db.pause_session(session.id, when=when)
+    return db.resume_session(session.id, when=when)
+
+
+def _frecency_sort_key(project: 'Project') -> tuple:
+    """Sort key putting frequently/recently started projects first."""
+    if project.frecency is None:
+        return (1, 0.0, project.name.lower())
+    return (0, -project.frecency, project.name.lower())
 
 
 class ProjectSelectorPopup(ctk.CTkToplevel):
-    """Popup window displaying projects organized by priority in columns."""
+    """Popup window displaying projects organized by priority in columns.
+
+    One popup is kept per ProjectSelector and hidden between uses. Project
+    buttons are reused across refreshes and shown or hidden as the user
+    types into the filter entry.
+    """
+
+    COLUMN_WIDTH = 115
+    MAX_HEIGHT = 250
 
-    def __init__(self, parent, anchor_widget, projects_by_priority: dict, on_select: callable):
+    def __init__(self, parent, on_select: callable):
         super().__init__(parent)
 
         self.on_select = on_select
         self.overrideredirect(True)  # Remove window decorations
         self.configure(fg_color=themes.get_colors()["bg_dark"])
 
-        # Position below anchor widget
-        self.update_idletasks()
+        # Button pool, keyed by project name
+        self._buttons: dict[str, ctk.CTkButton] = {}
+        self._layout: dict[str, tuple[int, int]] = {}  # name -> (priority, row)
+        self._shown: set[str] = set()
+        self._order: list[str] = []  # All names in display order
+        self._index = NameIndex()
+
+        self.filter_var = ctk.StringVar()
+        self._build_ui()
+        self.filter_var.trace_add("write", lambda *args: self._apply_filter())
+
+        # Close on click outside or Escape; Enter picks the first match
+        self.bind("<Escape>", lambda e: self.hide())
+        self.bind("<FocusOut>", self._on_focus_out)
+        self.filter_entry.bind("<Return>", self._select_first_match)
+
+    def show(self, anchor_widget):
+        """Position the popup below anchor_widget and display it."""
+        self.filter_var.set("")
+
         x = anchor_widget.winfo_rootx()
         y = anchor_widget.winfo_rooty() + anchor_widget.winfo_height() + 2
         self.geometry(f"+{x}+{y}")
 
-        self._build_ui(projects_by_priority)
-
-        # Close on click outside or Escape
-        self.bind("<Escape>", lambda e: self.destroy())
-        self.bind("<FocusOut>", self._on_focus_out)
-        self.focus_set()
+        self.deiconify()
+        self.lift()
+        self.filter_entry.focus_set()
         self.grab_set()
 
+    def hide(self):
+        """Hide the popup, keeping its widgets for the next use."""
+        self.grab_release()
+        self.withdraw()
+
+    def is_shown(self) -> bool:
+        """Check whether the popup is currently displayed."""
+        return self.winfo_exists() and self.winfo_viewable()
+
     def _on_focus_out(self, event):
         """Close popup when focus is lost (clicked outside)."""
         # Check if focus went to a child widget
@@ -60,12 +139,12 @@ class ProjectSelectorPopup(ctk.CTkToplevel):
         try:
             focused = self.focus_get()
             if focused is None or not str(focused).startswith(str(self)):
-                self.destroy()
+                self.hide()
         except Exception:
-            self.destroy()
+            self.hide()
 
-    def _build_ui(self, projects_by_priority: dict):
-        """Build the multi-column popup UI."""
+    def _build_ui(self):
+        """Build the filter entry and the five empty priority columns."""
         colors = themes.get_colors()
 
         # Main container with border effect
@@ -78,12 +157,22 @@ class ProjectSelectorPopup(ctk.CTkToplevel):
         )
         main_frame.pack(fill=ctk.BOTH, expand=True, padx=2, pady=2)
 
+        # Type-to-filter entry
+        self.filter_entry = ctk.CTkEntry(
+            main_frame,
+            textvariable=self.filter_var,
+            height=28,
+            corner_radius=6,
+            font=themes.get_font(11)
+        )
+        self.filter_entry.pack(fill=ctk.X, padx=7, pady=(7, 0))
+
         # Create 5 columns for priorities 1-5
         columns_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
         columns_frame.pack(fill=ctk.BOTH, expand=True, padx=5, pady=5)
 
-        column_width = 115
-        max_height = 250
+        self._scroll_frames: dict[int, ctk.CTkScrollableFrame] = {}
+        self._placeholders: dict[int, ctk.CTkLabel] = {}
 
         for priority in range(1, 6):
             # Column container
@@ -102,59 +191,122 @@ class ProjectSelectorPopup(ctk.CTkToplevel):
             header = ctk.CTkLabel(
                 col_frame,
                 text=header_text,
-                font=ctk.CTkFont(family=FONT_FAMILY, size=10, weight="bold"),
+                font=themes.get_font(10, "bold"),
                 text_color=colors["text_primary"],
                 fg_color=colors["bg_light"],
                 corner_radius=4,
-                width=column_width,
+                width=self.COLUMN_WIDTH,
                 height=24
             )
             header.pack(fill=ctk.X, padx=3, pady=(3, 2))
 
-            # Scrollable area for projects
+            # Scrollable area for projects (buttons are gridded by row so
+            # hidden ones can be restored in place with grid())
             scroll_frame = ctk.CTkScrollableFrame(
                 col_frame,
                 fg_color="transparent",
-                width=column_width - 10,
-                height=max_height,
+                width=self.COLUMN_WIDTH - 10,
+                height=self.MAX_HEIGHT,
                 scrollbar_button_color=colors["bg_light"],
                 scrollbar_button_hover_color=colors["separator"]
             )
             scroll_frame.pack(fill=ctk.BOTH, expand=True, padx=3, pady=(0, 3))
+            scroll_frame.grid_columnconfigure(0, weight=1)
+            self._scroll_frames[priority] = scroll_frame
+
+            # Empty column placeholder
+            self._placeholders[priority] = ctk.CTkLabel(
+                scroll_frame,
+                text="(none)",
+                font=themes.get_font(10),
+                text_color=colors["text_secondary"]
+            )
+
+    def set_projects(self, projects_by_priority: dict):
+        """
+        Sync the button pool with the given projects.
 
-            projects = projects_by_priority.get(priority, [])
+        Existing buttons are kept; only added, removed or re-prioritized
+        projects create or destroy widgets.
 
-            if not projects:
-                # Empty column placeholder
-                ctk.CTkLabel(
-                    scroll_frame,
-                    text="(none)",
-                    font=ctk.CTkFont(family=FONT_FAMILY, size=10),
-                    text_color=colors["text_secondary"]
-                ).pack(pady=10)
+        Args:
+            projects_by_priority: {priority: [project names in display order]}
+        """
+        layout = {}
+        order = []
+        for priority in range(1, 6):
+            for row, name in enumerate(projects_by_priority.get(priority, [])):
+                layout[name] = (priority, row)
+                order.append(name)
+
+        # Drop buttons for removed projects or ones that changed column
+        for name in list(self._buttons):
+            if name not in layout or layout[name][0] != self._layout[name][0]:
+                self._buttons.pop(name).destroy()
+                self._shown.discard(name)
+
+        # Create missing buttons and move existing ones to their new row
+        for name, (priority, row) in layout.items():
+            if name not in self._buttons:
+                self._buttons[name] = self._create_button(priority, name)
+            elif name in self._shown and self._layout[name][1] != row:
+                self._buttons[name].grid(row=row)
+
+        self._layout = layout
+        self._order = order
+        self._index.rebuild(order)
+        self._apply_filter()
+
+    def _create_button(self, priority: int, project_name: str) -> ctk.CTkButton:
+        """Create a (not yet gridded) button for a project."""
+        colors = themes.get_colors()
+        return ctk.CTkButton(
+            self._scroll_frames[priority],
+            text=project_name,
+            font=themes.get_font(11),
+            fg_color=colors["card_bg"],
+            hover_color=colors["bg_light"],
+            text_color=colors["text_primary"],
+            anchor="w",
+            width=self.COLUMN_WIDTH - 15,
+            height=26,
+            corner_radius=4,
+            command=lambda name=project_name: self._select_project(name)
+        )
+
+    def _apply_filter(self):
+        """Show only buttons matching the filter text."""
+        matches = set(self._index.search(self.filter_var.get()))
+
+        # Only touch widgets whose visibility actually changes
+        for name in self._shown - matches:
+            self._buttons[name].grid_remove()
+        for name in matches - self._shown:
+            self._buttons[name].grid(row=self._layout[name][1], column=0, sticky="ew", pady=1)
+        self._shown = matches
+
+        # Show a placeholder in columns with nothing to display
+        visible_priorities = {self._layout[name][0] for name in matches}
+        placeholder_text = "(no matches)" if self.filter_var.get().strip() else "(none)"
+        for priority, placeholder in self._placeholders.items():
+            if priority in visible_priorities:
+                placeholder.grid_remove()
             else:
-                # Project buttons
-                for project_name in projects:
-                    btn = ctk.CTkButton(
-                        scroll_frame,
-                        text=project_name,
-                        font=ctk.CTkFont(family=FONT_FAMILY, size=11),
-                        fg_color=colors["card_bg"],
-                        hover_color=colors["bg_light"],
-                        text_color=colors["text_primary"],
-                        anchor="w",
-                        width=column_width - 15,
-                        height=26,
-                        corner_radius=4,
-                        command=lambda name=project_name: self._select_project(name)
-                    )
-                    btn.pack(fill=ctk.X, pady=1)
+                placeholder.configure(text=placeholder_text)
+                placeholder.grid(row=0, column=0, pady=10)
+
+    def _select_first_match(self, event=None):
+        """Select the first visible project (Enter in the filter entry)."""
+        for name in self._order:
+            if name in self._shown:
+                self._select_project(name)
+                return
 
     def _select_project(self, project_name: str):
         """Handle project selection."""
         if self.on_select:
             self.on_select(project_name)
-        self.destroy()
+        self.hide()
 
 
 class ProjectSelector(ctk.CTkFrame):
@@ -167,6 +319,7 @@ class ProjectSelector(ctk.CTkFrame):
         self.variable = variable
         self.projects_by_priority: dict = {1: [], 2: [], 3: [], 4: [], 5: []}
         self.popup = None
+        self._popup_stale = True  # Projects changed since the popup was synced
 
         # Entry field for typing
         self.entry = ctk.CTkEntry(
@@ -175,7 +328,7 @@ class ProjectSelector(ctk.CTkFrame):
             width=width - 35,
             height=height,
             corner_radius=6,
-            font=ctk.CTkFont(family=FONT_FAMILY, size=12)
+            font=themes.get_font(12)
         )
         self.entry.pack(side=ctk.LEFT)
 
@@ -186,7 +339,7 @@ class ProjectSelector(ctk.CTkFrame):
             width=30,
             height=height,
             corner_radius=6,
-            font=ctk.CTkFont(family=FONT_FAMILY, size=10),
+            font=themes.get_font(10),
             fg_color=colors["bg_light"],
             hover_color=colors["separator"],
             text_color=colors["text_primary"],
@@ -195,8 +348,9 @@ class ProjectSelector(ctk.CTkFrame):
         self.dropdown_btn.pack(side=ctk.LEFT, padx=(3, 0))
 
     def set_projects(self, projects_by_priority: dict):
-        """Update the projects dictionary."""
+        """Update the projects dictionary (the popup syncs on next open)."""
         self.projects_by_priority = projects_by_priority
+        self._popup_stale = True
 
     def get(self) -> str:
         """Get the current entry value."""
@@ -205,24 +359,26 @@ class ProjectSelector(ctk.CTkFrame):
     def _toggle_popup(self):
         """Toggle the dropdown popup."""
         if self.popup is not None and self.popup.winfo_exists():
-            self.popup.destroy()
-            self.popup = None
-            return
+            if self.popup.is_shown():
+                self.popup.hide()
+                return
+        else:
+            # First open (or the popup was destroyed with its window)
+            self.popup = ProjectSelectorPopup(
+                self.winfo_toplevel(),
+                on_select=self._on_project_selected
+            )
+            self._popup_stale = True
 
-        # Get the root window
-        root = self.winfo_toplevel()
+        if self._popup_stale:
+            self.popup.set_projects(self.projects_by_priority)
+            self._popup_stale = False
 
-        self.popup = ProjectSelectorPopup(
-            root,
-            self,
-            self.projects_by_priority,
-            on_select=self._on_project_selected
-        )
+        self.popup.show(self)
 
     def _on_project_selected(self, project_name: str):
         """Handle project selection from popup."""
         self.variable.set(project_name)
-        self.popup = None
 
 
 class TimerTab:
@@ -237,7 +393,10 @@ class TimerTab:
         # Caches for optimization
         self._projects_cache: dict[str, 'Project'] | None = None
         self._last_session_ids: set[str] = set()
-        self._last_session_state: dict[str, tuple[str, bool]] = {}  # id -> (duration, is_paused)
+        self._last_session_state: dict[str, tuple[str, bool, str]] = {}  # id -> (duration, is_paused, budget)
+        self._last_combo_values: tuple | None = None  # (projects_by_priority, bg_task_names)
+        self._card_sessions: dict[str, Session] = {}  # card id -> Session shown on it
+        self._budget_progress: dict[str, list] = {}  # project -> live BudgetProgress list
 
         self._build_ui()
         self.refresh()
@@ -266,7 +425,7 @@ class TimerTab:
         ctk.CTkLabel(
             start_inner,
             text="Start New Project Session",
-            font=ctk.CTkFont(family=FONT_FAMILY, size=13, weight="bold"),
+            font=themes.get_font(13, "bold"),
             text_color=colors["text_primary"]
         ).pack(anchor="w")
 
@@ -276,7 +435,7 @@ class TimerTab:
         ctk.CTkLabel(
             project_row,
             text="Project:",
-            font=ctk.CTkFont(family=FONT_FAMILY, size=12),
+            font=themes.get_font(12),
             text_color=colors["text_secondary"]
         ).pack(side=ctk.LEFT)
 
@@ -294,7 +453,7 @@ class TimerTab:
             command=self.start_session,
             height=32,
             corner_radius=6,
-            font=ctk.CTkFont(family=FONT_FAMILY, size=12)
+            font=themes.get_font(12)
         )
         start_btn.pack(side=ctk.LEFT, padx=5)
 
@@ -305,7 +464,7 @@ class TimerTab:
         ctk.CTkLabel(
             sessions_header,
             text="Active Project Sessions",
-            font=ctk.CTkFont(family=FONT_FAMILY, size=13, weight="bold"),
+            font=themes.get_font(13, "bold"),
             text_color=colors["text_primary"]
         ).pack(anchor="w")
 
@@ -334,7 +493,7 @@ class TimerTab:
         ctk.CTkLabel(
             bg_start_inner,
             text="Start Background Task",
-            font=ctk.CTkFont(family=FONT_FAMILY, size=13, weight="bold"),
+            font=themes.get_font(13, "bold"),
             text_color=colors["text_primary"]
         ).pack(anchor="w")
 
@@ -344,7 +503,7 @@ class TimerTab:
         ctk.CTkLabel(
             bg_row,
             text="Task:",
-            font=ctk.CTkFont(family=FONT_FAMILY, size=12),
+            font=themes.get_font(12),
             text_color=colors["text_secondary"]
         ).pack(side=ctk.LEFT)
 
@@ -354,7 +513,7 @@ class TimerTab:
             width=250,
             height=32,
             corner_radius=6,
-            font=ctk.CTkFont(family=FONT_FAMILY, size=12)
+            font=themes.get_font(12)
         )
         self.bg_task_combo.pack(side=ctk.LEFT, padx=10)
 
@@ -364,7 +523,7 @@ class TimerTab:
             command=self.start_background_task,
             height=32,
             corner_radius=6,
-            font=ctk.CTkFont(family=FONT_FAMILY, size=12)
+            font=themes.get_font(12)
         )
         bg_start_btn.pack(side=ctk.LEFT, padx=5)
 
@@ -375,7 +534,7 @@ class TimerTab:
         ctk.CTkLabel(
             bg_sessions_header,
             text="Active Background Tasks",
-            font=ctk.CTkFont(family=FONT_FAMILY, size=13, weight="bold"),
+            font=themes.get_font(13, "bold"),
             text_color=colors["text_primary"]
         ).pack(anchor="w")
 
@@ -419,23 +578,23 @@ class TimerTab:
         """Refresh only the combo box values (when projects change)."""
         project_map = self._get_projects_map()
 
-        # Group regular projects by priority
+        # Most recently/frequently used first, never-used alphabetically last
+        ordered = sorted(project_map.values(), key=_frecency_sort_key)
+
+        # Group regular projects by priority (order within groups is kept)
         projects_by_priority = {1: [], 2: [], 3: [], 4: [], 5: []}
-        for p in project_map.values():
+        for p in ordered:
             if not p.is_background:
                 projects_by_priority[p.priority].append(p.name)
 
-        # Sort each priority group alphabetically
-        for priority in projects_by_priority:
-            projects_by_priority[priority].sort(key=str.lower)
+        bg_task_names = [p.name for p in ordered if p.is_background]
 
-        self.project_selector.set_projects(projects_by_priority)
+        # Skip widget updates if the grouped lists are unchanged
+        if (projects_by_priority, bg_task_names) == self._last_combo_values:
+            return
+        self._last_combo_values = (projects_by_priority, bg_task_names)
 
-        # Background tasks unchanged
-        bg_task_names = sorted(
-            [p.name for p in project_map.values() if p.is_background],
-            key=str.lower
-        )
+        self.project_selector.set_projects(projects_by_priority)
         self.bg_task_combo.configure(values=bg_task_names)
 
     def refresh_sessions(self):
@@ -447,26 +606,22 @@ class TimerTab:
 
     def _refresh_active_sessions(self):
         """Refresh both active sessions lists using cached project data."""
-        active = db.get_active_sessions()
+        active = self.app.current_active_sessions()
+        self._budget_progress = self.app.budgets.progress(active)
 
         # Use cached project map for O(1) lookups instead of N queries
         project_map = self._get_projects_map()
 
         regular_sessions = []
         bg_sessions = []
+        self._card_sessions = {}
 
         for session in active:
             project = project_map.get(session.project_name)
             is_bg = project.is_background if project else False
 
-            started = session.start_time.strftime("%Y-%m-%d %I:%M:%S %p") if session.start_time else ""
-            session_data = {
-                'session_id': str(session.id),
-                'project_name': session.project_name,
-                'started': started,
-                'duration': session.format_duration(),
-                'is_paused': session.is_paused
-            }
+            session_data = self._card_data(session)
+            self._card_sessions[session_data['session_id']] = session
 
             if is_bg:
                 bg_sessions.append(session_data)
@@ -486,14 +641,53 @@ class TimerTab:
                     for data in bg_sessions:
                         self.bg_session_list.add_session(**data)
 
+    def _card_data(self, session: Session) -> dict:
+        """Arguments for CTkSessionList.add_session() for one session."""
+        started = session.start_time.strftime("%Y-%m-%d %I:%M:%S %p") if session.start_time else ""
+        budget, budget_over = self._budget_text(session.project_name)
+        return {
+            'session_id': _card_id(session),
+            'project_name': session.project_name,
+            'started': started,
+            'duration': session.format_duration(),
+            'is_paused': session.is_paused,
+            'budget': budget,
+            'budget_over': budget_over
+        }
+
+    def _budget_text(self, project_name: str) -> tuple[str, bool]:
+        """Card text for a project's tightest budget, and whether it's over."""
+        progress = budgets.tightest(self._budget_progress.get(project_name, []))
+        if progress is None:
+            return "", False
+        return progress.format(), progress.is_over
+
+    def _remember_cards(self, active: list):
+        """Record the shown sessions so update_durations() doesn't rebuild them."""
+        self._last_session_ids = {_card_id(s) for s in active}
+        for card_id in list(self._last_session_state):
+            if card_id not in self._last_session_ids:
+                del self._last_session_state[card_id]
+
     # -------------------------------------------------------------------------
     # Timer update (called every 1 second)
     # -------------------------------------------------------------------------
 
-    def update_durations(self):
-        """Update displayed durations and pause states for active sessions."""
-        active = db.get_active_sessions()
-        current_ids = {str(s.id) for s in active}
+    def update_durations(self, active: list = None, budget_progress: dict = None):
+        """Update displayed durations, pause states and budgets for active sessions.
+
+        Args:
+            active: Active sessions already fetched by the caller this tick
+                    (queried from the database if None)
+            budget_progress: Live budget progress for this tick (see
+                    budgets.BudgetTracker; worked out here if None)
+        """
+        if active is None:
+            active = self.app.current_active_sessions()
+        if budget_progress is None:
+            budget_progress = self.app.budgets.progress(active)
+        self._budget_progress = budget_progress
+        current_ids = {_card_id(s) for s in active}
 
         # Detect if session list changed (start/stop occurred externally)
         if current_ids != self._last_session_ids:
@@ -503,28 +697,31 @@ class TimerTab:
             self._last_session_state.clear()
             # Rebuild state cache for the new sessions
             for session in active:
-                session_id = str(session.id)
+                session_id = _card_id(session)
                 self._last_session_state[session_id] = (
                     session.format_duration(),
-                    session.is_paused
+                    session.is_paused,
+                    self._budget_text(session.project_name)[0]
                 )
             return
 
         # Session list unchanged - do incremental updates
         for session in active:
-            session_id = str(session.id)
+            session_id = _card_id(session)
             duration = session.format_duration()
             is_paused = session.is_paused
+            budget, budget_over = self._budget_text(session.project_name)
 
             # Only update UI if state actually changed
             cached = self._last_session_state.get(session_id)
-            if cached != (duration, is_paused):
+            if cached != (duration, is_paused, budget):
                 # Update in both lists (session is only in one, but checks are fast)
-                self.session_list.update_duration(session_id, duration)
-                self.session_list.update_pause_state(session_id, is_paused)
-                self.bg_session_list.update_duration(session_id, duration)
-                self.bg_session_list.update_pause_state(session_id, is_paused)
-                self._last_session_state[session_id] = (duration, is_paused)
+                for session_list in (self.session_list, self.bg_session_list):
+                    session_list.update_duration(session_id, duration)
+                    session_list.update_pause_state(session_id, is_paused)
+                    if cached is None or cached[2] != budget:
+                        session_list.update_budget(session_id, budget, budget_over)
+                self._last_session_state[session_id] = (duration, is_paused, budget)
 
     def start_session(self):
         """Start tracking the selected regular project."""
@@ -534,8 +731,8 @@ class TimerTab:
             return
 
         # Check if already active
-        active = db.get_active_session_by_project(project_name)
-        if active:
+        active = self.app.current_active_sessions(refresh=False)
+        if any(s.project_name == project_name for s in active):
             CTkMessagebox(self.app.root, "Info", f"'{project_name}' is already being tracked", "info")
             return
 
@@ -546,18 +743,13 @@ class TimerTab:
             CTkMessagebox(self.app.root, "Warning", f"'{project_name}' is a background task, not a project", "warning")
             return
 
-        # Track if this is a new project (for cache invalidation)
-        is_new_project = existing is None
-
-        db.start_session(project_name)
         self.project_var.set("")
+        if existing is None:
+            # Placeholder so the card lands in the right list until the
+            # project list is re-read
+            project_map[project_name] = Project(name=project_name)
 
-        if is_new_project:
-            # New project created - full refresh to update combos
-            self.refresh()
-        else:
-            # Existing project - only refresh sessions
-            self.refresh_sessions()
+        self._start_optimistically(project_name)
 
     def start_background_task(self):
         """Start tracking a background task."""
@@ -567,8 +759,8 @@ class TimerTab:
             return
 
         # Check if already active
-        active = db.get_active_session_by_project(task_name)
-        if active:
+        active = self.app.current_active_sessions(refresh=False)
+        if any(s.project_name == task_name for s in active):
             CTkMessagebox(self.app.root, "Info", f"'{task_name}' is already being tracked", "info")
             return
 
@@ -576,46 +768,87 @@ class TimerTab:
         project_map = self._get_projects_map()
         existing = project_map.get(task_name)
 
-        if existing is None:
-            # New background task - create it
-            db.create_project(task_name, is_background=True)
-            is_new_task = True
-        elif not existing.is_background:
+        if existing is not None and not existing.is_background:
             CTkMessagebox(self.app.root, "Warning", f"'{task_name}' is a regular project, not a background task", "warning")
             return
-        else:
-            is_new_task = False
 
-        db.start_session(task_name)
         self.bg_task_var.set("")
+        if existing is None:
+            project_map[task_name] = Project(name=task_name, is_background=True)
 
-        if is_new_task:
-            # New task created - full refresh to update combos
-            self.refresh()
-        else:
-            # Existing task - only refresh sessions
-            self.refresh_sessions()
+        self._start_optimistically(task_name, background=True)
+
+    def _start_optimistically(self, project_name: str, background: bool = False):
+        """Show a card for a new session now and queue the write."""
+        session = Session(project_name=project_name, start_time=datetime.now())
+
+        active = self.app.current_active_sessions(refresh=False)
+        active.insert(0, session)  # Newest first, like get_active_sessions()
+
+        data = self._card_data(session)
+        self._card_sessions[data['session_id']] = session
+        session_list = self.bg_session_list if background else self.session_list
+        session_list.add_session(**data, first=True)
+        self._remember_cards(active)
+
+        # Once it's written, re-read projects: a new one now exists for real,
+        # and starting an existing one changed its frecency rank
+        self.app.queue_write(
+            _write_start, project_name, session.start_time, create_background=background,
+            on_done=lambda _: self.refresh_combos_from_db()
+        )
+
+    def refresh_combos_from_db(self):
+        """Re-read projects and refresh the pickers."""
+        self._projects_cache = None
+        self.refresh_combos()
 
     def _on_stop_session(self, session_id: str):
         """Handle stop button click from session card."""
-        session = db.get_session_by_id(int(session_id))
-        if session and session.end_time is None:
-            db.stop_session(project_name=session.project_name)
-            self.refresh_sessions()  # Only sessions changed, not projects
+        session = self._card_sessions.get(session_id)
+        if session is None:
+            return
+
+        # Drop the card now; the write lands in the background
+        now = datetime.now()
+        active = self.app.current_active_sessions(refresh=False)
+        if session in active:
+            active.remove(session)
+        self.session_list.remove_session(session_id)
+        self.bg_session_list.remove_session(session_id)
+        self._card_sessions.pop(session_id, None)
+        self._remember_cards(active)
+
+        self.app.queue_write(_write_stop, session.project_name, now)
 
     def _on_toggle_pause(self, session_id: str):
         """Handle pause/resume button click from session card."""
-        session_id_int = int(session_id)
-        session = db.get_session_by_id(session_id_int)
-        if not session or session.end_time is not None:
+        session = self._card_sessions.get(session_id)
+        if session is None:
             return
 
+        # Apply the same bookkeeping as db.pause_session/resume_session to
+        # the in-memory session, so the card and duration update right away
+        now = datetime.now()
         if session.is_paused:
-            db.resume_session(session_id_int)
+            if session.pause_started_at:
+                session.paused_seconds += int((now - session.pause_started_at).total_seconds())
+            session.is_paused = False
+            session.pause_started_at = None
         else:
-            db.pause_session(session_id_int)
+            session.is_paused = True
+            session.pause_started_at = now
+
+        for session_list in (self.session_list, self.bg_session_list):
+            session_list.update_pause_state(session_id, session.is_paused)
+            session_list.update_duration(session_id, session.format_duration())
+        self._last_session_state[session_id] = (
+            session.format_duration(),
+            session.is_paused,
+            self._budget_text(session.project_name)[0]
+        )
 
-        self.refresh_sessions()  # Only sessions changed, not projects
+        self.app.queue_write(_write_set_paused, session.project_name, session.is_paused, now)
 
     def stop_all(self):
         """Stop all active sessions (both projects and background tasks)."""
@@ -663,9 +896,8 @@ class StopSessionDialog:
     def _do_stop(self):
         """Stop the session."""
         notes = self.notes_text.get("1.0", ctk.END).strip()
-        db.stop_session(project_name=self.project_name, notes=notes)
         self.dialog.destroy()
-        self.app.timer_tab.refresh()
+        self.app.queue_write(_write_stop, self.project_name, datetime.now(), notes=notes)
 
 
 class LogSessionDialog:
@@ -0,0 +1,162 @@
+"""
+write_queue.py - Background database writer for the GUI
+
+Timer buttons shouldn't wait on SQLite: on a slow or network-mounted data
+directory a single commit can take long enough to freeze the window. The
+GUI updates its in-memory state right away and hands the actual write to
+a WriteQueue, which applies writes on a background thread in the order
+they were submitted.
+
+Whatever has queued up while the writer was busy is applied together in
+one transaction (one commit instead of one per click), with each write
+in its own savepoint so a failing write doesn't undo its neighbours.
+
+Tkinter isn't thread-safe, so results never call back into the GUI from
+the writer thread. They're collected and handed over when the GUI thread
+calls poll() (the GUI does that from root.after).
+"""
+
+import queue
+import threading
+from typing import Any, Callable, Optional
+
+import db
+
+
+# Most writes applied in one transaction
+MAX_BATCH = 100
+
+
+class WriteQueue:
+    """
+    Runs db writes on a background thread, in submission order.
+
+    Usage:
+        writer = WriteQueue(on_error=show_error)
+        writer.submit(db.stop_session, project_name="Reading", on_done=refresh)
+        ...
+        writer.poll()      # from the UI thread: run finished callbacks
+        writer.close()     # on exit: wait for queued writes to land
+    """
+
+    def __init__(self, on_error: Optional[Callable[[Exception], None]] = None):
+        """
+        Args:
+            on_error: Called (from poll()) with the exception of any write
+                      that failed and had no on_error of its own
+        """
+        self.on_error = on_error
+        self._requests: queue.Queue = queue.Queue()
+        self._results: queue.Queue = queue.Queue()
+        # Only touched from the submitting (UI) thread: submit() and poll()
+        self._pending = 0
+        self._thread = threading.Thread(target=self._run, name="derby-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def pending(self) -> int:
+        """Writes submitted whose callbacks haven't run yet."""
+        return self._pending
+
+    def submit(
+        self,
+        func: Callable,
+        *args,
+        on_done: Optional[Callable[[Any], None]] = None,
+        on_error: Optional[Callable[[Exception], None]] = None,
+        **kwargs
+    ):
+        """
+        Queue func(*args, **kwargs) to run on the writer thread.
+
+        Args:
+            func: A db function (or anything that only touches the database)
+            on_done: Called from poll() with func's return value
+            on_error: Called from poll() with the exception if func raised
+        """
+        self._pending += 1
+        self._requests.put((func, args, kwargs, on_done, on_error))
+
+    def poll(self) -> int:
+        """
+        Run callbacks for writes that have finished. Call from the UI thread.
+
+        Returns:
+            Number of writes whose results were handled
+        """
+        handled = 0
+        while True:
+            try:
+                callback, value, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            handled += 1
+
+            if error is not None:
+                callback = callback or self.on_error
+                if callback:
+                    callback(error)
+            elif callback:
+                callback(value)
+        return handled
+
+    def close(self, timeout: float = 10.0):
+        """
+        Stop the writer once everything already queued has been written.
+
+        Callbacks for those writes are not run (the UI is going away).
+        """
+        self._requests.put(None)
+        self._thread.join(timeout)
+
+    # -------------------------------------------------------------------------
+    # Writer thread
+    # -------------------------------------------------------------------------
+
+    def _run(self):
+        """Writer loop: take everything queued, apply it, repeat."""
+        # One connection for the writer's whole life (see db.shared_connection)
+        with db.shared_connection():
+            while True:
+                request = self._requests.get()
+                if request is None:
+                    return
+
+                batch = [request]
+                stopping = False
+                while len(batch) < MAX_BATCH:
+                    try:
+                        request = self._requests.get_nowait()
+                    except queue.Empty:
+                        break
+                    if request is None:
+                        stopping = True
+                        break
+                    batch.append(request)
+
+                self._apply(batch)
+                if stopping:
+                    return
+
+    def _apply(self, batch: list):
+        """Apply a batch of writes in one transaction and report each result."""
+        outcomes = []
+        try:
+            # IMMEDIATE: take the write lock before the first read, so a CLI
+            # writing at the same time can't force this batch to fail midway
+            with db.transaction(immediate=True):
+                for func, args, kwargs, on_done, on_error in batch:
+                    try:
+                        with db.savepoint():
+                            value = func(*args, **kwargs)
+                    except Exception as e:
+                        outcomes.append((on_error, None, e))
+                    else:
+                        outcomes.append((on_done, value, None))
+        except Exception as e:
+            # The commit itself failed (locked, disk full, ...): nothing landed
+            outcomes = [(on_error, None, e) for _, _, _, _, on_error in batch]
+
+        for outcome in outcomes:
+            self._results.put(outcome)